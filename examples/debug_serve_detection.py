@@ -5,32 +5,52 @@ Debug script to analyze pose data and understand serve detection issues.
 
 import sys
 from pathlib import Path
-import json
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # Render off-screen; no display needed for batch runs
 import matplotlib.pyplot as plt
 
 # Add the src directory to the path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from serve_ai_analysis.video import VideoProcessingPipeline
-from serve_ai_analysis.pose import MediaPipePoseEstimator
+from serve_ai_analysis.video import compute_motion_scores
+from serve_ai_analysis._json import write_json
+from serve_ai_analysis.pose import (
+    create_pose_estimator,
+    estimate_pose_video_cached,
+    get_landmark_track
+)
 from rich.console import Console
 from rich.panel import Panel
 
 console = Console()
 
-def analyze_pose_data(video_path: Path):
+MIN_SERVE_DURATION = 1.5  # seconds between candidate serve peaks
+
+# Lite model in tracking mode; accuracy is secondary to turnaround for this
+# exploratory pass
+POSE_SETTINGS = {
+    "confidence_threshold": 0.5,
+    "model_complexity": 0,
+    "static_image_mode": False,
+    "min_tracking_confidence": 0.4,
+}
+
+def analyze_pose_data(video_path: Path, pose_estimator):
     """Analyze pose data to understand serve detection issues."""
     console.print(Panel.fit(
         f"[bold blue]Analyzing Pose Data: {video_path.name}[/bold blue]",
         title="Debug Analysis"
     ))
     
-    # Initialize pose estimator
-    pose_estimator = MediaPipePoseEstimator(confidence_threshold=0.5)
-    
-    # Extract pose data
-    pose_frames = pose_estimator.estimate_pose_video(video_path)
+    # Extract pose data cropped to the player with the shared estimator.
+    # Results are cached next to the video, so re-runs skip MediaPipe.
+    pose_frames = estimate_pose_video_cached(
+        video_path,
+        pose=pose_estimator,
+        roi_tracking=True,
+        **POSE_SETTINGS
+    )
     
     if not pose_frames:
         console.print("[red]No pose data detected![/red]")
@@ -38,50 +58,34 @@ def analyze_pose_data(video_path: Path):
     
     console.print(f"📊 Extracted {len(pose_frames)} frames with pose data")
     
-    # Analyze wrist positions over time
-    wrist_positions = []
-    timestamps = []
+    # Analyze wrist positions over time (single pass into float32 arrays)
+    timestamps, wrist_xy = get_landmark_track(pose_frames, "right_wrist")
+    n_wrist = len(timestamps)
     
-    for frame in pose_frames:
-        if "right_wrist" in frame.landmarks:
-            wrist = frame.landmarks["right_wrist"]
-            wrist_positions.append((wrist.x, wrist.y))
-            timestamps.append(frame.timestamp)
-    
-    if not wrist_positions:
+    if n_wrist == 0:
         console.print("[red]No wrist positions found![/red]")
         return
     
-    console.print(f"📈 Found {len(wrist_positions)} wrist positions")
-    
-    # Convert to numpy arrays
-    wrist_x = np.array([pos[0] for pos in wrist_positions])
-    wrist_y = np.array([pos[1] for pos in wrist_positions])
-    timestamps = np.array(timestamps)
+    console.print(f"📈 Found {n_wrist} wrist positions")
     
-    # Calculate motion scores
-    motion_scores = []
-    for i in range(len(wrist_positions)):
-        if i < 15:  # Skip first 15 frames
-            motion_scores.append(0.0)
-            continue
-        
-        # Calculate motion based on wrist position changes
-        motion_score = 0.0
-        for j in range(max(0, i - 15), i):
-            if j < len(wrist_positions):
-                dx = wrist_x[i] - wrist_x[j]
-                dy = wrist_y[i] - wrist_y[j]
-                distance = np.sqrt(dx**2 + dy**2)
-                motion_score += distance
-        
-        motion_scores.append(motion_score)
+    wrist_x = wrist_xy[:, 0]
+    wrist_y = wrist_xy[:, 1]
     
-    motion_scores = np.array(motion_scores)
+    # Calculate motion scores: summed distance from each frame to the
+    # previous 15 frames (the first 15 frames have no full window)
+    motion_scores = compute_motion_scores(wrist_x, wrist_y, window=15)
     
-    # Find peaks in motion
+    # Find well-separated peaks in motion: at most one candidate per
+    # minimum serve duration, ignoring low-prominence jitter
     from scipy.signal import find_peaks
-    peaks, _ = find_peaks(motion_scores, height=np.percentile(motion_scores, 70))
+    fps = 1.0 / np.median(np.diff(timestamps)) if n_wrist > 1 else 30.0
+    height_threshold = np.percentile(motion_scores, 70)
+    peaks, _ = find_peaks(
+        motion_scores,
+        height=height_threshold,
+        distance=max(1, int(fps * MIN_SERVE_DURATION)),
+        prominence=motion_scores.std() * 0.5
+    )
     
     console.print(f"🔍 Found {len(peaks)} motion peaks")
     
@@ -95,19 +99,18 @@ def analyze_pose_data(video_path: Path):
     analysis_data = {
         "video_name": video_path.name,
         "total_frames": len(pose_frames),
-        "frames_with_pose": len(wrist_positions),
+        "frames_with_pose": n_wrist,
         "motion_peaks": len(peaks),
-        "wrist_positions": wrist_positions,
-        "motion_scores": motion_scores.tolist(),
-        "timestamps": timestamps.tolist(),
-        "peak_indices": peaks.tolist()
+        "wrist_positions": wrist_xy,
+        "motion_scores": motion_scores,
+        "timestamps": timestamps,
+        "peak_indices": peaks
     }
     
     output_path = Path("debug_analysis") / f"{video_path.stem}_pose_analysis.json"
     output_path.parent.mkdir(exist_ok=True)
     
-    with open(output_path, 'w') as f:
-        json.dump(analysis_data, f, indent=2)
+    write_json(analysis_data, output_path)
     
     console.print(f"📊 Analysis saved to {output_path}")
     
@@ -121,7 +124,7 @@ def create_motion_plot(timestamps, motion_scores, peaks, wrist_y, video_name):
         
         # Plot motion scores
         plt.subplot(2, 1, 1)
-        plt.plot(timestamps, motion_scores, 'b-', label='Motion Score')
+        plt.plot(timestamps, motion_scores, 'b-', label='Motion Score', rasterized=True)
         plt.plot(timestamps[peaks], motion_scores[peaks], 'ro', label='Peaks')
         plt.xlabel('Time (s)')
         plt.ylabel('Motion Score')
@@ -131,7 +134,7 @@ def create_motion_plot(timestamps, motion_scores, peaks, wrist_y, video_name):
         
         # Plot wrist height
         plt.subplot(2, 1, 2)
-        plt.plot(timestamps, wrist_y, 'g-', label='Wrist Height (Y)')
+        plt.plot(timestamps, wrist_y, 'g-', label='Wrist Height (Y)', rasterized=True)
         plt.plot(timestamps[peaks], wrist_y[peaks], 'ro', label='Peaks')
         plt.xlabel('Time (s)')
         plt.ylabel('Wrist Y Position')
@@ -142,9 +145,10 @@ def create_motion_plot(timestamps, motion_scores, peaks, wrist_y, video_name):
         plt.tight_layout()
         
         output_path = Path("debug_analysis") / f"{video_name}_motion_plot.png"
-        plt.savefig(output_path, dpi=150, bbox_inches='tight')
+        plt.savefig(output_path, dpi=150)
+        plt.close()
         console.print(f"📈 Motion plot saved to {output_path}")
-        
+    
     except ImportError:
         console.print("[yellow]Matplotlib not available, skipping plot generation[/yellow]")
 
@@ -176,10 +180,14 @@ def main():
     for video in optimized_videos:
         console.print(f"  - {video.name}")
     
-    # Analyze each video
-    for video_path in optimized_videos:
-        console.print(f"\n{'='*60}")
-        analyze_pose_data(video_path)
+    # Analyze each video, loading the pose model once for all of them
+    pose_estimator = create_pose_estimator(**POSE_SETTINGS)
+    try:
+        for video_path in optimized_videos:
+            console.print(f"\n{'='*60}")
+            analyze_pose_data(video_path, pose_estimator)
+    finally:
+        pose_estimator.close()
     
     console.print(f"\n{'='*60}")
     console.print("[bold green]Debug analysis complete![/bold green]")
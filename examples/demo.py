@@ -6,13 +6,20 @@ This script demonstrates how to use the analysis pipeline programmatically.
 """
 
 import sys
+from dataclasses import replace
 from pathlib import Path
 
 # Add the src directory to the path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from serve_ai_analysis.video.segmentation import ServeSegmenter
-from serve_ai_analysis.pose.mediapipe_pose import MediaPipePoseEstimator
+from serve_ai_analysis.video import (
+    detect_ball_trajectory,
+    filter_ball_detections,
+    detect_serves,
+    get_video_info,
+    DEFAULT_SERVE_CONFIG
+)
+from serve_ai_analysis.pose import estimate_pose_video_cached
 from serve_ai_analysis.metrics.calculator import BiomechanicalCalculator
 from rich.console import Console
 
@@ -35,41 +42,40 @@ def main():
         console.print("3. Get biomechanical insights")
         return
     
-    # Initialize components
-    segmenter = ServeSegmenter(
-        min_duration=1.5,
-        max_duration=4.0,
-        confidence_threshold=0.7
-    )
-    
-    pose_estimator = MediaPipePoseEstimator(
-        confidence_threshold=0.7
-    )
-    
     metrics_calculator = BiomechanicalCalculator()
     
-    # Step 1: Segment serves
-    console.print("\n[bold]Step 1: Serve Segmentation[/bold]")
-    segments = segmenter.segment_video(video_path)
+    # Step 1: Pose estimation (once per video, cached next to the video)
+    console.print("\n[bold]Step 1: Pose Estimation[/bold]")
+    all_pose_frames = estimate_pose_video_cached(video_path, confidence_threshold=0.7)
     
-    # Step 2: Pose estimation for each segment
-    console.print("\n[bold]Step 2: Pose Estimation[/bold]")
-    all_pose_frames = []
+    # Step 2: Segment serves
+    console.print("\n[bold]Step 2: Serve Segmentation[/bold]")
+    fps = get_video_info(str(video_path))['fps'] or 30.0
+    ball_detections = filter_ball_detections(detect_ball_trajectory(str(video_path)))
     
-    for i, segment in enumerate(segments):
-        console.print(f"Processing segment {i+1}/{len(segments)}")
-        
-        # Extract segment video (in real implementation)
-        # segment_video_path = output_dir / f"segment_{i+1}.mp4"
-        # segmenter.extract_segment_video(video_path, segment, segment_video_path)
-        
-        # For demo, use the full video
-        pose_frames = pose_estimator.estimate_pose_video(video_path)
-        all_pose_frames.extend(pose_frames)
+    serve_config = replace(
+        DEFAULT_SERVE_CONFIG,
+        confidence_threshold=0.7,
+        serve_min_duration=int(1.5 * fps),
+        serve_max_duration=int(4.0 * fps)
+    )
+    segments = detect_serves(all_pose_frames, ball_detections, serve_config)
     
-    # Step 3: Calculate biomechanical metrics
+    # Step 3: Calculate biomechanical metrics for the first serve, streaming
+    # its frames straight into the calculator
     console.print("\n[bold]Step 3: Biomechanical Analysis[/bold]")
-    metrics = metrics_calculator.calculate_serve_metrics(all_pose_frames)
+    console.print(f"Detected {len(segments)} segment(s)")
+    if segments:
+        segment = segments[0]
+        serve_frames = (
+            f for f in all_pose_frames
+            if segment.start_frame <= f.frame_idx <= segment.end_frame
+        )
+    else:
+        console.print("[yellow]No serves detected, analyzing the full video[/yellow]")
+        serve_frames = iter(all_pose_frames)
+    
+    metrics = metrics_calculator.calculate_serve_metrics(serve_frames)
     
     # Display results
     console.print("\n[bold green]Analysis Results:[/bold green]")
@@ -9,6 +9,7 @@ This script demonstrates the complete functional pipeline:
 4. Serve extraction and classification using pure functions
 """
 
+import os
 import sys
 from pathlib import Path
 
@@ -43,12 +44,13 @@ def main():
         console.print("Please make sure you have uploaded the serve videos to data/test/")
         return
     
-    # Find all video files
-    video_extensions = [".mp4", ".avi", ".mov", ".mkv"]
-    video_files = []
-    
-    for ext in video_extensions:
-        video_files.extend(data_dir.glob(f"*{ext}"))
+    # Find all video files in a single directory scan
+    video_extensions = {".mp4", ".avi", ".mov", ".mkv"}
+    with os.scandir(data_dir) as entries:
+        video_files = sorted(
+            Path(entry.path) for entry in entries
+            if entry.is_file() and Path(entry.name).suffix.lower() in video_extensions
+        )
     
     if not video_files:
         console.print(f"[red]No video files found in {data_dir}[/red]")
@@ -96,11 +98,10 @@ def main():
     
     # Show what was created
     console.print("\n[bold]Generated Files:[/bold]")
-    if output_dir.exists():
-        for item in output_dir.rglob("*"):
-            if item.is_file():
-                relative_path = item.relative_to(output_dir)
-                console.print(f"  📄 {relative_path}")
+    generated_files = [path for r in results for path in r.output_files]
+    generated_files.append(report_path)
+    for path in generated_files:
+        console.print(f"  📄 {path.relative_to(output_dir)}")
     
     console.print(f"\n[bold]Functional Programming Benefits:[/bold]")
     console.print("✅ Pure functions with no side effects")
@@ -0,0 +1,33 @@
+"""Shared, lazily created Rich console."""
+
+from functools import lru_cache
+
+from rich.console import Console
+
+
+@lru_cache(maxsize=None)
+def get_console() -> Console:
+    """
+    Return the process-wide console, creating it on first use.
+    
+    Creating a Console probes the terminal (size, color support), so it is
+    deferred until something is actually printed.
+    """
+    # Automatic highlighting would run its regexes over every printed line
+    return Console(highlight=False)
+
+
+class _LazyConsole:
+    """Forwards attribute access to ``get_console()``."""
+    
+    def __getattr__(self, name):
+        return getattr(get_console(), name)
+
+
+# Drop-in for a module-level ``Console()``: ``console.print(...)`` works
+# unchanged but nothing is constructed at import time. Pass
+# ``get_console()`` where a real Console instance is required.
+console = _LazyConsole()
+
+
+__all__ = ["console", "get_console"]
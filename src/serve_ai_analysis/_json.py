@@ -0,0 +1,108 @@
+"""Optional orjson support for writing JSON outputs."""
+
+import json
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    """Convert objects the JSON encoders do not handle natively."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, Path):
+        return str(obj)
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(data: Any, indent: bool = True) -> bytes:
+    """
+    Serialize data to UTF-8 JSON bytes, using orjson when installed.
+    
+    Args:
+        data: JSON-compatible data, as accepted by ``write_json``
+        indent: Indent by two spaces
+    
+    Returns:
+        Encoded JSON document
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=option)
+    if indent:
+        return json.dumps(data, indent=2, default=_default).encode()
+    return json.dumps(data, separators=(',', ':'), default=_default).encode()
+
+
+def write_json(data: Any, output_path: Path, indent: bool = True) -> None:
+    """
+    Write data as JSON, serializing NumPy arrays directly.
+    
+    Uses orjson when installed, which encodes the whole document into one
+    bytes blob, and falls back to the standard library with a 1 MiB write
+    buffer (``json.dump`` writes many small chunks).
+    
+    Args:
+        data: JSON-compatible data, may contain NumPy arrays and scalars and
+            dataclass instances (written as objects)
+        output_path: Output file path
+        indent: Indent by two spaces; turn off for documents dominated by
+            long arrays, where indenting puts every element on its own line
+    """
+    output_path = Path(output_path)
+    
+    if ORJSON_AVAILABLE:
+        output_path.write_bytes(dumps_json(data, indent))
+    else:
+        with open(output_path, 'w', buffering=1 << 20) as f:
+            if indent:
+                json.dump(data, f, indent=2, default=_default)
+            else:
+                json.dump(data, f, separators=(',', ':'), default=_default)
+
+
+def write_json_array(items: Iterable[Any], output_path: Path) -> None:
+    """
+    Write items as a JSON array, encoding and writing one element at a time.
+    
+    Unlike ``write_json`` the array is never built as a whole, so peak memory
+    does not grow with the number of items; each element goes on its own line.
+    
+    Args:
+        items: JSON-compatible elements, e.g. dataclass instances or a generator
+        output_path: Output file path
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        
+        def encode(item):
+            return orjson.dumps(item, default=_default, option=option)
+    else:
+        def encode(item):
+            return json.dumps(item, separators=(',', ':'), default=_default).encode()
+    
+    with open(output_path, 'wb', buffering=1 << 20) as f:
+        separator = b"[\n"
+        for item in items:
+            f.write(separator)
+            f.write(encode(item))
+            separator = b",\n"
+        f.write(b"[]" if separator == b"[\n" else b"\n]")
+
+
+__all__ = ["dumps_json", "write_json", "write_json_array", "ORJSON_AVAILABLE"]
+
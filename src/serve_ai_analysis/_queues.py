@@ -0,0 +1,45 @@
+"""Bounded queue helpers for producer/consumer threads that can be stopped."""
+
+import queue
+import threading
+from typing import Any
+
+
+def queue_put(q: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Put an item on a bounded queue, giving up once ``stop`` is set."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def queue_get(q: queue.Queue, stop: threading.Event) -> Any:
+    """Take an item from a queue, returning None once ``stop`` is set."""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
+
+
+def queue_consume(q: queue.Queue, stop: threading.Event, handle) -> None:
+    """Call ``handle`` on queued items until the end sentinel or ``stop``."""
+    try:
+        while not stop.is_set():
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is None:
+                return
+            handle(*item)
+    except BaseException:
+        stop.set()
+        raise
+
+
+__all__ = ["queue_put", "queue_get", "queue_consume"]
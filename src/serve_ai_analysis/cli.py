@@ -1,52 +1,48 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List
 import typer
-from pydantic import BaseModel, Field
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.panel import Panel
-from rich.table import Table
-from rich import print as rprint
 
-# Import new modules
-from .video import (
-    detect_serves,
-    detect_ball_trajectory,
-    filter_ball_detections,
-    load_video,
-    save_video_segment,
-    extract_serve_clip,
-    extract_serve_clip_direct,
-    assess_video_quality,
-    optimize_video_for_processing,
-    ServeEvent,
-    DEFAULT_SERVE_CONFIG
-)
-
-from .pose import (
-    estimate_pose_video,
-    filter_pose_frames_by_visibility,
-    get_pose_stats,
-    PoseFrame
-)
+from ._console import console, get_console
 
 app = typer.Typer(help="Tennis Serve AI Analysis - Advanced serve biomechanics analysis")
-console = Console()
 __version__ = "0.1.0"
 
-class AnalysisConfig(BaseModel):
+@dataclass(frozen=True, slots=True)
+class AnalysisConfig:
     """Configuration for serve analysis"""
     input_video: Path
-    output_dir: Path = Field(default=Path("runs"))
-    confidence_threshold: float = Field(default=0.5, ge=0.0, le=1.0)
-    min_serve_duration: float = Field(default=1.0, description="Minimum serve duration in seconds")
-    max_serve_duration: float = Field(default=5.0, description="Maximum serve duration in seconds")
-    enable_3d_estimation: bool = Field(default=False, description="Enable 3D pose estimation")
-    camera_calibration: Optional[Path] = Field(default=None, description="Camera calibration file")
-    benchmark_data: Optional[Path] = Field(default=None, description="Benchmark data for comparison")
+    output_dir: Path = Path("runs")
+    confidence_threshold: float = 0.5
+    min_serve_duration: float = 1.0            # Minimum serve duration in seconds
+    max_serve_duration: float = 5.0            # Maximum serve duration in seconds
+    enable_3d_estimation: bool = False         # Enable 3D pose estimation
+    camera_calibration: Optional[Path] = None  # Camera calibration file
+    benchmark_data: Optional[Path] = None      # Benchmark data for comparison
+    
+    def __post_init__(self):
+        if not 0.0 <= self.confidence_threshold <= 1.0:
+            raise ValueError(
+                f"confidence_threshold must be between 0 and 1, got {self.confidence_threshold}"
+            )
+
+@dataclass(frozen=True, slots=True)
+class InitConfig:
+    output_dir: Path = Path("runs")
 
-class InitConfig(BaseModel):
-    output_dir: Path = Field(default=Path("runs"))
+# Output subdirectories created by `init`
+OUTPUT_SUBDIRS = ("videos", "poses", "metrics", "dashboards", "reports", "segments")
+
+def _ensure_subdirs(root: Path, names) -> None:
+    """Create missing subdirectories of ``root`` with one listing instead of a stat per directory."""
+    root.mkdir(parents=True, exist_ok=True)
+    existing = set(os.listdir(root))
+    for name in names:
+        if name not in existing:
+            (root / name).mkdir(exist_ok=True)
 
 @app.command()
 def version():
@@ -59,18 +55,12 @@ def init(output_dir: Path = Path("runs")):
     Create base folders and sanity-check your environment.
     """
     cfg = InitConfig(output_dir=output_dir)
-    cfg.output_dir.mkdir(parents=True, exist_ok=True)
     
     # Create subdirectories for different outputs
-    (cfg.output_dir / "videos").mkdir(exist_ok=True)
-    (cfg.output_dir / "poses").mkdir(exist_ok=True)
-    (cfg.output_dir / "metrics").mkdir(exist_ok=True)
-    (cfg.output_dir / "dashboards").mkdir(exist_ok=True)
-    (cfg.output_dir / "reports").mkdir(exist_ok=True)
-    (cfg.output_dir / "segments").mkdir(exist_ok=True)
+    _ensure_subdirs(cfg.output_dir, OUTPUT_SUBDIRS)
     
     console.print(f":white_check_mark: Ready to go! Outputs will be saved in [bold green]{cfg.output_dir}[/bold green]")
-    console.print(f"Created subdirectories: videos, poses, metrics, dashboards, reports, segments")
+    console.print(f"Created subdirectories: {', '.join(OUTPUT_SUBDIRS)}")
 
 @app.command()
 def analyze(
@@ -82,6 +72,10 @@ def analyze(
     optimize: bool = typer.Option(True, "--optimize/--no-optimize", help="Optimize video for processing"),
     target_width: int = typer.Option(1280, "--width", help="Target video width"),
     target_height: int = typer.Option(720, "--height", help="Target video height"),
+    force_optimize: bool = typer.Option(False, "--force-optimize", help="Re-encode even if the video already matches the target"),
+    deterministic: bool = typer.Option(False, "--deterministic", help="Detect the ball on every 3rd frame instead of adapting to motion"),
+    hwaccel: str = typer.Option("auto", "--hwaccel", help="Hardware video decoding: auto, cuda, vaapi or off"),
+    model_complexity: int = typer.Option(1, "--model-complexity", min=0, max=2, help="Pose model: 0=lite, 1=full, 2=heavy (about twice as slow as full)"),
 ):
     """
     Analyze tennis serves from video input.
@@ -94,92 +88,156 @@ def analyze(
     5. Serve detection
     6. Serve extraction
     """
+    # Heavy dependencies (OpenCV, MediaPipe, Rich renderables) are imported
+    # here rather than at module level so lightweight commands like
+    # `version` and `--help` start quickly
+    from .video import (
+        detect_serves,
+        filter_ball_trajectory,
+        run_fused,
+        extract_serve_clips_batch,
+        assess_video_quality,
+        optimize_video_for_processing,
+        needs_optimization,
+        HWACCEL_MODES,
+        get_serve_stats,
+        DEFAULT_SERVE_CONFIG
+    )
+    import numpy as np
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.table import Table
+    from rich.text import Text
+    from .pose import filter_pose_array_by_visibility
+    
     if not video_path.exists():
         console.print(f"[red]Error: Video file {video_path} not found[/red]")
         raise typer.Exit(1)
     
-    # Create output directory
-    output_dir.mkdir(parents=True, exist_ok=True)
+    if hwaccel not in HWACCEL_MODES:
+        console.print(f"[red]Error: --hwaccel must be one of {', '.join(HWACCEL_MODES)}[/red]")
+        raise typer.Exit(1)
+    
+    # Create output directories
+    _ensure_subdirs(output_dir, ("segments",))
     
-    console.print(Panel.fit(
-        f"[bold blue]Tennis Serve Analysis[/bold blue]\n"
-        f"Input: {video_path}\n"
-        f"Output: {output_dir}\n"
-        f"Optimization: {'Enabled' if optimize else 'Disabled'}\n"
-        f"Target Resolution: {target_width}x{target_height}\n"
-        f"Confidence: {confidence}",
-        title="Configuration"
-    ))
+    # When output is not a terminal (CI, redirected logs) skip the live
+    # display and log one plain line per finished stage instead
+    is_tty = console.is_terminal
+    if is_tty:
+        # Assembled from plain strings so no markup is parsed (and paths
+        # containing "[" are shown verbatim)
+        console.print(Panel.fit(
+            Text.assemble(
+                ("Tennis Serve Analysis", "bold blue"),
+                f"\nInput: {video_path}"
+                f"\nOutput: {output_dir}"
+                f"\nOptimization: {'Enabled' if optimize else 'Disabled'}"
+                f"\nTarget Resolution: {target_width}x{target_height}"
+                f"\nConfidence: {confidence}"
+            ),
+            title="Configuration"
+        ))
+    else:
+        console.print(f"Tennis Serve Analysis: {video_path} -> {output_dir} (confidence {confidence})")
     
     try:
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
-            console=console
+            console=get_console(),
+            # Stages run for seconds to minutes, so a coarse redraw rate keeps
+            # the render thread from competing with decoding and inference
+            refresh_per_second=4,
+            disable=not is_tty
         ) as progress:
             
+            def finish(task, description):
+                progress.update(task, description=description)
+                if not is_tty:
+                    console.print(description)
+            
             # Step 1: Assess video quality
             task1 = progress.add_task("Assessing video quality...", total=None)
             quality_metrics = assess_video_quality(str(video_path))
-            progress.update(task1, description="✅ Video quality assessed")
+            finish(task1, "✅ Video quality assessed")
             
-            # Step 2: Optimize video if requested
-            if optimize:
+            # Step 2: Optimize video if requested and not already suitable
+            if optimize and (force_optimize or needs_optimization(quality_metrics, (target_width, target_height))):
                 task2 = progress.add_task("Optimizing video...", total=None)
                 optimized_path = optimize_video_for_processing(
                     str(video_path), 
                     (target_width, target_height)
                 )
-                progress.update(task2, description="✅ Video optimized")
+                finish(task2, "✅ Video optimized")
                 processing_path = optimized_path
             else:
+                if optimize:
+                    finish(
+                        progress.add_task("Checking video format...", total=None),
+                        f"✅ Optimization skipped ({quality_metrics['width']}x{quality_metrics['height']} "
+                        f"{quality_metrics['codec'] or 'unknown codec'} already fits target)"
+                    )
                 processing_path = str(video_path)
             
-            # Step 3: Estimate pose
-            task3 = progress.add_task("Estimating pose...", total=None)
-            pose_frames = estimate_pose_video(processing_path, confidence)
-            pose_frames = filter_pose_frames_by_visibility(pose_frames, min_visibility=confidence)
-            progress.update(task3, description=f"✅ Pose estimated ({len(pose_frames)} frames)")
-            
-            # Step 4: Detect ball trajectory
-            task4 = progress.add_task("Detecting ball trajectory...", total=None)
-            # Use frame skipping for faster ball detection (process every 3rd frame)
-            ball_detections = detect_ball_trajectory(processing_path, frame_skip=3)
-            ball_detections = filter_ball_detections(ball_detections, min_confidence=0.3)
-            progress.update(task4, description=f"✅ Ball trajectory detected ({len(ball_detections)} detections)")
+            # Steps 3-4: Estimate pose and detect ball trajectory in a single
+            # decode of the video (ball detection skips frames while the scene
+            # is still, or runs on every 3rd frame with --deterministic)
+            task3 = progress.add_task("Estimating pose and detecting ball trajectory...", total=None)
+            keypoints, ball = run_fused(
+                processing_path,
+                confidence_threshold=confidence,
+                ball_frame_skip=3,
+                adaptive_ball_skip=not deterministic,
+                hwaccel=hwaccel,
+                model_complexity=model_complexity
+            )
+            filter_pose_array_by_visibility(keypoints, min_visibility=confidence)
+            filter_ball_trajectory(ball, min_confidence=0.3)
+            n_pose_frames = np.count_nonzero(keypoints[..., 3].any(axis=1))
+            finish(
+                task3,
+                f"✅ Pose estimated ({n_pose_frames} frames), "
+                f"ball trajectory detected ({len(ball.detected_frames())} detections)"
+            )
             
             # Step 5: Detect serves
             task5 = progress.add_task("Detecting serves...", total=None)
-            config = DEFAULT_SERVE_CONFIG.copy()
-            config['confidence_threshold'] = confidence
-            config['serve_min_duration'] = int(min_duration * 30)  # Convert to frames
-            config['serve_max_duration'] = int(max_duration * 30)  # Convert to frames
+            # Convert durations to frames at the source frame rate; frames map
+            # 1:1 to the optimized video, so its re-encoded fps does not matter
+            fps = quality_metrics['fps'] or 30.0
+            config = replace(
+                DEFAULT_SERVE_CONFIG,
+                confidence_threshold=confidence,
+                serve_min_duration=int(min_duration * fps),
+                serve_max_duration=int(max_duration * fps)
+            )
             
-            serve_events = detect_serves(pose_frames, ball_detections, config)
-            progress.update(task5, description=f"✅ Serves detected ({len(serve_events)} serves)")
+            serve_events = detect_serves(keypoints, ball, config)
+            finish(task5, f"✅ Serves detected ({len(serve_events)} serves)")
             
-            # Step 6: Extract serve clips
+            # Step 6: Extract all serve clips in a single pass over the video
             if serve_events:
-                task6 = progress.add_task("Extracting serve clips...", total=len(serve_events))
+                task6 = progress.add_task("Extracting serve clips...", total=None)
                 segments_dir = output_dir / "segments"
-                segments_dir.mkdir(exist_ok=True)
-                
-                for i, serve_event in enumerate(serve_events):
-                    progress.update(task6, description=f"Extracting serve {i+1}/{len(serve_events)}...")
-                    serve_path = segments_dir / f"serve_{i+1:03d}.mp4"
-                    extract_serve_clip_direct(processing_path, serve_event, str(serve_path))
-                    progress.advance(task6)
-                
-                progress.update(task6, description=f"✅ Serve clips extracted ({len(serve_events)} clips)")
+                clip_paths = extract_serve_clips_batch(
+                    processing_path,
+                    serve_events,
+                    [str(segments_dir / f"serve_{i+1:03d}.mp4") for i in range(len(serve_events))]
+                )
+                finish(task6, f"✅ Serve clips extracted ({len(clip_paths)} clips)")
         
-        # Print results
-        console.print(f"\n[bold green]Analysis completed successfully![/bold green]")
-        console.print(f"🎾 Detected {len(serve_events)} serves")
-        console.print(f"📁 Results saved to: {output_dir}")
+        # Print results, summary and statistics table in a single write
+        results = [
+            "\n".join((
+                "\n[bold green]Analysis completed successfully![/bold green]",
+                f"🎾 Detected {len(serve_events)} serves",
+                f"📁 Results saved to: {output_dir}"
+            ))
+        ]
         
         if serve_events:
-            # Print serve statistics
-            from .video.serve_detection import get_serve_stats
+            # Serve statistics
             stats = get_serve_stats(serve_events)
             
             table = Table(title="Serve Analysis Results")
@@ -191,9 +249,10 @@ def analyze(
             table.add_row("Average Confidence", f"{stats['avg_confidence']:.3f}")
             table.add_row("Min Confidence", f"{stats['min_confidence']:.3f}")
             table.add_row("Max Confidence", f"{stats['max_confidence']:.3f}")
-            
-            console.print(table)
+            results.append(table)
         
+        console.print(*results)
+    
     except Exception as e:
         console.print(f"\n[bold red]Analysis failed: {str(e)}[/bold red]")
         raise typer.Exit(1)
@@ -233,7 +292,7 @@ def pose(
 
 @app.command()
 def metrics(
-    pose_data: Path = typer.Argument(..., help="Path to pose estimation data"),
+    pose_data: List[Path] = typer.Argument(..., help="Path(s) to pose estimation data, one serve per file"),
     output_dir: Path = typer.Option(Path("runs"), "--output-dir", "-o", help="Output directory"),
     benchmark: Optional[Path] = typer.Option(None, "--benchmark", help="Benchmark data file"),
 ):
@@ -243,9 +302,28 @@ def metrics(
     This command analyzes the pose data to extract biomechanical metrics
     such as joint angles, velocities, and timing.
     """
-    console.print(f"[blue]Calculating biomechanical metrics from {pose_data}[/blue]")
-    # TODO: Implement biomechanical analysis logic
-    console.print("✅ Biomechanical analysis completed")
+    from .metrics.calculator import BiomechanicalCalculator, calculate_metrics_from_file
+    
+    console.print(f"[blue]Calculating biomechanical metrics from {', '.join(map(str, pose_data))}[/blue]")
+    for path in pose_data:
+        if not path.exists():
+            console.print(f"[red]Error: Pose data file {path} not found[/red]")
+            raise typer.Exit(1)
+    
+    if len(pose_data) == 1:
+        results = [calculate_metrics_from_file(pose_data[0])]
+    else:
+        # Serves are independent, so each pose file is computed in its own process
+        with ProcessPoolExecutor(max_workers=min(len(pose_data), os.cpu_count() or 1)) as pool:
+            results = list(pool.map(calculate_metrics_from_file, pose_data))
+    
+    metrics_dir = output_dir / "metrics"
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    calculator = BiomechanicalCalculator()
+    for path, serve_metrics in zip(pose_data, results):
+        name = path.name.removesuffix(".npz").removesuffix(".pose")
+        calculator.save_metrics(serve_metrics, metrics_dir / f"{name}_metrics.json")
+    console.print(f"✅ Biomechanical analysis completed ({len(results)} serves)")
 
 @app.command()
 def dashboard(
@@ -280,6 +358,8 @@ def report(
 
 def _print_results_summary(output_dir: Path):
     """Print a summary of the analysis results"""
+    from rich.table import Table
+    
     table = Table(title="Analysis Results Summary")
     table.add_column("Component", style="cyan")
     table.add_column("Status", style="green")
@@ -294,8 +374,13 @@ def _print_results_summary(output_dir: Path):
     
     console.print(table)
 
+@lru_cache(maxsize=None)
+def get_command():
+    """Build the Click command tree for ``app`` once and reuse it."""
+    return typer.main.get_command(app)
+
 def main():
-    app()
+    get_command()()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
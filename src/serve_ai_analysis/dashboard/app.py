@@ -1,8 +1,6 @@
 """Dashboard app module for tennis serve analysis."""
 
-from rich.console import Console
-
-console = Console()
+from .._console import console
 
 def create_dashboard_app():
     """Create a Dash app for the dashboard."""
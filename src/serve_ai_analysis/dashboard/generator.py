@@ -1,9 +1,8 @@
 """Dashboard generation module for tennis serve analysis."""
 
 from pathlib import Path
-from rich.console import Console
 
-console = Console()
+from .._console import console
 
 class DashboardGenerator:
     """Generate interactive dashboards for serve analysis."""
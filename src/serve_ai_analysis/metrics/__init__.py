@@ -1,12 +1,14 @@
 """Biomechanical metrics calculation module for tennis serve analysis."""
 
-from .calculator import BiomechanicalCalculator
+from .calculator import BiomechanicalCalculator, calculate_metrics_from_file, performance_scores
 from .joint_angles import JointAngleCalculator
 from .timing import TimingAnalyzer
 from .velocity import VelocityAnalyzer
 
 __all__ = [
     "BiomechanicalCalculator",
+    "calculate_metrics_from_file",
+    "performance_scores",
     "JointAngleCalculator", 
     "TimingAnalyzer",
     "VelocityAnalyzer"
@@ -1,38 +1,60 @@
 """Biomechanical metrics calculator for tennis serve analysis."""
 
+import copy
+import json
 import numpy as np
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
-import json
-from rich.console import Console
+from functools import lru_cache
 
-from ..pose.mediapipe_pose import PoseFrame, PoseLandmark
+from ..pose.pose_estimation import (
+    PoseFrame,
+    PoseSequence,
+    LANDMARK_INDEX,
+    load_pose_frames,
+    pose_sequence_from_frames
+)
+from ..pose.geometry import angles_batch
+from .._console import console
+from .._json import write_json
 
-console = Console()
+# Landmark rows in PoseFrame.landmarks
+RIGHT_SHOULDER = LANDMARK_INDEX["right_shoulder"]
+RIGHT_ELBOW = LANDMARK_INDEX["right_elbow"]
+RIGHT_WRIST = LANDMARK_INDEX["right_wrist"]
+LEFT_HIP = LANDMARK_INDEX["left_hip"]
+RIGHT_HIP = LANDMARK_INDEX["right_hip"]
+LEFT_KNEE = LANDMARK_INDEX["left_knee"]
+RIGHT_KNEE = LANDMARK_INDEX["right_knee"]
+LEFT_ANKLE = LANDMARK_INDEX["left_ankle"]
+RIGHT_ANKLE = LANDMARK_INDEX["right_ankle"]
 
-@dataclass
-class JointAngle:
-    """Represents a joint angle measurement."""
-    joint_name: str
-    angle: float
-    timestamp: float
-    frame_number: int
-    unit: str = "degrees"
+# Normalized coordinates to meters, assuming a 2m tall and 1.5m wide person
+# (depth is approximated with the width scale)
+POSITION_SCALE = np.array([1.5, 2.0, 1.5], dtype=np.float32)
 
-@dataclass
-class Velocity:
-    """Represents a velocity measurement."""
-    landmark_name: str
-    velocity_x: float
-    velocity_y: float
-    velocity_z: float
-    speed: float
-    timestamp: float
-    frame_number: int
-    unit: str = "m/s"
+# Record layouts of ServeMetrics.joint_angles (angles in degrees) and
+# ServeMetrics.velocities (m/s). Both are stored as np.recarray, so
+# ``metrics.joint_angles.angle`` is a column and ``metrics.joint_angles[i].angle``
+# a single record field.
+JOINT_ANGLE_DTYPE = np.dtype([
+    ("joint_name", "U32"),
+    ("angle", np.float32),
+    ("timestamp", np.float64),
+    ("frame_number", np.int64),
+])
+VELOCITY_DTYPE = np.dtype([
+    ("landmark_name", "U32"),
+    ("velocity_x", np.float32),
+    ("velocity_y", np.float32),
+    ("velocity_z", np.float32),
+    ("speed", np.float32),
+    ("timestamp", np.float64),
+    ("frame_number", np.int64),
+])
 
-@dataclass
+@dataclass(eq=False)
 class ServeMetrics:
     """Complete biomechanical metrics for a tennis serve."""
     serve_id: str
@@ -40,59 +62,130 @@ class ServeMetrics:
     ball_toss_height: float
     contact_point_height: float
     racket_speed_at_contact: float
-    joint_angles: List[JointAngle]
-    velocities: List[Velocity]
+    joint_angles: np.recarray  # JOINT_ANGLE_DTYPE records ordered by frame
+    velocities: np.recarray  # VELOCITY_DTYPE records ordered by frame
     timing_metrics: Dict[str, float]
     performance_score: float
 
+def performance_scores(
+    durations: np.ndarray,
+    max_speeds: np.ndarray,
+    max_shoulder_angles: np.ndarray
+) -> np.ndarray:
+    """
+    Score serves from 0 to 100, vectorized over any number of serves.
+    
+    Starting from 50, a serve gains 20 for a 2.5-3.5 s duration (10 for
+    2.0-4.0 s), 20 for a peak racket speed above 30 m/s (10 above 20 m/s)
+    and 10 for shoulder abduction above 150 degrees. NaN inputs score
+    nothing for that component.
+    
+    Args:
+        durations: Serve durations in seconds
+        max_speeds: Peak racket speed per serve in m/s
+        max_shoulder_angles: Peak shoulder abduction per serve in degrees
+    
+    Returns:
+        float64 array of scores, one per serve
+    """
+    duration = np.asarray(durations, dtype=np.float64)
+    speed = np.asarray(max_speeds, dtype=np.float64)
+    shoulder = np.asarray(max_shoulder_angles, dtype=np.float64)
+    
+    score = 50.0 + np.select(
+        [(duration >= 2.5) & (duration <= 3.5), (duration >= 2.0) & (duration <= 4.0)],
+        [20.0, 10.0],
+        0.0
+    )
+    score += np.select([speed > 30, speed > 20], [20.0, 10.0], 0.0)
+    score += np.where(shoulder > 150, 10.0, 0.0)
+    
+    return np.minimum(score, 100.0)
+
+
 class BiomechanicalCalculator:
     """Calculate biomechanical metrics from pose data."""
     
-    def __init__(self):
+    def __init__(self, min_visibility: float = 0.0):
         self.gravity = 9.81  # m/s²
-        
+        # Landmarks at or below this visibility are treated as missing
+        # (missing landmarks always have zero visibility)
+        self.min_visibility = min_visibility
+    
     def calculate_serve_metrics(
         self, 
-        pose_frames: List[PoseFrame],
+        pose_frames: Iterable[PoseFrame],
         serve_segment: Optional[Dict[str, Any]] = None
     ) -> ServeMetrics:
         """
         Calculate comprehensive biomechanical metrics for a tennis serve.
         
+        Frames are packed into a PoseSequence in a single pass, so
+        ``pose_frames`` may be a generator; all metrics are then computed
+        on the packed arrays.
+        
         Args:
-            pose_frames: List of pose frames for the serve
+            pose_frames: Iterable of pose frames for the serve
             serve_segment: Optional serve segment metadata
-            
+        
         Returns:
             ServeMetrics object with all calculated metrics
         """
-        console.print("[blue]Calculating biomechanical metrics...[/blue]")
-        
-        if not pose_frames:
+        sequence = pose_sequence_from_frames(pose_frames)
+        if len(sequence) == 0:
             raise ValueError("No pose frames provided")
         
-        # Calculate joint angles
-        joint_angles = self._calculate_joint_angles(pose_frames)
-        
-        # Calculate velocities
-        velocities = self._calculate_velocities(pose_frames)
+        # Joint angles, computed once and reused for the records and scoring
+        joints = self._joint_angle_arrays(sequence)
+        joint_angles = self._calculate_joint_angles(sequence, joints)
+        _, has_shoulder, shoulder_angles = joints[0]  # right_shoulder_abduction
+        max_shoulder_angle = float(shoulder_angles[has_shoulder].max()) if has_shoulder.any() else 0.0
+        
+        # Racket head velocity, computed once and reused for contact and scoring
+        wrist_velocity, wrist_speed = self._wrist_velocity(sequence)
+        velocities = self._calculate_velocities(sequence, wrist_velocity, wrist_speed)
+        racket_speed = 0.0
+        contact_timestamp = None
+        if not np.isnan(wrist_speed).all():
+            contact_idx = int(np.nanargmax(wrist_speed))
+            racket_speed = float(wrist_speed[contact_idx])
+            contact_timestamp = float(sequence.timestamps[contact_idx + 1])
+        
+        # Highest arm position (ball toss)
+        max_arm_height = 0.0
+        toss_timestamp = None
+        wrist_y = sequence.coords[:, RIGHT_WRIST, 1]
+        if not np.isnan(wrist_y).all():
+            # Convert normalized Y to height in meters (assuming 2m person height)
+            max_arm_height = max(max_arm_height, float((1 - np.nanmin(wrist_y)) * 2.0))
+            toss_idx = int(np.nanargmax(wrist_y))
+            if wrist_y[toss_idx] > 0:
+                toss_timestamp = float(sequence.timestamps[toss_idx])
+        
+        frame_count = len(sequence)
+        start_time = float(sequence.timestamps[0])
+        duration = float(sequence.timestamps[-1]) - start_time
         
         # Calculate timing metrics
-        timing_metrics = self._calculate_timing_metrics(pose_frames)
+        timing_metrics = {}
+        if frame_count >= 2:
+            timing_metrics = {
+                "total_duration": duration,
+                "ball_toss_time": toss_timestamp - start_time if toss_timestamp is not None else 0,
+                "contact_time": contact_timestamp - start_time if contact_timestamp is not None else 0,
+            }
         
         # Calculate serve-specific metrics
-        ball_toss_height = self._estimate_ball_toss_height(pose_frames)
-        contact_point_height = self._estimate_contact_point_height(pose_frames)
-        racket_speed = self._calculate_racket_speed(pose_frames)
+        ball_toss_height = max_arm_height
+        contact_point_height = max_arm_height  # Highest point of the serve motion
         
         # Calculate performance score
         performance_score = self._calculate_performance_score(
-            joint_angles, velocities, timing_metrics
+            max_shoulder_angle, racket_speed, timing_metrics
         )
         
         # Create serve metrics
         serve_id = serve_segment.get("serve_id", "serve_1") if serve_segment else "serve_1"
-        duration = pose_frames[-1].timestamp - pose_frames[0].timestamp
         
         metrics = ServeMetrics(
             serve_id=serve_id,
@@ -106,270 +199,233 @@ class BiomechanicalCalculator:
             performance_score=performance_score
         )
         
-        console.print(f"✅ Calculated metrics for {serve_id}")
         return metrics
     
-    def _calculate_joint_angles(self, pose_frames: List[PoseFrame]) -> List[JointAngle]:
-        """Calculate joint angles throughout the serve."""
-        joint_angles = []
-        
-        for frame in pose_frames:
-            # Shoulder abduction (right arm)
-            if all(name in frame.landmarks for name in ["right_shoulder", "right_elbow", "right_wrist"]):
-                angle = self._calculate_angle_3d(
-                    frame.landmarks["right_shoulder"],
-                    frame.landmarks["right_elbow"],
-                    frame.landmarks["right_wrist"]
-                )
-                joint_angles.append(JointAngle(
-                    joint_name="right_shoulder_abduction",
-                    angle=angle,
-                    timestamp=frame.timestamp,
-                    frame_number=frame.frame_number
-                ))
-            
-            # Elbow flexion (right arm)
-            if all(name in frame.landmarks for name in ["right_shoulder", "right_elbow", "right_wrist"]):
-                angle = self._calculate_angle_3d(
-                    frame.landmarks["right_shoulder"],
-                    frame.landmarks["right_elbow"],
-                    frame.landmarks["right_wrist"]
-                )
-                joint_angles.append(JointAngle(
-                    joint_name="right_elbow_flexion",
-                    angle=angle,
-                    timestamp=frame.timestamp,
-                    frame_number=frame.frame_number
-                ))
-            
-            # Hip flexion
-            if all(name in frame.landmarks for name in ["left_hip", "right_hip", "left_knee", "right_knee"]):
-                # Use average of left and right hip angles
-                left_angle = self._calculate_angle_3d(
-                    frame.landmarks["left_hip"],
-                    frame.landmarks["left_knee"],
-                    frame.landmarks["left_ankle"]
-                ) if "left_ankle" in frame.landmarks else 0
-                
-                right_angle = self._calculate_angle_3d(
-                    frame.landmarks["right_hip"],
-                    frame.landmarks["right_knee"],
-                    frame.landmarks["right_ankle"]
-                ) if "right_ankle" in frame.landmarks else 0
-                
-                avg_angle = (left_angle + right_angle) / 2
-                joint_angles.append(JointAngle(
-                    joint_name="hip_flexion",
-                    angle=avg_angle,
-                    timestamp=frame.timestamp,
-                    frame_number=frame.frame_number
-                ))
+    def _joint_angle_arrays(
+        self,
+        sequence: PoseSequence
+    ) -> List[Tuple[str, np.ndarray, np.ndarray]]:
+        """
+        Calculate joint angles for all frames in one batch.
         
-        return joint_angles
-    
-    def _calculate_velocities(self, pose_frames: List[PoseFrame]) -> List[Velocity]:
-        """Calculate velocities of key landmarks."""
-        velocities = []
-        
-        for i, frame in enumerate(pose_frames):
-            if i == 0:
-                continue  # Skip first frame (no previous frame to calculate velocity)
-            
-            prev_frame = pose_frames[i - 1]
-            dt = frame.timestamp - prev_frame.timestamp
-            
-            if dt <= 0:
-                continue
-            
-            # Calculate racket head velocity (approximated by right wrist)
-            if "right_wrist" in frame.landmarks and "right_wrist" in prev_frame.landmarks:
-                curr_pos = frame.landmarks["right_wrist"]
-                prev_pos = prev_frame.landmarks["right_wrist"]
-                
-                # Convert normalized coordinates to meters (approximate)
-                # Assuming 2m height and 1.5m width for the person
-                scale_x = 1.5  # meters
-                scale_y = 2.0  # meters
-                
-                dx = (curr_pos.x - prev_pos.x) * scale_x
-                dy = (curr_pos.y - prev_pos.y) * scale_y
-                dz = (curr_pos.z - prev_pos.z) * scale_x  # Approximate depth
-                
-                velocity_x = dx / dt
-                velocity_y = dy / dt
-                velocity_z = dz / dt
-                speed = np.sqrt(velocity_x**2 + velocity_y**2 + velocity_z**2)
-                
-                velocities.append(Velocity(
-                    landmark_name="right_wrist",
-                    velocity_x=velocity_x,
-                    velocity_y=velocity_y,
-                    velocity_z=velocity_z,
-                    speed=speed,
-                    timestamp=frame.timestamp,
-                    frame_number=frame.frame_number
-                ))
+        Args:
+            sequence: Packed pose frames of the serve
         
-        return velocities
-    
-    def _calculate_timing_metrics(self, pose_frames: List[PoseFrame]) -> Dict[str, float]:
-        """Calculate timing-related metrics."""
-        if len(pose_frames) < 2:
-            return {}
-        
-        # Find key events
-        ball_toss_frame = self._find_ball_toss_frame(pose_frames)
-        contact_frame = self._find_contact_frame(pose_frames)
-        
-        timing_metrics = {
-            "total_duration": pose_frames[-1].timestamp - pose_frames[0].timestamp,
-            "ball_toss_time": pose_frames[ball_toss_frame].timestamp - pose_frames[0].timestamp if ball_toss_frame is not None else 0,
-            "contact_time": pose_frames[contact_frame].timestamp - pose_frames[0].timestamp if contact_frame is not None else 0,
-        }
+        Returns:
+            List of (joint name, (F,) mask of frames that have the joint,
+            (F,) angle per frame) in record order
+        """
+        landmarks = sequence.landmarks
+        visible = sequence.visibility > self.min_visibility
+        
+        # Shoulder abduction: upper arm relative to the torso (hip-shoulder line)
+        has_shoulder = visible[:, RIGHT_HIP] & visible[:, RIGHT_SHOULDER] & visible[:, RIGHT_ELBOW]
+        shoulder_angles = angles_batch(
+            landmarks[:, RIGHT_HIP],
+            landmarks[:, RIGHT_SHOULDER],
+            landmarks[:, RIGHT_ELBOW]
+        )
+        
+        # Elbow flexion (right arm)
+        has_arm = visible[:, RIGHT_SHOULDER] & visible[:, RIGHT_ELBOW] & visible[:, RIGHT_WRIST]
+        elbow_angles = angles_batch(
+            landmarks[:, RIGHT_SHOULDER],
+            landmarks[:, RIGHT_ELBOW],
+            landmarks[:, RIGHT_WRIST]
+        )
         
-        return timing_metrics
+        # Hip flexion: average of left and right, 0 for a side without an ankle
+        has_hips = (
+            visible[:, LEFT_HIP] & visible[:, RIGHT_HIP]
+            & visible[:, LEFT_KNEE] & visible[:, RIGHT_KNEE]
+        )
+        left_angles = np.where(visible[:, LEFT_ANKLE], angles_batch(
+            landmarks[:, LEFT_HIP],
+            landmarks[:, LEFT_KNEE],
+            landmarks[:, LEFT_ANKLE]
+        ), 0.0)
+        right_angles = np.where(visible[:, RIGHT_ANKLE], angles_batch(
+            landmarks[:, RIGHT_HIP],
+            landmarks[:, RIGHT_KNEE],
+            landmarks[:, RIGHT_ANKLE]
+        ), 0.0)
+        hip_angles = (left_angles + right_angles) / 2
+        
+        return [
+            ("right_shoulder_abduction", has_shoulder, shoulder_angles),
+            ("right_elbow_flexion", has_arm, elbow_angles),
+            ("hip_flexion", has_hips, hip_angles),
+        ]
     
-    def _estimate_ball_toss_height(self, pose_frames: List[PoseFrame]) -> float:
-        """Estimate ball toss height based on arm position."""
-        # Find frame with highest arm position
-        max_arm_height = 0
-        for frame in pose_frames:
-            if "right_wrist" in frame.landmarks:
-                # Convert normalized Y to height in meters
-                height = (1 - frame.landmarks["right_wrist"].y) * 2.0  # Assuming 2m person height
-                max_arm_height = max(max_arm_height, height)
-        
-        return max_arm_height
+    def _calculate_joint_angles(
+        self,
+        sequence: PoseSequence,
+        joints: List[Tuple[str, np.ndarray, np.ndarray]]
+    ) -> np.recarray:
+        """
+        Build joint angle records from the joint angle arrays.
+        
+        Args:
+            sequence: Packed pose frames of the serve
+            joints: Joint table from ``_joint_angle_arrays``
+        
+        Returns:
+            JOINT_ANGLE_DTYPE records ordered by frame
+        """
+        # Gather (frame, joint) pairs that have an angle, ordered by frame and
+        # then by joint as listed above
+        rows = np.concatenate([np.flatnonzero(mask) for _, mask, _ in joints])
+        joint_ids = np.concatenate([
+            np.full(np.count_nonzero(mask), j) for j, (_, mask, _) in enumerate(joints)
+        ])
+        angles = np.concatenate([values[mask] for _, mask, values in joints])
+        order = np.lexsort((joint_ids, rows))
+        
+        names = np.array([name for name, _, _ in joints], dtype=JOINT_ANGLE_DTYPE["joint_name"])
+        rows = rows[order]
+        
+        joint_angles = np.recarray(len(rows), dtype=JOINT_ANGLE_DTYPE)
+        joint_angles.joint_name = names[joint_ids[order]]
+        joint_angles.angle = angles[order]
+        joint_angles.timestamp = sequence.timestamps[rows]
+        joint_angles.frame_number = sequence.frame_numbers[rows]
+        return joint_angles
     
-    def _estimate_contact_point_height(self, pose_frames: List[PoseFrame]) -> float:
-        """Estimate contact point height."""
-        # Use the highest point of the serve motion
-        return self._estimate_ball_toss_height(pose_frames)
+    def _wrist_velocity(self, sequence: PoseSequence) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Racket head velocity in m/s, approximated by the right wrist.
+        
+        Args:
+            sequence: Packed pose frames of the serve
+        
+        Returns:
+            Tuple of (velocity (F - 1, 3), speed (F - 1,)), NaN for frame
+            pairs with a missing wrist or a non-increasing timestamp
+        """
+        velocity = sequence.velocities[:, RIGHT_WRIST] * POSITION_SCALE
+        return velocity, np.linalg.norm(velocity, axis=1)
     
-    def _calculate_racket_speed(self, pose_frames: List[PoseFrame]) -> float:
-        """Calculate racket speed at contact point."""
-        velocities = self._calculate_velocities(pose_frames)
-        if not velocities:
-            return 0.0
-        
-        # Find maximum speed (likely at contact)
-        max_speed = max(v.speed for v in velocities)
-        return max_speed
+    def _calculate_velocities(
+        self,
+        sequence: PoseSequence,
+        velocity: np.ndarray,
+        speed: np.ndarray
+    ) -> np.recarray:
+        """
+        Build racket head velocity records from the wrist velocity arrays.
+        
+        Args:
+            sequence: Packed pose frames of the serve
+            velocity: (F - 1, 3) wrist velocity from ``_wrist_velocity``
+            speed: (F - 1,) wrist speed from ``_wrist_velocity``
+        
+        Returns:
+            VELOCITY_DTYPE records ordered by frame, skipping NaN frame pairs
+        """
+        valid = ~np.isnan(speed)
+        
+        velocities = np.recarray(np.count_nonzero(valid), dtype=VELOCITY_DTYPE)
+        velocities.landmark_name = "right_wrist"
+        velocities.velocity_x, velocities.velocity_y, velocities.velocity_z = velocity[valid].T
+        velocities.speed = speed[valid]
+        velocities.timestamp = sequence.timestamps[1:][valid]
+        velocities.frame_number = sequence.frame_numbers[1:][valid]
+        return velocities
     
     def _calculate_performance_score(
         self, 
-        joint_angles: List[JointAngle], 
-        velocities: List[Velocity], 
+        max_shoulder_angle: float, 
+        max_speed: float, 
         timing_metrics: Dict[str, float]
     ) -> float:
         """Calculate overall performance score (0-100)."""
-        score = 50.0  # Base score
-        
-        # Score based on timing consistency
-        if timing_metrics.get("total_duration", 0) > 0:
-            # Ideal serve duration is around 2.5-3.5 seconds
-            duration = timing_metrics["total_duration"]
-            if 2.5 <= duration <= 3.5:
-                score += 20
-            elif 2.0 <= duration <= 4.0:
-                score += 10
-        
-        # Score based on racket speed
-        if velocities:
-            max_speed = max(v.speed for v in velocities)
-            if max_speed > 30:  # m/s
-                score += 20
-            elif max_speed > 20:
-                score += 10
-        
-        # Score based on joint angle ranges
-        if joint_angles:
-            shoulder_angles = [ja.angle for ja in joint_angles if "shoulder" in ja.joint_name]
-            if shoulder_angles:
-                max_shoulder_angle = max(shoulder_angles)
-                if max_shoulder_angle > 150:  # Good shoulder extension
-                    score += 10
-        
-        return min(score, 100.0)
-    
-    def _calculate_angle_3d(self, p1: PoseLandmark, p2: PoseLandmark, p3: PoseLandmark) -> float:
-        """Calculate 3D angle between three points."""
-        # Convert to numpy arrays
-        v1 = np.array([p1.x - p2.x, p1.y - p2.y, p1.z - p2.z])
-        v2 = np.array([p3.x - p2.x, p3.y - p2.y, p3.z - p2.z])
-        
-        # Calculate angle
-        cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
-        cos_angle = np.clip(cos_angle, -1.0, 1.0)  # Clamp to valid range
-        angle = np.arccos(cos_angle)
-        
-        return np.degrees(angle)
-    
-    def _find_ball_toss_frame(self, pose_frames: List[PoseFrame]) -> Optional[int]:
-        """Find the frame where ball toss occurs."""
-        # Simple heuristic: find frame with highest arm position
-        max_height = 0
-        toss_frame = None
-        
-        for i, frame in enumerate(pose_frames):
-            if "right_wrist" in frame.landmarks:
-                height = frame.landmarks["right_wrist"].y
-                if height > max_height:
-                    max_height = height
-                    toss_frame = i
-        
-        return toss_frame
-    
-    def _find_contact_frame(self, pose_frames: List[PoseFrame]) -> Optional[int]:
-        """Find the frame where ball contact occurs."""
-        # Simple heuristic: find frame with highest racket speed
-        max_speed = 0
-        contact_frame = None
-        
-        velocities = self._calculate_velocities(pose_frames)
-        for v in velocities:
-            if v.speed > max_speed:
-                max_speed = v.speed
-                contact_frame = v.frame_number
-        
-        return contact_frame
+        return float(performance_scores(
+            [timing_metrics.get("total_duration", 0.0)], [max_speed], [max_shoulder_angle]
+        )[0])
     
     def save_metrics(self, metrics: ServeMetrics, output_path: Path):
-        """Save metrics to JSON file."""
-        data = {
+        """
+        Save metrics to a JSON file, or a compressed ``.npz`` file.
+        
+        Joint angles and velocities are stored column-wise (one array per
+        field) rather than as one object per record. The format follows
+        the suffix of ``output_path``.
+        
+        Args:
+            metrics: Metrics to save
+            output_path: Output file path ending in ``.json`` or ``.npz``
+        """
+        output_path = Path(output_path)
+        summary = {
             "serve_id": metrics.serve_id,
             "duration": metrics.duration,
             "ball_toss_height": metrics.ball_toss_height,
             "contact_point_height": metrics.contact_point_height,
             "racket_speed_at_contact": metrics.racket_speed_at_contact,
             "performance_score": metrics.performance_score,
-            "timing_metrics": metrics.timing_metrics,
-            "joint_angles": [
-                {
-                    "joint_name": ja.joint_name,
-                    "angle": ja.angle,
-                    "timestamp": ja.timestamp,
-                    "frame_number": ja.frame_number,
-                    "unit": ja.unit
-                }
-                for ja in metrics.joint_angles
-            ],
-            "velocities": [
-                {
-                    "landmark_name": v.landmark_name,
-                    "velocity_x": v.velocity_x,
-                    "velocity_y": v.velocity_y,
-                    "velocity_z": v.velocity_z,
-                    "speed": v.speed,
-                    "timestamp": v.timestamp,
-                    "frame_number": v.frame_number,
-                    "unit": v.unit
-                }
-                for v in metrics.velocities
-            ]
+            "timing_metrics": metrics.timing_metrics
+        }
+        angle_records = metrics.joint_angles
+        velocity_records = metrics.velocities
+        joint_angles = {
+            "names": angle_records.joint_name.tolist(),
+            "angles": np.ascontiguousarray(angle_records.angle),
+            "timestamps": np.ascontiguousarray(angle_records.timestamp),
+            "frames": np.ascontiguousarray(angle_records.frame_number),
+            "unit": "degrees"
+        }
+        velocities = {
+            "landmark_names": velocity_records.landmark_name.tolist(),
+            "velocity": np.stack((
+                velocity_records.velocity_x,
+                velocity_records.velocity_y,
+                velocity_records.velocity_z
+            ), axis=1),
+            "speeds": np.ascontiguousarray(velocity_records.speed),
+            "timestamps": np.ascontiguousarray(velocity_records.timestamp),
+            "frames": np.ascontiguousarray(velocity_records.frame_number),
+            "unit": "m/s"
         }
         
-        with open(output_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        if output_path.suffix == ".npz":
+            # Write through a file object so numpy does not append ".npz"
+            with open(output_path, 'wb') as f:
+                np.savez_compressed(
+                    f,
+                    summary=np.array(json.dumps(summary)),
+                    **{f"joint_angle_{key}": np.asarray(value) for key, value in joint_angles.items()},
+                    **{f"velocity_{key}": np.asarray(value) for key, value in velocities.items()}
+                )
+        else:
+            # Per-frame columns make up most of the file, so skip indentation
+            write_json(
+                {**summary, "joint_angles": joint_angles, "velocities": velocities},
+                output_path,
+                indent=False
+            )
         
         console.print(f"Saved metrics to {output_path}")
+
+
+@lru_cache(maxsize=64)
+def _load_and_compute(pose_path: str, mtime_ns: int) -> ServeMetrics:
+    """Load a pose file and compute its metrics; ``mtime_ns`` keys out stale entries."""
+    return BiomechanicalCalculator().calculate_serve_metrics(load_pose_frames(pose_path))
+
+
+def calculate_metrics_from_file(pose_path: Path) -> ServeMetrics:
+    """
+    Calculate serve metrics for a pose file saved with ``save_pose_frames``.
+    
+    Results are memoized per resolved path and modification time, so
+    repeated calls on an unchanged file skip loading and all of the math.
+    Each call returns its own copy, which callers may modify freely.
+    
+    Args:
+        pose_path: Path to ``.npz`` pose file
+    
+    Returns:
+        ServeMetrics for the whole pose sequence
+    """
+    pose_path = Path(pose_path).resolve()
+    return copy.deepcopy(_load_and_compute(str(pose_path), pose_path.stat().st_mtime_ns))
@@ -1,8 +1,6 @@
 """Joint angle calculation module for tennis serve analysis."""
 
-from rich.console import Console
-
-console = Console()
+from .._console import console
 
 class JointAngleCalculator:
     """Calculate joint angles from pose data."""
@@ -1,8 +1,6 @@
 """Timing analysis module for tennis serve analysis."""
 
-from rich.console import Console
-
-console = Console()
+from .._console import console
 
 class TimingAnalyzer:
     """Analyze timing metrics from pose data."""
@@ -1,8 +1,6 @@
 """Velocity analysis module for tennis serve analysis."""
 
-from rich.console import Console
-
-console = Console()
+from .._console import console
 
 class VelocityAnalyzer:
     """Analyze velocity metrics from pose data."""
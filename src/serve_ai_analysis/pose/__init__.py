@@ -2,25 +2,69 @@
 
 # Pose estimation functions
 from .pose_estimation import (
+    create_pose_estimator,
     estimate_pose_video,
+    estimate_pose_frame,
+    estimate_pose_video_iter,
+    estimate_pose_video_cached,
+    estimate_pose_video_array,
+    inference_size,
+    pose_frames_from_array,
+    empty_keypoints,
+    save_pose_frames,
+    load_pose_frames,
     filter_pose_frames_by_visibility,
+    filter_pose_array_by_visibility,
     get_landmark_position,
     calculate_landmark_distance,
     is_landmark_above,
     get_pose_stats,
+    pose_frames_to_array,
+    get_landmark_track,
+    pose_sequence_from_frames,
     PoseFrame,
+    PoseSequence,
     PoseLandmark,
-    LANDMARK_NAMES
+    LANDMARK_NAMES,
+    LANDMARK_INDEX,
+    POSE_BACKENDS,
+    VIDEO_DECODERS
 )
+from .geometry import angles_batch, distances_batch, velocities_batch
+from .drawing import draw_pose, POSE_CONNECTIONS, LANDMARK_STYLES
 
 __all__ = [
+    "create_pose_estimator",
     "estimate_pose_video",
+    "estimate_pose_frame",
+    "estimate_pose_video_iter",
+    "estimate_pose_video_cached",
+    "estimate_pose_video_array",
+    "inference_size",
+    "pose_frames_from_array",
+    "empty_keypoints",
+    "save_pose_frames",
+    "load_pose_frames",
     "filter_pose_frames_by_visibility",
+    "filter_pose_array_by_visibility",
     "get_landmark_position",
     "calculate_landmark_distance",
     "is_landmark_above",
     "get_pose_stats",
+    "pose_frames_to_array",
+    "get_landmark_track",
+    "pose_sequence_from_frames",
     "PoseFrame",
+    "PoseSequence",
     "PoseLandmark",
-    "LANDMARK_NAMES"
+    "LANDMARK_NAMES",
+    "LANDMARK_INDEX",
+    "POSE_BACKENDS",
+    "VIDEO_DECODERS",
+    "angles_batch",
+    "distances_batch",
+    "velocities_batch",
+    "draw_pose",
+    "POSE_CONNECTIONS",
+    "LANDMARK_STYLES"
 ]
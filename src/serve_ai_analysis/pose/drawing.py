@@ -0,0 +1,85 @@
+"""Pose landmark overlays for video frames."""
+
+import cv2
+import numpy as np
+
+from .pose_estimation import LANDMARK_INDEX
+
+
+# Skeleton edges between the serve-analysis landmarks
+POSE_CONNECTIONS = (
+    ('left_shoulder', 'right_shoulder'),
+    ('left_shoulder', 'left_elbow'),
+    ('left_elbow', 'left_wrist'),
+    ('right_shoulder', 'right_elbow'),
+    ('right_elbow', 'right_wrist'),
+    ('left_shoulder', 'left_hip'),
+    ('right_shoulder', 'right_hip'),
+    ('left_hip', 'right_hip'),
+    ('left_hip', 'left_knee'),
+    ('left_knee', 'left_ankle'),
+    ('right_hip', 'right_knee'),
+    ('right_knee', 'right_ankle')
+)
+
+# (K, 2) landmark rows of each connection in the packed landmark arrays
+_CONNECTION_ROWS = np.array([
+    (LANDMARK_INDEX[start], LANDMARK_INDEX[end]) for start, end in POSE_CONNECTIONS
+])
+
+LANDMARK_STYLES = ("points", "skeleton", "both")
+
+
+def draw_pose(
+    image: np.ndarray,
+    landmarks: np.ndarray,
+    min_visibility: float = 0.5,
+    style: str = "both",
+    line_color=(255, 0, 0),
+    point_color=(0, 255, 0),
+    thickness: int = 2,
+    point_radius: int = 4
+) -> np.ndarray:
+    """
+    Draw pose landmarks onto a frame in place.
+    
+    Pixel positions are computed for all landmarks at once, and the skeleton
+    and the points are each drawn with a single ``cv2.polylines`` call
+    (points as zero-length segments, which OpenCV draws with round caps).
+    
+    Args:
+        image: Frame to draw on (H, W, 3)
+        landmarks: (L, 4) normalized x, y, z, visibility rows in
+            ``LANDMARK_INDEX`` order, e.g. ``PoseFrame.landmarks``
+        min_visibility: Landmarks below this visibility are not drawn;
+            missing landmarks (zero visibility) never are
+        style: One of LANDMARK_STYLES
+        line_color: Skeleton color in the image's channel order
+        point_color: Landmark point color in the image's channel order
+        thickness: Skeleton line thickness in pixels
+        point_radius: Landmark point radius in pixels
+    
+    Returns:
+        The same image, for chaining
+    """
+    if style not in LANDMARK_STYLES:
+        raise ValueError(f"Unknown landmark style {style!r}, expected one of {LANDMARK_STYLES}")
+    
+    height, width = image.shape[:2]
+    # Missing landmarks are NaN with zero visibility
+    visible = (landmarks[:, 3] >= min_visibility) & (landmarks[:, 3] > 0)
+    points = np.rint(np.nan_to_num(landmarks[:, :2]) * (width, height)).astype(np.int32)
+    
+    if style != "points":
+        rows = _CONNECTION_ROWS[visible[_CONNECTION_ROWS].all(axis=1)]
+        if len(rows):
+            cv2.polylines(image, points[rows], False, line_color, thickness)
+    
+    if style != "skeleton" and visible.any():
+        dots = np.repeat(points[visible][:, None], 2, axis=1)
+        cv2.polylines(image, dots, False, point_color, 2 * point_radius)
+    
+    return image
+
+
+__all__ = ["draw_pose", "POSE_CONNECTIONS", "LANDMARK_STYLES"]
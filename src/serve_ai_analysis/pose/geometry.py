@@ -0,0 +1,162 @@
+"""Batched joint angle and landmark velocity kernels."""
+
+import math
+import numpy as np
+
+from .._jit import njit, NUMBA_AVAILABLE
+
+
+def _float_dtype(*arrays: np.ndarray) -> np.dtype:
+    """float32 if every input fits in float32, float64 otherwise."""
+    dtype = np.result_type(*arrays, np.float32)
+    return dtype if dtype == np.float32 else np.dtype(np.float64)
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _angles_jit(p1, p2, p3):
+    n = p1.shape[0]
+    out = np.empty(n, dtype=p1.dtype)
+    for i in range(n):
+        dot = 0.0
+        norm1 = 0.0
+        norm2 = 0.0
+        for k in range(3):
+            a = p1[i, k] - p2[i, k]
+            b = p3[i, k] - p2[i, k]
+            dot += a * b
+            norm1 += a * a
+            norm2 += b * b
+        cos_angle = dot / math.sqrt(norm1 * norm2)
+        if math.isnan(cos_angle):
+            out[i] = np.nan
+        else:
+            out[i] = math.degrees(math.acos(min(max(cos_angle, -1.0), 1.0)))
+    return out
+
+
+def _angles_numpy(p1: np.ndarray, p2: np.ndarray, p3: np.ndarray) -> np.ndarray:
+    v1 = p1[:, :3] - p2[:, :3]
+    v2 = p3[:, :3] - p2[:, :3]
+    
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cos_angle = np.einsum("ij,ij->i", v1, v2, optimize=True) / (
+            np.linalg.norm(v1, axis=1) * np.linalg.norm(v2, axis=1)
+        )
+    cos_angle = np.clip(cos_angle, -1.0, 1.0)  # Clamp to valid range
+    
+    return np.degrees(np.arccos(cos_angle))
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _velocities_jit(coords, timestamps):
+    n_frames, n_landmarks, n_dims = coords.shape
+    out = np.empty((max(n_frames - 1, 0), n_landmarks, n_dims), dtype=coords.dtype)
+    for i in range(n_frames - 1):
+        dt = timestamps[i + 1] - timestamps[i]
+        if dt <= 0:
+            out[i] = np.nan
+            continue
+        for j in range(n_landmarks):
+            for k in range(n_dims):
+                out[i, j, k] = (coords[i + 1, j, k] - coords[i, j, k]) / dt
+    return out
+
+
+def _velocities_numpy(coords: np.ndarray, timestamps: np.ndarray) -> np.ndarray:
+    dt = np.diff(timestamps).astype(coords.dtype)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        velocities = np.diff(coords, axis=0) / dt[:, None, None]
+    velocities[dt <= 0] = np.nan
+    return velocities
+
+
+@njit(cache=True, nogil=True, error_model="numpy")
+def _distances_jit(coords, pairs):
+    n_frames, _, n_dims = coords.shape
+    n_pairs = pairs.shape[0]
+    out = np.empty((n_frames, n_pairs), dtype=coords.dtype)
+    for i in range(n_frames):
+        for p in range(n_pairs):
+            a = pairs[p, 0]
+            b = pairs[p, 1]
+            total = 0.0
+            for k in range(n_dims):
+                d = coords[i, a, k] - coords[i, b, k]
+                total += d * d
+            out[i, p] = math.sqrt(total)
+    return out
+
+
+def _distances_numpy(coords: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+    diff = coords[:, pairs[:, 0]] - coords[:, pairs[:, 1]]
+    return np.sqrt(np.einsum("fkd,fkd->fk", diff, diff, optimize=True))
+
+
+def angles_batch(p1: np.ndarray, p2: np.ndarray, p3: np.ndarray) -> np.ndarray:
+    """
+    Calculate 3D angles at ``p2`` for stacked landmark rows.
+    
+    Only the first three columns (x, y, z) are used, so (N, 4) landmark
+    rows can be passed directly. Uses a compiled kernel when Numba is
+    installed. float32 input stays float32; anything else is computed in
+    float64.
+    
+    Args:
+        p1: (N, >=3) rows of the first landmark
+        p2: (N, >=3) rows of the joint landmark
+        p3: (N, >=3) rows of the third landmark
+    
+    Returns:
+        (N,) angles in degrees, NaN where a landmark is missing
+    """
+    dtype = _float_dtype(p1, p2, p3)
+    p1, p2, p3 = (np.asarray(p, dtype=dtype) for p in (p1, p2, p3))
+    
+    if NUMBA_AVAILABLE:
+        return _angles_jit(p1, p2, p3)
+    return _angles_numpy(p1, p2, p3)
+
+
+def distances_batch(coords: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+    """
+    Calculate distances between landmark pairs in every frame.
+    
+    Uses a compiled kernel when Numba is installed, which avoids the
+    (F, K, D) temporaries of fancy indexing. float32 coordinates stay
+    float32; anything else is computed in float64.
+    
+    Args:
+        coords: (F, L, D) landmark coordinates
+        pairs: (K, 2) landmark row indices, e.g. from ``LANDMARK_INDEX``
+    
+    Returns:
+        (F, K) Euclidean distances, NaN where either landmark is missing
+    """
+    coords = np.asarray(coords, dtype=_float_dtype(coords))
+    pairs = np.ascontiguousarray(pairs, dtype=np.intp).reshape(-1, 2)
+    
+    if NUMBA_AVAILABLE:
+        return _distances_jit(coords, pairs)
+    return _distances_numpy(coords, pairs)
+
+
+def velocities_batch(coords: np.ndarray, timestamps: np.ndarray) -> np.ndarray:
+    """
+    Calculate landmark velocities between consecutive frames.
+    
+    Uses a compiled kernel when Numba is installed. float32 coordinates
+    stay float32; anything else is computed in float64.
+    
+    Args:
+        coords: (F, L, D) landmark coordinates
+        timestamps: (F,) frame timestamps in seconds
+    
+    Returns:
+        (F - 1, L, D) velocities in coordinate units per second, NaN where
+        either landmark is missing or the timestamps do not increase
+    """
+    coords = np.asarray(coords, dtype=_float_dtype(coords))
+    
+    if NUMBA_AVAILABLE:
+        return _velocities_jit(coords, np.ascontiguousarray(timestamps, dtype=np.float64))
+    return _velocities_numpy(coords, timestamps)
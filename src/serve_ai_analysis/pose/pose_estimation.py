@@ -1,11 +1,30 @@
 """Pose estimation module for tennis serve analysis."""
 
-import mediapipe as mp
+import io
+import json
+import queue
+import threading
+import time
 import cv2
 import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from functools import cached_property
+from itertools import chain
+from operator import attrgetter
+from typing import Iterable, Iterator, List, Dict, Optional, Sized, Tuple, Union
 from pathlib import Path
+from types import SimpleNamespace
+
+from .._queues import queue_put
+from .geometry import distances_batch, velocities_batch
+
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
 
 
 @dataclass
@@ -17,14 +36,6 @@ class PoseLandmark:
     visibility: float
 
 
-@dataclass
-class PoseFrame:
-    """Represents pose data for a single frame."""
-    frame_idx: int
-    landmarks: Dict[str, PoseLandmark]
-    timestamp: float
-
-
 # MediaPipe landmark names for serve analysis
 LANDMARK_NAMES = {
     'nose': 0,
@@ -42,92 +53,884 @@ LANDMARK_NAMES = {
     'right_ankle': 28
 }
 
+# Row of each landmark in the packed per-frame arrays
+LANDMARK_INDEX = {name: i for i, name in enumerate(LANDMARK_NAMES)}
 
-def estimate_pose_video(
-    video_path: str,
+# MediaPipe landmark ids in LANDMARK_INDEX order
+_MEDIAPIPE_IDS = list(LANDMARK_NAMES.values())
+
+# Reads the packed columns from a MediaPipe landmark in one call
+_LANDMARK_FIELDS = attrgetter('x', 'y', 'z', 'visibility')
+
+# Pair passed to distances_batch by calculate_landmark_distance
+_SINGLE_PAIR = np.array([[0, 1]])
+
+# Fewest visible landmarks for a usable pose (at least nose, shoulders and
+# wrists); shared by every estimation path so they keep the same frames
+MIN_POSE_LANDMARKS = 5
+
+# Inference backends accepted by create_pose_estimator
+POSE_BACKENDS = ("cpu", "gpu")
+
+# Frame decoders accepted by estimate_pose_video_iter
+VIDEO_DECODERS = ("opencv", "pyav")
+
+
+def _empty_landmarks() -> np.ndarray:
+    """Create a (L, 4) landmark array with every landmark missing."""
+    landmarks = np.full((len(LANDMARK_INDEX), 4), np.nan, dtype=np.float32)
+    landmarks[:, 3] = 0.0
+    return landmarks
+
+
+@dataclass(eq=False)
+class PoseFrame:
+    """
+    Represents pose data for a single frame.
+    
+    ``landmarks`` is a float32 (L, 4) array of x, y, z, visibility with rows
+    in ``LANDMARK_INDEX`` order; missing landmarks are NaN with zero
+    visibility. A ``{name: PoseLandmark}`` dict is accepted and packed.
+    """
+    frame_idx: int
+    landmarks: Union[np.ndarray, Dict[str, PoseLandmark]]
+    timestamp: float
+    
+    def __post_init__(self):
+        if isinstance(self.landmarks, dict):
+            packed = _empty_landmarks()
+            for name, landmark in self.landmarks.items():
+                packed[LANDMARK_INDEX[name]] = (
+                    landmark.x, landmark.y, landmark.z, landmark.visibility
+                )
+            self.landmarks = packed
+    
+    def landmark(self, name: str) -> np.ndarray:
+        """(4,) x, y, z, visibility view of a landmark's row (NaN if missing)."""
+        return self.landmarks[LANDMARK_INDEX[name]]
+
+
+@dataclass(eq=False)
+class PoseSequence:
+    """
+    Pose frames packed into frame-major arrays.
+    
+    Row ``i`` describes the ``i``-th frame: ``landmarks`` is a float32
+    (F, L, 4) array of x, y, z, visibility in ``LANDMARK_INDEX`` order,
+    ``timestamps`` is float64 (F,) and ``frame_numbers`` is int64 (F,).
+    """
+    landmarks: np.ndarray
+    timestamps: np.ndarray
+    frame_numbers: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    @property
+    def coords(self) -> np.ndarray:
+        """(F, L, 3) view of the x, y, z coordinates."""
+        return self.landmarks[..., :3]
+    
+    @property
+    def visibility(self) -> np.ndarray:
+        """(F, L) view of the landmark visibilities."""
+        return self.landmarks[..., 3]
+    
+    @cached_property
+    def velocities(self) -> np.ndarray:
+        """
+        (F - 1, L, 3) landmark velocities between consecutive frames.
+        
+        Row ``i`` is the float32 velocity from frame ``i`` to ``i + 1`` in
+        normalized units per second, NaN where either landmark is missing or
+        the timestamps do not increase. Computed once and cached.
+        """
+        return velocities_batch(self.coords, self.timestamps)
+
+
+def empty_keypoints(n_frames: int) -> np.ndarray:
+    """
+    Create an (N, L, 4) keypoint array with every landmark missing.
+    
+    Row ``i`` holds the landmarks of frame ``i``, in ``LANDMARK_INDEX``
+    order, as x, y, z, visibility.
+    
+    Args:
+        n_frames: Number of frames
+    
+    Returns:
+        float32 array of NaN coordinates with zero visibility
+    """
+    keypoints = np.full((n_frames, len(LANDMARK_INDEX), 4), np.nan, dtype=np.float32)
+    keypoints[..., 3] = 0.0
+    return keypoints
+
+
+def _pose_roi(
+    points: np.ndarray,
+    width: int,
+    height: int,
+    padding: float
+) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Padded pixel bounding box around normalized full-frame landmarks.
+    
+    Args:
+        points: (K, 2+) array of normalized x, y landmark coordinates
+        width: Frame width in pixels
+        height: Frame height in pixels
+        padding: Padding as a fraction of the box size on each side
+    
+    Returns:
+        (x0, y0, x1, y1) in pixels, or None if the box is degenerate
+    """
+    x_min, y_min = points[:, :2].min(axis=0)
+    x_max, y_max = points[:, :2].max(axis=0)
+    pad_x = (x_max - x_min) * padding
+    pad_y = (y_max - y_min) * padding
+    
+    x0 = max(0, int((x_min - pad_x) * width))
+    y0 = max(0, int((y_min - pad_y) * height))
+    x1 = min(width, int(np.ceil((x_max + pad_x) * width)))
+    y1 = min(height, int(np.ceil((y_max + pad_y) * height)))
+    
+    if x1 - x0 < 32 or y1 - y0 < 32:
+        return None
+    
+    return x0, y0, x1, y1
+
+
+def _results_to_points(results) -> np.ndarray:
+    """
+    Convert MediaPipe pose results to an (L, 4) x/y/z/visibility array.
+    
+    Only the serve-analysis landmarks are read, in ``LANDMARK_INDEX`` order,
+    so the other MediaPipe landmarks are never touched.
+    """
+    landmarks = results.pose_landmarks.landmark
+    # Stream the values straight into one buffer; map/attrgetter/chain keep
+    # the per-landmark field reads out of the Python bytecode loop
+    values = chain.from_iterable(
+        map(_LANDMARK_FIELDS, map(landmarks.__getitem__, _MEDIAPIPE_IDS))
+    )
+    return np.fromiter(
+        values, dtype=np.float32, count=4 * len(_MEDIAPIPE_IDS)
+    ).reshape(-1, 4)
+
+
+def _select_landmarks(
+    points: np.ndarray,
+    confidence_threshold: float
+) -> Tuple[np.ndarray, int]:
+    """Keep only sufficiently visible landmarks of ``_results_to_points`` output."""
+    landmarks = _empty_landmarks()
+    visible = points[:, 3] >= confidence_threshold
+    landmarks[visible] = points[visible]
+    return landmarks, int(visible.sum())
+
+
+def estimate_pose_frame(
+    pose,
+    rgb_frame: np.ndarray,
+    frame_idx: int,
+    timestamp: float,
+    confidence_threshold: float = 0.5
+) -> Optional[PoseFrame]:
+    """
+    Estimate pose for a single decoded frame.
+    
+    Lets a caller that already decodes the video drive pose estimation
+    frame by frame, e.g. alongside ball detection.
+    
+    Args:
+        pose: Estimator from create_pose_estimator
+        rgb_frame: Frame in RGB channel order
+        frame_idx: Index of the frame in the video
+        timestamp: Frame timestamp in seconds
+        confidence_threshold: Minimum landmark visibility to keep
+    
+    Returns:
+        PoseFrame, or None if too few landmarks were found
+    """
+    # MediaPipe copies strided input (e.g. a crop) itself; making the copy
+    # here is cheaper, and a no-op for frames that are already contiguous
+    results = pose.process(np.ascontiguousarray(rgb_frame))
+    if not results.pose_landmarks:
+        return None
+    
+    landmarks, n_landmarks = _select_landmarks(
+        _results_to_points(results), confidence_threshold
+    )
+    
+    # Only keep frames with key landmarks for serve detection
+    if n_landmarks < MIN_POSE_LANDMARKS:
+        return None
+    
+    return PoseFrame(frame_idx=frame_idx, landmarks=landmarks, timestamp=timestamp)
+
+
+class _TasksPoseEstimator:
+    """
+    MediaPipe Tasks ``PoseLandmarker`` behind the legacy ``Pose`` interface.
+    
+    ``process`` returns results in the legacy ``pose_landmarks.landmark``
+    layout, so the estimation loops work with either backend.
+    """
+    
+    # VIDEO mode only needs increasing timestamps; use a nominal 30 fps step
+    _FRAME_INTERVAL_MS = 33
+    
+    def __init__(self, options, static_image_mode: bool):
+        import mediapipe as mp
+        
+        self._mp = mp
+        self._options = options
+        self._static_image_mode = static_image_mode
+        self._landmarker = None
+        self._timestamp_ms = 0
+    
+    def process(self, rgb_frame: np.ndarray):
+        if self._landmarker is None:
+            from mediapipe.tasks.python import vision
+            self._landmarker = vision.PoseLandmarker.create_from_options(self._options)
+        
+        mp = self._mp
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb_frame))
+        if self._static_image_mode:
+            result = self._landmarker.detect(image)
+        else:
+            result = self._landmarker.detect_for_video(image, self._timestamp_ms)
+            self._timestamp_ms += self._FRAME_INTERVAL_MS
+        
+        if not result.pose_landmarks:
+            return SimpleNamespace(pose_landmarks=None)
+        return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=result.pose_landmarks[0]))
+    
+    def reset(self):
+        # The Tasks API has no reset, so tracking state is dropped by
+        # creating a new landmarker on the next frame
+        self.close()
+    
+    def close(self):
+        if self._landmarker is not None:
+            self._landmarker.close()
+            self._landmarker = None
+
+
+def create_pose_estimator(
     confidence_threshold: float = 0.5,
-    model_complexity: int = 1
-) -> List[PoseFrame]:
+    model_complexity: int = 1,
+    static_image_mode: bool = False,
+    min_tracking_confidence: Optional[float] = None,
+    backend: str = "cpu",
+    model_asset_path: Optional[str] = None
+):
     """
-    Estimate pose from video using MediaPipe.
+    Create a MediaPipe Pose estimator that can be reused across videos.
+    
+    The caller owns the estimator and should ``close()`` it when done.
+    
+    ``model_complexity`` defaults to the full model. The heavy model (2)
+    roughly doubles inference cost for little gain on serve footage, where
+    the player fills much of the frame; it is best kept for the GPU backend
+    or offline runs.
+    
+    The ``cpu`` backend uses the legacy Pose solution, which always runs on
+    the CPU. The ``gpu`` backend runs a Tasks API ``PoseLandmarker`` on the
+    GPU delegate, which frees the CPU for decoding; it needs a
+    ``pose_landmarker_*.task`` model file, whose variant (lite, full or
+    heavy) takes the place of ``model_complexity``. Resetting a GPU
+    estimator recreates its landmarker, which makes ROI tracking costlier.
     
     Args:
-        video_path: Path to input video
         confidence_threshold: Minimum confidence for landmark detection
-        model_complexity: MediaPipe model complexity (0, 1, 2)
+        model_complexity: MediaPipe model complexity (0=lite, 1=full, 2=heavy)
+        static_image_mode: Run full detection on every frame instead of
+            tracking landmarks between frames
+        min_tracking_confidence: Minimum tracking confidence before falling
+            back to detection (defaults to confidence_threshold)
+        backend: One of POSE_BACKENDS
+        model_asset_path: Path to a PoseLandmarker ``.task`` model, required
+            for the ``gpu`` backend
     
     Returns:
-        List of pose frames with landmarks
+        MediaPipe Pose estimator
     """
-    video_path = Path(video_path)
-    if not video_path.exists():
-        raise FileNotFoundError(f"Video file not found: {video_path}")
+    if backend not in POSE_BACKENDS:
+        raise ValueError(f"Unknown pose backend {backend!r}, expected one of {POSE_BACKENDS}")
+    
+    if min_tracking_confidence is None:
+        min_tracking_confidence = confidence_threshold
+    
+    if backend == "gpu":
+        if model_asset_path is None:
+            raise ValueError("The gpu pose backend needs a PoseLandmarker model_asset_path")
+        
+        from mediapipe.tasks.python import BaseOptions, vision
+        options = vision.PoseLandmarkerOptions(
+            base_options=BaseOptions(
+                model_asset_path=str(model_asset_path),
+                delegate=BaseOptions.Delegate.GPU
+            ),
+            running_mode=(
+                vision.RunningMode.IMAGE if static_image_mode else vision.RunningMode.VIDEO
+            ),
+            num_poses=1,
+            min_pose_detection_confidence=confidence_threshold,
+            min_pose_presence_confidence=confidence_threshold,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        return _TasksPoseEstimator(options, static_image_mode)
+    
+    # MediaPipe takes about half a second to import, so it is only loaded
+    # once an estimator is needed (loading saved poses does not need it)
+    import mediapipe as mp
     
-    # Initialize MediaPipe Pose
-    mp_pose = mp.solutions.pose
-    pose = mp_pose.Pose(
-        static_image_mode=False,
+    return mp.solutions.pose.Pose(
+        static_image_mode=static_image_mode,
         model_complexity=model_complexity,
         smooth_landmarks=True,
         enable_segmentation=False,
         smooth_segmentation=True,
         min_detection_confidence=confidence_threshold,
-        min_tracking_confidence=confidence_threshold
+        min_tracking_confidence=min_tracking_confidence
     )
+
+
+def inference_size(width: int, height: int, max_side: Optional[int]) -> Tuple[int, int]:
+    """
+    Size to scale a frame to before pose inference.
     
-    cap = cv2.VideoCapture(str(video_path))
-    if not cap.isOpened():
-        raise ValueError(f"Could not open video: {video_path}")
+    MediaPipe resizes its input to the model's small resolution anyway, so
+    frames larger than ``max_side`` on their longer side are scaled down
+    first, which cuts the memory copied into the graph per frame. Landmarks
+    are normalized to the frame, so they need no rescaling.
+    
+    Args:
+        width: Frame width in pixels
+        height: Frame height in pixels
+        max_side: Largest allowed longer side, or None to keep every frame
+    
+    Returns:
+        (width, height) to run inference at
+    """
+    longest = max(width, height)
+    if max_side is None or longest <= max_side:
+        return width, height
+    scale = max_side / longest
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _opencv_frames(cap: cv2.VideoCapture, frame_stride: int) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yield (frame_idx, BGR frame) for every ``frame_stride``-th frame.
     
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    pose_frames = []
+    Frames in between are grabbed without being decoded into an image, and
+    every frame is decoded into the same reused buffer.
+    """
     frame_idx = 0
+    bgr_frame = None
+    while True:
+        if frame_idx % frame_stride:
+            if not cap.grab():
+                return
+        else:
+            ret, bgr_frame = cap.read(bgr_frame)
+            if not ret:
+                return
+            yield frame_idx, bgr_frame
+        frame_idx += 1
+
+
+def _pyav_frames(container, frame_stride: int) -> Iterator[Tuple[int, "av.VideoFrame"]]:
+    """Yield (frame_idx, PyAV frame) for every ``frame_stride``-th frame, not yet converted to an array."""
+    for frame_idx, frame in enumerate(container.decode(video=0)):
+        if frame_idx % frame_stride == 0:
+            yield frame_idx, frame
+
+
+def _process_parallel(frames: queue.Queue, poses: list) -> Iterator[Tuple[int, object]]:
+    """
+    Run queued frames through a pool of estimators, yielding results in frame order.
+    
+    Each estimator is used by one thread at a time. Results are collected
+    from a FIFO of pending futures, so they come out in submission order
+    however the workers finish; at most two frames per worker are in flight.
+    
+    Args:
+        frames: Queue of (frame_idx, timestamp, rgb_frame) items ending with None
+        poses: Estimators to share between the worker threads
+    
+    Yields:
+        (frame_idx, timestamp, results) tuples
+    """
+    idle = queue.SimpleQueue()
+    for pose in poses:
+        idle.put(pose)
+    
+    def process(rgb_frame):
+        pose = idle.get()
+        try:
+            return pose.process(rgb_frame)
+        finally:
+            idle.put(pose)
+    
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=len(poses)) as executor:
+        while True:
+            item = frames.get()
+            if item is None:
+                break
+            frame_idx, timestamp, rgb_frame = item
+            pending.append((frame_idx, timestamp, executor.submit(process, rgb_frame)))
+            if len(pending) >= 2 * len(poses):
+                frame_idx, timestamp, future = pending.popleft()
+                yield frame_idx, timestamp, future.result()
+        
+        while pending:
+            frame_idx, timestamp, future = pending.popleft()
+            yield frame_idx, timestamp, future.result()
+
+
+def estimate_pose_video_iter(
+    video_path: str,
+    confidence_threshold: float = 0.5,
+    model_complexity: int = 1,
+    static_image_mode: bool = False,
+    min_tracking_confidence: Optional[float] = None,
+    roi_tracking: bool = False,
+    roi_padding: float = 0.2,
+    roi_refresh_interval: int = 30,
+    frame_stride: int = 1,
+    prefetch: int = 8,
+    realtime: bool = False,
+    decoder: str = "opencv",
+    inference_max_side: Optional[int] = 1280,
+    workers: int = 1,
+    pose=None
+) -> Iterator[PoseFrame]:
+    """
+    Estimate pose from video using MediaPipe, yielding frames as they are decoded.
+    
+    A decoder thread reads and converts frames into a bounded queue, so
+    decoding the next frames overlaps inference on the current one. The
+    ``pyav`` decoder has FFmpeg convert frames straight to RGB, saving the
+    BGR image and the separate ``cvtColor`` pass per frame; it needs the
+    optional ``av`` package and falls back to OpenCV without it.
+    
+    With ``roi_tracking`` enabled, frames are cropped to a padded box around
+    the landmarks of the last full-frame pass before inference, which shrinks
+    the model input. The full frame is used again every
+    ``roi_refresh_interval`` frames and whenever the player is lost in the crop.
+    
+    With ``workers`` above one, a pool of estimators runs on worker threads
+    (MediaPipe releases the GIL while a graph runs) and results are put back
+    in frame order. Frames then no longer share tracking state, so each
+    estimator runs in static image mode; ROI tracking and a reused ``pose``
+    are not supported in this mode.
+    
+    Args:
+        video_path: Path to input video
+        confidence_threshold: Minimum confidence for landmark detection
+        model_complexity: MediaPipe model complexity (0=lite, 1=full, 2=heavy)
+        static_image_mode: Run full detection on every frame instead of
+            tracking landmarks between frames
+        min_tracking_confidence: Minimum tracking confidence before falling
+            back to detection (defaults to confidence_threshold)
+        roi_tracking: Crop frames to the tracked player region
+        roi_padding: Padding around the player box, as a fraction of its size
+        roi_refresh_interval: Frames between full-frame re-detections
+        frame_stride: Run the estimator on every Nth frame; the frames in
+            between are never converted to images (nor decoded, with OpenCV)
+        prefetch: Maximum decoded frames buffered ahead of the estimator
+        realtime: Treat ``video_path`` as a live source (camera device or
+            stream URL): keep the capture buffer at one frame, drop frames
+            instead of queueing them when the estimator falls behind, and
+            stamp frames with their capture time since the first frame
+        decoder: One of VIDEO_DECODERS
+        inference_max_side: Scale frames down so their longer side is at
+            most this many pixels before inference (None keeps full size)
+        workers: Number of estimators to run concurrently; above one, frames
+            are processed independently in static image mode
+        pose: Estimator from create_pose_estimator to reuse instead of
+            loading a new model; its own detection settings apply and it is
+            left open
+    
+    Yields:
+        Pose frames with landmarks
+    """
+    if frame_stride < 1:
+        raise ValueError(f"frame_stride must be at least 1, got {frame_stride}")
+    if decoder not in VIDEO_DECODERS:
+        raise ValueError(f"Unknown decoder {decoder!r}, expected one of {VIDEO_DECODERS}")
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if workers > 1 and (roi_tracking or pose is not None):
+        raise ValueError("Parallel pose estimation does not support roi_tracking or a reused pose")
+    
+    if not realtime:
+        video_path = Path(video_path)
+        if not video_path.exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+    
+    use_pyav = decoder == "pyav" and AV_AVAILABLE
+    if use_pyav:
+        try:
+            container = av.open(str(video_path))
+        except av.error.FFmpegError as exc:
+            raise ValueError(f"Could not open video: {video_path}") from exc
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        fps = float(stream.average_rate or 0)
+        source = _pyav_frames(container, frame_stride)
+        close_source = container.close
+    else:
+        cap = cv2.VideoCapture(str(video_path))
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+        
+        if realtime:
+            # Live captures buffer several frames by default, so every frame
+            # read would already be stale; not all backends support changing this
+            try:
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            except cv2.error:
+                pass
+        
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        source = _opencv_frames(cap, frame_stride)
+        close_source = cap.release
+    
+    # Files without a usable frame rate get a nominal 30 fps timeline
+    if fps <= 0:
+        fps = 30.0
+    
+    # Initialize MediaPipe Pose, or clear a reused estimator's tracking state
+    owns_pose = pose is None
+    poses = []
+    if workers > 1:
+        poses = [
+            create_pose_estimator(
+                confidence_threshold=confidence_threshold,
+                model_complexity=model_complexity,
+                static_image_mode=True,
+                min_tracking_confidence=min_tracking_confidence
+            )
+            for _ in range(workers)
+        ]
+    elif owns_pose:
+        pose = create_pose_estimator(
+            confidence_threshold=confidence_threshold,
+            model_complexity=model_complexity,
+            static_image_mode=static_image_mode,
+            min_tracking_confidence=min_tracking_confidence
+        )
+    else:
+        pose.reset()
+    
+    roi = None
+    last_full_frame = 0
+    frames = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    errors = []
+    
+    # Converted frames go into a ring of reused buffers: one per queued
+    # frame, plus the ones being processed and the one being written
+    in_flight = 2 * workers if workers > 1 else 1
+    rgb_ring = [None] * (prefetch + in_flight + 1)
+    
+    def decode():
+        try:
+            slot = 0
+            small_frame = None
+            start_time = None
+            for frame_idx, frame in source:
+                if stop.is_set():
+                    break
+                
+                # Live sources keep moving, so a backlog is dropped rather
+                # than processed late
+                if realtime and frames.full():
+                    continue
+                
+                # Live sources often report no frame rate (and dropped frames
+                # would skew one), so they are stamped at capture time
+                if realtime:
+                    now = time.monotonic()
+                    if start_time is None:
+                        start_time = now
+                    timestamp = now - start_time
+                else:
+                    timestamp = frame_idx / fps
+                
+                if use_pyav:
+                    # FFmpeg scales and converts to RGB in a single pass
+                    width, height = inference_size(frame.width, frame.height, inference_max_side)
+                    rgb_frame = frame.to_ndarray(format="rgb24", width=width, height=height)
+                    # Rows padded to the frame's line size come back as a strided view
+                    rgb_frame = np.ascontiguousarray(rgb_frame)
+                else:
+                    height, width = frame.shape[:2]
+                    size = inference_size(width, height, inference_max_side)
+                    if size != (width, height):
+                        # Scale down first so the color conversion runs on fewer pixels
+                        small_frame = cv2.resize(
+                            frame, size, dst=small_frame, interpolation=cv2.INTER_AREA
+                        )
+                        frame = small_frame
+                    
+                    # Convert BGR to RGB (buffers are allocated on first use)
+                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_ring[slot])
+                    rgb_ring[slot] = rgb_frame
+                    slot = (slot + 1) % len(rgb_ring)
+                if not queue_put(frames, (frame_idx, timestamp, rgb_frame), stop):
+                    return
+        except BaseException as exc:
+            errors.append(exc)
+        queue_put(frames, None, stop)
+    
+    # Decoding runs ahead on its own thread (OpenCV releases the GIL) while
+    # MediaPipe, whose graph is stateful, stays on the consuming thread
+    decode_thread = threading.Thread(target=decode, daemon=True)
+    decode_thread.start()
     
     try:
+        if poses:
+            for frame_idx, timestamp, results in _process_parallel(frames, poses):
+                if results.pose_landmarks:
+                    landmarks, n_landmarks = _select_landmarks(
+                        _results_to_points(results), confidence_threshold
+                    )
+                    if n_landmarks >= MIN_POSE_LANDMARKS:
+                        yield PoseFrame(
+                            frame_idx=frame_idx,
+                            landmarks=landmarks,
+                            timestamp=timestamp
+                        )
+            if errors:
+                raise errors[0]
+            return
+        
         while True:
-            ret, frame = cap.read()
-            if not ret:
+            item = frames.get()
+            if item is None:
+                if errors:
+                    raise errors[0]
                 break
+            frame_idx, timestamp, rgb_frame = item
+            height, width = rgb_frame.shape[:2]
             
-            # Convert BGR to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Process frame
-            results = pose.process(rgb_frame)
+            # Process the player region found by the last full-frame pass,
+            # or the full frame. The graph is reset whenever the input region
+            # changes so MediaPipe's tracking and smoothing state stay in the
+            # coordinates of a single crop.
+            if roi is not None and frame_idx - last_full_frame < roi_refresh_interval:
+                x0, y0, x1, y1 = roi
+                results = pose.process(np.ascontiguousarray(rgb_frame[y0:y1, x0:x1]))
+            else:
+                if roi is not None:
+                    pose.reset()
+                    roi = None
+                results = pose.process(rgb_frame)
+                last_full_frame = frame_idx
             
             if results.pose_landmarks:
-                landmarks = {}
+                points = _results_to_points(results)
+                
+                # Map crop-normalized coordinates back to the full frame
+                if roi is not None:
+                    x0, y0, x1, y1 = roi
+                    points[:, 0] = (points[:, 0] * (x1 - x0) + x0) / width
+                    points[:, 1] = (points[:, 1] * (y1 - y0) + y0) / height
+                    points[:, 2] *= (x1 - x0) / width
                 
-                # Extract landmarks for serve analysis
-                for name, landmark_id in LANDMARK_NAMES.items():
-                    if landmark_id < len(results.pose_landmarks.landmark):
-                        landmark = results.pose_landmarks.landmark[landmark_id]
-                        
-                        # Only include landmarks with sufficient visibility
-                        if landmark.visibility >= confidence_threshold:
-                            landmarks[name] = PoseLandmark(
-                                x=landmark.x,
-                                y=landmark.y,
-                                z=landmark.z,
-                                visibility=landmark.visibility
-                            )
+                landmarks, n_landmarks = _select_landmarks(points, confidence_threshold)
+                
+                # Crop to the player from the next frame on, or fall back to
+                # the full frame if tracking degrades inside the crop
+                if roi is None and roi_tracking and n_landmarks >= MIN_POSE_LANDMARKS:
+                    roi = _pose_roi(points, width, height, roi_padding)
+                    if roi is not None:
+                        pose.reset()
+                elif roi is not None and n_landmarks < MIN_POSE_LANDMARKS:
+                    last_full_frame = -roi_refresh_interval
                 
                 # Only add frame if we have key landmarks for serve detection
-                if len(landmarks) >= 5:  # At least nose, shoulders, and wrists
-                    pose_frame = PoseFrame(
+                if n_landmarks >= MIN_POSE_LANDMARKS:
+                    yield PoseFrame(
                         frame_idx=frame_idx,
                         landmarks=landmarks,
-                        timestamp=frame_idx / fps
+                        timestamp=timestamp
                     )
-                    pose_frames.append(pose_frame)
-            
-            frame_idx += 1
-            
+            elif roi is not None:
+                last_full_frame = -roi_refresh_interval
+    
     finally:
-        cap.release()
-        pose.close()
+        # Also reached when the caller stops iterating early
+        stop.set()
+        decode_thread.join()
+        close_source()
+        for worker_pose in poses:
+            worker_pose.close()
+        if owns_pose and not poses:
+            pose.close()
+
+
+def estimate_pose_video(
+    video_path: str,
+    confidence_threshold: float = 0.5,
+    model_complexity: int = 1,
+    static_image_mode: bool = False,
+    min_tracking_confidence: Optional[float] = None,
+    roi_tracking: bool = False,
+    roi_padding: float = 0.2,
+    roi_refresh_interval: int = 30,
+    frame_stride: int = 1,
+    prefetch: int = 8,
+    realtime: bool = False,
+    decoder: str = "opencv",
+    inference_max_side: Optional[int] = 1280,
+    workers: int = 1,
+    pose=None
+) -> List[PoseFrame]:
+    """
+    Estimate pose from video using MediaPipe.
     
-    return pose_frames
+    Args:
+        video_path: Path to input video
+        confidence_threshold: Minimum confidence for landmark detection
+        model_complexity: MediaPipe model complexity (0=lite, 1=full, 2=heavy)
+        static_image_mode: Run full detection on every frame instead of
+            tracking landmarks between frames
+        min_tracking_confidence: Minimum tracking confidence before falling
+            back to detection (defaults to confidence_threshold)
+        roi_tracking: Crop frames to the tracked player region
+        roi_padding: Padding around the player box, as a fraction of its size
+        roi_refresh_interval: Frames between full-frame re-detections
+        frame_stride: Run the estimator on every Nth frame; the frames in
+            between are never converted to images (nor decoded, with OpenCV)
+        prefetch: Maximum decoded frames buffered ahead of the estimator
+        realtime: Treat ``video_path`` as a live source (camera device or
+            stream URL): keep the capture buffer at one frame, drop frames
+            instead of queueing them when the estimator falls behind, and
+            stamp frames with their capture time since the first frame
+        decoder: One of VIDEO_DECODERS (see estimate_pose_video_iter)
+        inference_max_side: Scale frames down so their longer side is at
+            most this many pixels before inference (None keeps full size)
+        workers: Number of estimators to run concurrently; above one, frames
+            are processed independently in static image mode
+        pose: Estimator from create_pose_estimator to reuse instead of
+            loading a new model; its own detection settings apply and it is
+            left open
+    
+    Returns:
+        List of pose frames with landmarks
+    """
+    return list(estimate_pose_video_iter(
+        video_path,
+        confidence_threshold=confidence_threshold,
+        model_complexity=model_complexity,
+        static_image_mode=static_image_mode,
+        min_tracking_confidence=min_tracking_confidence,
+        roi_tracking=roi_tracking,
+        roi_padding=roi_padding,
+        roi_refresh_interval=roi_refresh_interval,
+        frame_stride=frame_stride,
+        prefetch=prefetch,
+        realtime=realtime,
+        decoder=decoder,
+        inference_max_side=inference_max_side,
+        workers=workers,
+        pose=pose
+    ))
+
+
+def estimate_pose_video_array(
+    video_path: str,
+    confidence_threshold: float = 0.5,
+    **kwargs
+) -> np.ndarray:
+    """
+    Estimate pose from video into a preallocated keypoint array.
+    
+    Unlike estimate_pose_video, no per-frame objects are kept: every frame
+    gets a row, and frames without a usable pose stay missing.
+    
+    Args:
+        video_path: Path to input video
+        confidence_threshold: Minimum confidence for landmark detection
+        **kwargs: Other settings forwarded to estimate_pose_video_iter
+    
+    Returns:
+        (N, L, 4) float32 keypoints indexed by frame (see empty_keypoints)
+    """
+    cap = cv2.VideoCapture(str(video_path))
+    n_frames = max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+    cap.release()
+    
+    keypoints = empty_keypoints(n_frames)
+    for frame in estimate_pose_video_iter(
+        video_path, confidence_threshold=confidence_threshold, **kwargs
+    ):
+        # The container's frame count is only an estimate
+        if frame.frame_idx >= len(keypoints):
+            grow = max(frame.frame_idx + 1, 2 * len(keypoints)) - len(keypoints)
+            keypoints = np.concatenate([keypoints, empty_keypoints(grow)])
+        keypoints[frame.frame_idx] = frame.landmarks
+    
+    return keypoints
+
+
+def pose_frames_from_array(
+    keypoints: np.ndarray,
+    fps: float = 30.0
+) -> Iterator[PoseFrame]:
+    """
+    View rows of a keypoint array as pose frames, without copying.
+    
+    Frames with no landmarks are skipped, matching the frames that
+    estimate_pose_video would have returned.
+    
+    Args:
+        keypoints: (N, L, 4) keypoints indexed by frame
+        fps: Frame rate used for timestamps
+    
+    Yields:
+        Pose frames whose landmarks are views into ``keypoints``
+    """
+    present = np.flatnonzero(~np.isnan(keypoints[..., 0]).all(axis=1))
+    for frame_idx in present.tolist():
+        yield PoseFrame(
+            frame_idx=frame_idx,
+            landmarks=keypoints[frame_idx],
+            timestamp=frame_idx / fps
+        )
+
+
+def filter_pose_array_by_visibility(
+    keypoints: np.ndarray,
+    min_landmarks: int = 5,
+    min_visibility: float = 0.5
+) -> np.ndarray:
+    """
+    Mask low-visibility landmarks and sparse frames in place.
+    
+    Array counterpart of filter_pose_frames_by_visibility: landmarks below
+    ``min_visibility`` become missing, and so do whole frames left with
+    fewer than ``min_landmarks`` landmarks.
+    
+    Args:
+        keypoints: (N, L, 4) keypoints indexed by frame, modified in place
+        min_landmarks: Minimum number of landmarks required
+        min_visibility: Minimum visibility threshold
+    
+    Returns:
+        The same ``keypoints`` array
+    """
+    hidden = keypoints[..., 3] < min_visibility
+    hidden |= (np.count_nonzero(~hidden, axis=1) < min_landmarks)[:, None]
+    keypoints[hidden] = (np.nan, np.nan, np.nan, 0.0)
+    return keypoints
 
 
 def filter_pose_frames_by_visibility(
@@ -146,19 +949,11 @@ def filter_pose_frames_by_visibility(
     Returns:
         Filtered list of pose frames
     """
-    filtered = []
+    _, landmarks = _stack_landmarks(pose_frames)
+    # Count landmarks with sufficient visibility in every frame at once
+    keep = np.count_nonzero(landmarks[..., 3] >= min_visibility, axis=1) >= min_landmarks
     
-    for frame in pose_frames:
-        # Count landmarks with sufficient visibility
-        visible_landmarks = sum(
-            1 for landmark in frame.landmarks.values()
-            if landmark.visibility >= min_visibility
-        )
-        
-        if visible_landmarks >= min_landmarks:
-            filtered.append(frame)
-    
-    return filtered
+    return [frame for frame, kept in zip(pose_frames, keep) if kept]
 
 
 def get_landmark_position(
@@ -175,7 +970,12 @@ def get_landmark_position(
     Returns:
         PoseLandmark if found, None otherwise
     """
-    return pose_frame.landmarks.get(landmark_name)
+    row = pose_frame.landmark(landmark_name)
+    if np.isnan(row[0]):
+        return None
+    
+    x, y, z, visibility = row.tolist()
+    return PoseLandmark(x=x, y=y, z=z, visibility=visibility)
 
 
 def calculate_landmark_distance(
@@ -185,6 +985,9 @@ def calculate_landmark_distance(
     """
     Calculate Euclidean distance between two landmarks.
     
+    Thin wrapper around ``geometry.distances_batch`` for a single pair; use
+    that directly for many frames or landmark pairs.
+    
     Args:
         landmark1: First landmark
         landmark2: Second landmark
@@ -192,11 +995,11 @@ def calculate_landmark_distance(
     Returns:
         Distance between landmarks
     """
-    return np.sqrt(
-        (landmark1.x - landmark2.x)**2 +
-        (landmark1.y - landmark2.y)**2 +
-        (landmark1.z - landmark2.z)**2
-    )
+    coords = np.array([[
+        [landmark1.x, landmark1.y, landmark1.z],
+        [landmark2.x, landmark2.y, landmark2.z]
+    ]])
+    return float(distances_batch(coords, _SINGLE_PAIR)[0, 0])
 
 
 def is_landmark_above(
@@ -231,17 +1034,212 @@ def get_pose_stats(pose_frames: List[PoseFrame]) -> dict:
     if not pose_frames:
         return {}
     
-    total_frames = len(pose_frames)
-    landmark_counts = []
-    
-    for frame in pose_frames:
-        landmark_counts.append(len(frame.landmarks))
+    _, landmarks = _stack_landmarks(pose_frames)
+    landmark_counts = np.count_nonzero(~np.isnan(landmarks[..., 0]), axis=1)
     
     return {
-        'total_frames': total_frames,
-        'avg_landmarks_per_frame': np.mean(landmark_counts),
-        'min_landmarks': min(landmark_counts),
-        'max_landmarks': max(landmark_counts),
+        'total_frames': len(pose_frames),
+        'avg_landmarks_per_frame': float(landmark_counts.mean()),
+        'min_landmarks': int(landmark_counts.min()),
+        'max_landmarks': int(landmark_counts.max()),
         'frame_span': pose_frames[-1].frame_idx - pose_frames[0].frame_idx + 1,
         'time_span': pose_frames[-1].timestamp - pose_frames[0].timestamp
     }
+
+
+def _stack_landmarks(
+    pose_frames: List[PoseFrame]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack frames into timestamps (N,) and (N, L, 4) x/y/z/visibility arrays."""
+    timestamps = np.fromiter(
+        (frame.timestamp for frame in pose_frames),
+        dtype=np.float32,
+        count=len(pose_frames)
+    )
+    
+    if not pose_frames:
+        return timestamps, np.empty((0, len(LANDMARK_INDEX), 4), dtype=np.float32)
+    
+    return timestamps, np.stack([frame.landmarks for frame in pose_frames])
+
+
+def pose_frames_to_array(
+    pose_frames: List[PoseFrame]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pack pose frames into contiguous float32 arrays.
+    
+    Landmarks are stored in ``LANDMARK_INDEX`` order; landmarks missing from
+    a frame are NaN with zero visibility.
+    
+    Args:
+        pose_frames: List of pose frames
+    
+    Returns:
+        Tuple of (timestamps (N,), xy (N, L, 2), visibility (N, L))
+    """
+    timestamps, landmarks = _stack_landmarks(pose_frames)
+    xy = np.ascontiguousarray(landmarks[..., :2])
+    visibility = np.ascontiguousarray(landmarks[..., 3])
+    
+    return timestamps, xy, visibility
+
+
+def pose_sequence_from_frames(pose_frames: Iterable[PoseFrame]) -> PoseSequence:
+    """
+    Pack pose frames into a PoseSequence in a single pass.
+    
+    Args:
+        pose_frames: Iterable of pose frames, may be a generator
+    
+    Returns:
+        PoseSequence with one row per frame
+    """
+    if not isinstance(pose_frames, Sized):
+        pose_frames = list(pose_frames)
+    
+    # Fill preallocated arrays by index instead of growing per-field lists
+    n_frames = len(pose_frames)
+    landmarks = np.empty((n_frames, len(LANDMARK_INDEX), 4), dtype=np.float32)
+    timestamps = np.empty(n_frames, dtype=np.float64)
+    frame_numbers = np.empty(n_frames, dtype=np.int64)
+    for i, frame in enumerate(pose_frames):
+        landmarks[i] = frame.landmarks
+        timestamps[i] = frame.timestamp
+        frame_numbers[i] = frame.frame_idx
+    
+    return PoseSequence(
+        landmarks=landmarks,
+        timestamps=timestamps,
+        frame_numbers=frame_numbers
+    )
+
+
+def get_landmark_track(
+    pose_frames: List[PoseFrame],
+    landmark_name: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extract a single landmark's trajectory in one pass.
+    
+    Frames without the landmark are skipped.
+    
+    Args:
+        pose_frames: List of pose frames
+        landmark_name: Name of landmark
+    
+    Returns:
+        Tuple of (timestamps (M,), xy (M, 2)) as float32 arrays
+    """
+    row = LANDMARK_INDEX[landmark_name]
+    timestamps = np.fromiter(
+        (frame.timestamp for frame in pose_frames),
+        dtype=np.float32,
+        count=len(pose_frames)
+    )
+    track = np.fromiter(
+        (frame.landmarks[row, :2] for frame in pose_frames),
+        dtype=np.dtype((np.float32, 2)),
+        count=len(pose_frames)
+    )
+    present = ~np.isnan(track[:, 0])
+    
+    return timestamps[present], track[present]
+
+
+def save_pose_frames(
+    pose_frames: List[PoseFrame],
+    output_path: str,
+    settings: Optional[Dict] = None
+) -> None:
+    """
+    Save pose frames to a compressed ``.npz`` file.
+    
+    Args:
+        pose_frames: List of pose frames
+        output_path: Output file path
+        settings: Estimation settings stored alongside the data
+    """
+    timestamps, landmarks = _stack_landmarks(pose_frames)
+    frame_indices = np.fromiter(
+        (frame.frame_idx for frame in pose_frames),
+        dtype=np.int32,
+        count=len(pose_frames)
+    )
+    
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write through a file object so numpy does not append ".npz"
+    with open(output_path, 'wb') as f:
+        np.savez_compressed(
+            f,
+            frame_idx=frame_indices,
+            timestamps=timestamps,
+            landmarks=landmarks,
+            settings=np.array(json.dumps(settings or {}, sort_keys=True))
+        )
+
+
+def load_pose_frames(input_path: str) -> List[PoseFrame]:
+    """
+    Load pose frames saved with ``save_pose_frames``.
+    
+    Args:
+        input_path: Path to ``.npz`` pose file
+    
+    Returns:
+        List of pose frames
+    """
+    # One bulk read of the whole archive; np.load on a path would seek and
+    # read each zip member through a small buffered file object
+    with np.load(io.BytesIO(Path(input_path).read_bytes())) as data:
+        frame_indices = data['frame_idx']
+        timestamps = data['timestamps']
+        landmarks = data['landmarks']
+    
+    return [
+        PoseFrame(
+            frame_idx=int(frame_idx),
+            landmarks=rows,
+            timestamp=float(timestamp)
+        )
+        for frame_idx, timestamp, rows in zip(frame_indices, timestamps, landmarks)
+    ]
+
+
+def estimate_pose_video_cached(
+    video_path: str,
+    cache_path: Optional[str] = None,
+    pose=None,
+    **kwargs
+) -> List[PoseFrame]:
+    """
+    Estimate pose from video, reusing a ``.pose.npz`` cache when valid.
+    
+    The cache is used only if it is newer than the video and was produced
+    with the same estimation settings.
+    
+    Args:
+        video_path: Path to input video
+        cache_path: Cache file path (defaults to "<video>.pose.npz")
+        pose: Reusable estimator from create_pose_estimator, used on a
+            cache miss
+        **kwargs: Settings forwarded to estimate_pose_video
+    
+    Returns:
+        List of pose frames with landmarks
+    """
+    video_path = Path(video_path)
+    cache_path = Path(cache_path) if cache_path else video_path.with_suffix('.pose.npz')
+    settings = json.dumps(kwargs, sort_keys=True)
+    
+    if cache_path.exists() and cache_path.stat().st_mtime > video_path.stat().st_mtime:
+        with np.load(cache_path) as data:
+            cached_settings = str(data['settings'])
+        if cached_settings == settings:
+            return load_pose_frames(str(cache_path))
+    
+    pose_frames = estimate_pose_video(str(video_path), pose=pose, **kwargs)
+    save_pose_frames(pose_frames, str(cache_path), kwargs)
+    
+    return pose_frames
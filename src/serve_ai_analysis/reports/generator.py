@@ -1,28 +1,266 @@
 """PDF report generation module for tennis serve analysis."""
 
+import io
 import json
+import os
+import shutil
 import zipfile
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
-from rich.console import Console
+from typing import List, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .._console import console
+from .._json import dumps_json
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+
+def _load_metrics_columns(metrics_data: Path) -> Tuple[Dict, Mapping[str, np.ndarray]]:
+    """
+    Open a metrics file written by ``BiomechanicalCalculator.save_metrics``.
+    
+    Members of an ``.npz`` file are only read when indexed, so each report
+    section loads just its own columns.
+    
+    Args:
+        metrics_data: Metrics file ending in ``.npz`` or ``.json``
+    
+    Returns:
+        Summary dict, and the columns keyed like the ``.npz`` members
+        (e.g. ``joint_angle_angles``, ``velocity_speeds``)
+    """
+    metrics_data = Path(metrics_data)
+    if metrics_data.suffix == ".npz":
+        columns = np.load(metrics_data)
+        return json.loads(columns["summary"].item()), columns
+    
+    summary = json.loads(metrics_data.read_text())
+    sections = (("joint_angle", summary.pop("joint_angles")), ("velocity", summary.pop("velocities")))
+    columns = {
+        f"{prefix}_{key}": np.asarray(value)
+        for prefix, section in sections
+        for key, value in section.items()
+    }
+    return summary, columns
+
+
+def _grouped_stats(names: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-name minimum, mean and maximum of long-format records.
+    
+    Args:
+        names: (N,) group name of each record
+        values: (N,) record values
+    
+    Returns:
+        (G,) sorted group names and (G, 3) min, mean, max rows
+    """
+    labels, inverse = np.unique(names, return_inverse=True)
+    stats = np.empty((len(labels), 3))
+    stats[:, 0] = np.inf
+    stats[:, 2] = -np.inf
+    np.minimum.at(stats[:, 0], inverse, values)
+    np.maximum.at(stats[:, 2], inverse, values)
+    stats[:, 1] = np.bincount(inverse, weights=values) / np.bincount(inverse)
+    return labels, stats
+
+
+def _plot_series(
+    names: np.ndarray,
+    labels: np.ndarray,
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    ylabel: str
+) -> io.BytesIO:
+    """Plot one line per label into a PNG buffer."""
+    # A bare Figure renders with Agg and leaves pyplot's global state alone
+    from matplotlib.figure import Figure
+    
+    fig = Figure(figsize=(7, 3.5))
+    ax = fig.subplots()
+    for label in labels:
+        mask = names == label
+        ax.plot(timestamps[mask], values[mask], label=str(label).replace("_", " "), linewidth=1)
+    ax.set_xlabel("Time (s)")
+    ax.set_ylabel(ylabel)
+    ax.grid(alpha=0.3)
+    if len(labels):
+        ax.legend(fontsize=7, ncol=2)
+    fig.tight_layout()
+    
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=150)
+    buffer.seek(0)
+    return buffer
 
-console = Console()
 
 class ReportGenerator:
     """Generate PDF reports for serve analysis."""
     
+    # Page layout in points
+    MARGIN = 50
+    LEADING = 16
+    
     def __init__(self):
         pass
     
+    def _draw_header(self, pdf, title: str) -> float:
+        """Start a page with a title; returns the y position below it."""
+        from reportlab.lib.pagesizes import A4
+        
+        y = A4[1] - self.MARGIN
+        pdf.setFont("Helvetica-Bold", 16)
+        pdf.drawString(self.MARGIN, y, title)
+        pdf.setFont("Helvetica", 10)
+        return y - 2 * self.LEADING
+    
+    def _draw_lines(self, pdf, lines: List[str], y: float) -> float:
+        """Draw lines of text from ``y`` down; returns the y position below them."""
+        for line in lines:
+            pdf.drawString(self.MARGIN, y, line)
+            y -= self.LEADING
+        return y
+    
+    def _draw_section(
+        self,
+        pdf,
+        title: str,
+        names: np.ndarray,
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        unit: str
+    ):
+        """Draw one page with a time-series chart and per-name statistics."""
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.utils import ImageReader
+        
+        y = self._draw_header(pdf, title)
+        if len(values) == 0:
+            self._draw_lines(pdf, ["No data recorded."], y)
+            pdf.showPage()
+            return
+        
+        labels, stats = _grouped_stats(names, values)
+        chart_width = A4[0] - 2 * self.MARGIN
+        chart_height = chart_width / 2
+        y -= chart_height
+        chart = _plot_series(names, labels, timestamps, values, unit)
+        pdf.drawImage(ImageReader(chart), self.MARGIN, y, chart_width, chart_height)
+        
+        lines = [f"{'':<24}{'min':>10}{'mean':>10}{'max':>10}  ({unit})"]
+        lines += [
+            f"{str(label).replace('_', ' '):<24}{low:>10.1f}{mean:>10.1f}{high:>10.1f}"
+            for label, (low, mean, high) in zip(labels, stats)
+        ]
+        pdf.setFont("Courier", 9)
+        self._draw_lines(pdf, lines, y - 2 * self.LEADING)
+        pdf.showPage()
+    
     def generate_report(self, metrics_data: Path, output_path: Path, athlete_name: str = ""):
-        """Generate PDF report."""
+        """
+        Generate a PDF report from a saved metrics file.
+        
+        Pages are written to the canvas section by section, and each section
+        reads only its own columns from the metrics file, so the whole
+        metrics set is never held in memory alongside the PDF.
+        
+        Args:
+            metrics_data: Metrics file from ``BiomechanicalCalculator.save_metrics``
+                (``.npz`` or ``.json``)
+            output_path: Output PDF path
+            athlete_name: Name shown on the summary page
+        
+        Returns:
+            Path to the generated PDF
+        """
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen.canvas import Canvas
+        
         console.print(f"[blue]Generating PDF report from {metrics_data}[/blue]")
-        # TODO: Implement PDF report generation
-        console.print("✅ PDF report generated")
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        summary, columns = _load_metrics_columns(metrics_data)
+        
+        try:
+            pdf = Canvas(str(output_path), pagesize=A4)
+            pdf.setTitle("Tennis Serve Analysis Report")
+            
+            y = self._draw_header(pdf, "Tennis Serve Analysis Report")
+            lines = [
+                f"Athlete: {athlete_name or 'N/A'}",
+                f"Serve: {summary['serve_id']}",
+                f"Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}",
+                "",
+                f"Performance score: {summary['performance_score']:.1f} / 100",
+                f"Duration: {summary['duration']:.2f} s",
+                f"Ball toss height: {summary['ball_toss_height']:.3f}",
+                f"Contact point height: {summary['contact_point_height']:.3f}",
+                f"Racket speed at contact: {summary['racket_speed_at_contact']:.2f} m/s",
+                "",
+                "Timing:"
+            ]
+            lines += [
+                f"    {name.replace('_', ' ')}: {value:.2f} s"
+                for name, value in summary["timing_metrics"].items()
+            ]
+            self._draw_lines(pdf, lines, y)
+            pdf.showPage()
+            
+            self._draw_section(
+                pdf,
+                "Joint Angles",
+                columns["joint_angle_names"],
+                columns["joint_angle_timestamps"],
+                columns["joint_angle_angles"],
+                "degrees"
+            )
+            self._draw_section(
+                pdf,
+                "Landmark Speeds",
+                columns["velocity_landmark_names"],
+                columns["velocity_timestamps"],
+                columns["velocity_speeds"],
+                "m/s"
+            )
+            pdf.save()
+        finally:
+            if hasattr(columns, "close"):
+                columns.close()
+        
+        console.print(f"✅ PDF report generated: {output_path}")
         return output_path
 
 
+# ZipFile.write copies in 8 KiB chunks, which is slow for multi-MB clips
+_COPY_BUFFER_SIZE = 1 << 20
+
+
+def _prefetch_files(paths: List[Path]) -> None:
+    """
+    Ask the kernel to start reading files into the page cache.
+    
+    All reads are queued up front, so later files load from disk while
+    earlier ones are copied. A no-op where ``posix_fadvise`` is unavailable.
+    
+    Args:
+        paths: Files that are about to be read
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+
+
 def create_serve_archive(task_id: str, serve_segments: List[Dict], config: Dict) -> Path:
     """
     Create a ZIP archive containing all serve segments and analysis report.
@@ -42,13 +280,20 @@ def create_serve_archive(task_id: str, serve_segments: List[Dict], config: Dict)
     # Create ZIP file
     zip_path = output_dir / f"serve_analysis_{task_id}.zip"
     
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        # Add serve video segments
-        for segment in serve_segments:
-            video_path = Path(segment['video_path'])
-            if video_path.exists():
-                video_name = f"serves/serve_{segment['serve_id']:03d}.mp4"
-                zipf.write(video_path, video_name)
+    # Only the small text entries are deflated, so the highest level is cheap
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
+        # Add serve video segments; MP4 is already compressed, so store as is
+        clips = [
+            (Path(segment['video_path']), f"serves/serve_{segment['serve_id']:03d}.mp4")
+            for segment in serve_segments
+            if Path(segment['video_path']).exists()
+        ]
+        _prefetch_files([video_path for video_path, _ in clips])
+        for video_path, video_name in clips:
+            info = zipfile.ZipInfo.from_file(video_path, video_name)
+            info.compress_type = zipfile.ZIP_STORED
+            with open(video_path, 'rb') as src, zipf.open(info, 'w') as dst:
+                shutil.copyfileobj(src, dst, _COPY_BUFFER_SIZE)
         
         # Add analysis report
         report_content = generate_analysis_report(serve_segments, config)
@@ -71,7 +316,10 @@ def create_serve_archive(task_id: str, serve_segments: List[Dict], config: Dict)
                 for seg in serve_segments
             ]
         }
-        zipf.writestr("config_summary.json", json.dumps(config_summary, indent=2))
+        zipf.writestr("config_summary.json", dumps_json(config_summary))
+        if MSGSPEC_AVAILABLE:
+            # Compact binary copy for programmatic consumers
+            zipf.writestr("config_summary.msgpack", msgspec.msgpack.encode(config_summary))
         
         # Add README file
         readme_content = generate_readme_content(serve_segments, config)
@@ -81,6 +329,19 @@ def create_serve_archive(task_id: str, serve_segments: List[Dict], config: Dict)
     return zip_path
 
 
+# One serve table row of the HTML report
+_SERVE_ROW_TEMPLATE = """
+            <tr>
+                <td>{serve_number}</td>
+                <td>{duration:.1f}</td>
+                <td>{confidence:.1%}</td>
+                <td>{landmarks}</td>
+                <td>{start_frame}</td>
+                <td>{end_frame}</td>
+            </tr>
+        """
+
+
 def generate_analysis_report(serve_segments: List[Dict], config: Dict) -> str:
     """
     Generate HTML analysis report.
@@ -150,17 +411,18 @@ def generate_analysis_report(serve_segments: List[Dict], config: Dict) -> str:
         <tbody>
     """
     
-    for segment in serve_segments:
-        html_content += f"""
-            <tr>
-                <td>{segment['serve_id'] + 1}</td>
-                <td>{segment['duration']:.1f}</td>
-                <td>{segment['confidence']:.1%}</td>
-                <td>{'✅' if segment['has_landmarks'] else '❌'}</td>
-                <td>{segment['start_frame']}</td>
-                <td>{segment['end_frame']}</td>
-            </tr>
-        """
+    # Rows are joined once rather than appended to the page one by one
+    html_content += "".join(
+        _SERVE_ROW_TEMPLATE.format(
+            serve_number=segment['serve_id'] + 1,
+            duration=segment['duration'],
+            confidence=segment['confidence'],
+            landmarks='✅' if segment['has_landmarks'] else '❌',
+            start_frame=segment['start_frame'],
+            end_frame=segment['end_frame']
+        )
+        for segment in serve_segments
+    )
     
     html_content += f"""
         </tbody>
@@ -168,7 +430,7 @@ def generate_analysis_report(serve_segments: List[Dict], config: Dict) -> str:
     
     <div class="config-section">
         <h2>Analysis Configuration</h2>
-        <pre>{json.dumps(config, indent=2)}</pre>
+        <pre>{dumps_json(config).decode()}</pre>
     </div>
     
     <div style="margin-top: 40px; padding: 20px; background: #e9ecef; border-radius: 8px;">
@@ -177,6 +439,7 @@ def generate_analysis_report(serve_segments: List[Dict], config: Dict) -> str:
             <li><strong>serves/</strong> - Individual serve video clips</li>
             <li><strong>analysis_report.html</strong> - This detailed report</li>
             <li><strong>config_summary.json</strong> - Analysis configuration and metadata</li>
+            <li><strong>config_summary.msgpack</strong> - The same configuration as MessagePack (only present when msgspec is installed)</li>
             <li><strong>README.md</strong> - Usage instructions</li>
         </ul>
     </div>
@@ -207,6 +470,7 @@ This archive contains the results of a tennis serve analysis performed on {datet
 - **serves/**: Individual serve video clips (MP4 format)
 - **analysis_report.html**: Detailed HTML report with statistics and serve details
 - **config_summary.json**: Analysis configuration and metadata
+- **config_summary.msgpack**: The same configuration as MessagePack (only present when msgspec is installed)
 - **README.md**: This file
 
 ## Analysis Summary
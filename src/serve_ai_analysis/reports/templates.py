@@ -1,8 +1,6 @@
 """Report templates module for tennis serve analysis."""
 
-from rich.console import Console
-
-console = Console()
+from .._console import console
 
 class ReportTemplate:
     """Template for PDF reports."""
@@ -9,29 +9,54 @@ from .serve_detection import (
     validate_serve_event,
     get_serve_stats,
     extract_serve_segments,
+    ServeConfig,
     DEFAULT_SERVE_CONFIG
 )
 
 from .ball_detection import (
     detect_ball_trajectory,
+    detect_ball_trajectory_array,
+    detect_ball_in_frame,
     filter_ball_detections,
+    AdaptiveFrameSkip,
     get_ball_trajectory_stats,
-    BallDetection
+    BallDetection,
+    BallTrajectory,
+    empty_ball_trajectory,
+    ball_trajectory_from_detections,
+    filter_ball_trajectory
 )
 
+from .motion import compute_motion_scores
+
 from .video_utils import (
     load_video,
     save_video_segment,
     extract_serve_clip,
     extract_serve_clip_direct,
+    extract_serve_clips_batch,
+    overlay_pose_on_clip,
+    extract_frame_range,
     get_video_info,
+    open_video_capture,
+    HWACCEL_MODES,
     assess_video_quality,
     optimize_video_for_processing,
+    needs_optimization,
     create_video_preview,
     extract_frame_at_time,
     get_video_thumbnail
 )
 
+from .pipeline_functions import (
+    run_fused,
+    process_single_video,
+    process_videos,
+    generate_processing_report,
+    ProcessingResult,
+    DEFAULT_PIPELINE_CONFIG
+)
+
 __all__ = [
     # Serve detection
     "detect_serves",
@@ -41,23 +66,48 @@ __all__ = [
     "validate_serve_event",
     "get_serve_stats",
     "extract_serve_segments",
+    "ServeConfig",
     "DEFAULT_SERVE_CONFIG",
     
     # Ball detection
     "detect_ball_trajectory",
+    "detect_ball_trajectory_array",
+    "detect_ball_in_frame",
     "filter_ball_detections",
+    "AdaptiveFrameSkip",
     "get_ball_trajectory_stats",
     "BallDetection",
+    "BallTrajectory",
+    "empty_ball_trajectory",
+    "ball_trajectory_from_detections",
+    "filter_ball_trajectory",
+    
+    # Motion analysis
+    "compute_motion_scores",
     
     # Video utilities
     "load_video",
     "save_video_segment",
     "extract_serve_clip",
     "extract_serve_clip_direct",
+    "extract_serve_clips_batch",
+    "overlay_pose_on_clip",
+    "extract_frame_range",
     "get_video_info",
+    "open_video_capture",
+    "HWACCEL_MODES",
     "assess_video_quality",
     "optimize_video_for_processing",
+    "needs_optimization",
     "create_video_preview",
     "extract_frame_at_time",
-    "get_video_thumbnail"
+    "get_video_thumbnail",
+    
+    # Processing pipeline
+    "run_fused",
+    "process_single_video",
+    "process_videos",
+    "generate_processing_report",
+    "ProcessingResult",
+    "DEFAULT_PIPELINE_CONFIG"
 ]
@@ -1,11 +1,27 @@
 """Ball detection module for tennis serve analysis."""
 
+import math
+from array import array
+from itertools import chain
+from operator import attrgetter
 import cv2
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional, Union
 from pathlib import Path
 
+from .._jit import njit
+
+# Structuring element for cleaning up the ball color mask
+_BALL_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+# Detection fields reduced by get_ball_trajectory_stats
+_STATS_FIELDS = attrgetter('x', 'y', 'confidence')
+
+# Skip distance from which seeking beats grabbing frame by frame. A seek
+# decodes forward from the previous keyframe, so it pays off once the skip
+# is longer than a typical keyframe interval.
+_SEEK_MIN_SKIP = 32
 
 @dataclass
 class BallDetection:
@@ -17,101 +33,462 @@ class BallDetection:
     radius: float
 
 
-def detect_ball_trajectory(
-    video_path: str,
+@dataclass(eq=False)
+class BallTrajectory:
+    """
+    Ball position per frame, stored as frame-indexed arrays.
+    
+    Row ``i`` describes frame ``i``: ``positions`` is a float32 (N, 2)
+    array of pixel x, y, ``confidence`` and ``radius`` are float32 (N,).
+    Frames without a ball have NaN position and radius and zero confidence.
+    """
+    positions: np.ndarray
+    confidence: np.ndarray
+    radius: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.confidence)
+    
+    def detected_frames(self) -> np.ndarray:
+        """Indices of the frames that have a ball."""
+        return np.flatnonzero(~np.isnan(self.positions[:, 0]))
+    
+    def detection(self, frame_idx: int) -> Optional[BallDetection]:
+        """Ball in a frame as a BallDetection, or None if there is none."""
+        if frame_idx >= len(self) or np.isnan(self.positions[frame_idx, 0]):
+            return None
+        x, y = self.positions[frame_idx].tolist()
+        return BallDetection(
+            frame_idx=frame_idx,
+            x=x,
+            y=y,
+            confidence=float(self.confidence[frame_idx]),
+            radius=float(self.radius[frame_idx])
+        )
+
+
+def empty_ball_trajectory(n_frames: int) -> BallTrajectory:
+    """
+    Create a trajectory of ``n_frames`` frames without any ball.
+    
+    Args:
+        n_frames: Number of frames
+    
+    Returns:
+        BallTrajectory with every frame empty
+    """
+    return BallTrajectory(
+        positions=np.full((n_frames, 2), np.nan, dtype=np.float32),
+        confidence=np.zeros(n_frames, dtype=np.float32),
+        radius=np.full(n_frames, np.nan, dtype=np.float32)
+    )
+
+
+def ball_trajectory_from_detections(
+    detections: List[BallDetection],
+    n_frames: Optional[int] = None
+) -> BallTrajectory:
+    """
+    Pack ball detections into a frame-indexed trajectory.
+    
+    When a frame has several candidates the most confident one is kept.
+    
+    Args:
+        detections: List of ball detections
+        n_frames: Number of frames (defaults to just past the last detection)
+    
+    Returns:
+        BallTrajectory
+    """
+    count = len(detections)
+    frames = np.fromiter((d.frame_idx for d in detections), dtype=np.int64, count=count)
+    values = np.fromiter(
+        ((d.x, d.y, d.confidence, d.radius) for d in detections),
+        dtype=np.dtype((np.float32, 4)),
+        count=count
+    )
+    if n_frames is None:
+        n_frames = int(frames.max()) + 1 if count else 0
+    
+    trajectory = empty_ball_trajectory(n_frames)
+    order = np.lexsort((-values[:, 2], frames))
+    best_frames, first = np.unique(frames[order], return_index=True)
+    best = values[order[first]]
+    trajectory.positions[best_frames] = best[:, :2]
+    trajectory.confidence[best_frames] = best[:, 2]
+    trajectory.radius[best_frames] = best[:, 3]
+    
+    return trajectory
+
+
+def detect_ball_in_frame(
+    frame: np.ndarray,
+    frame_idx: int,
     min_radius: int = 5,
     max_radius: int = 50,
     color_lower: Tuple[int, int, int] = (0, 100, 100),  # HSV for tennis ball
     color_upper: Tuple[int, int, int] = (20, 255, 255),
-    frame_skip: int = 1
+    use_opencl: bool = False
 ) -> List[BallDetection]:
     """
-    Detect tennis ball trajectory using color-based detection.
+    Detect tennis ball candidates in a single decoded frame.
+    
+    With ``use_opencl`` the color conversion, thresholding and morphology
+    run on a ``cv2.UMat``, which OpenCV dispatches to OpenCL when a device
+    is available (and to the CPU otherwise); only the final mask is
+    downloaded for contour finding. Uploading the frame has a cost of its
+    own, so this pays off on large frames with a GPU.
     
     Args:
-        video_path: Path to input video
+        frame: Frame in BGR channel order
+        frame_idx: Index of the frame in the video
         min_radius: Minimum ball radius to detect
         max_radius: Maximum ball radius to detect
-        color_lower: Lower HSV threshold for ball color
-        color_upper: Upper HSV threshold for ball color
+        color_lower: Lower HSV threshold for ball color (tuple or uint8 array)
+        color_upper: Upper HSV threshold for ball color (tuple or uint8 array)
+        use_opencl: Run the pixel operations through OpenCV's T-API
     
     Returns:
-        List of ball detections with frame indices and positions
+        List of ball detections in this frame
+    """
+    if use_opencl:
+        frame = cv2.UMat(frame)
+    
+    # Convert to HSV color space
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    
+    # Create mask for ball color
+    mask = cv2.inRange(hsv, color_lower, color_upper)
+    
+    # Apply morphological operations to reduce noise
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, _BALL_KERNEL)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, _BALL_KERNEL)
+    if use_opencl:
+        mask = mask.get()
+    
+    # Find contours
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    
+    if not contours:
+        return []
+    
+    # Filter contours by size first; most are small noise specks, so only
+    # the ball-sized ones get a perimeter, and only the round ones among
+    # those get a bounding circle
+    min_area = math.pi * min_radius * min_radius
+    max_area = math.pi * max_radius * max_radius
+    areas = np.fromiter(map(cv2.contourArea, contours), dtype=np.float64, count=len(contours))
+    sized = np.flatnonzero((areas >= min_area) & (areas <= max_area))
+    areas = areas[sized]
+    perimeters = np.fromiter(
+        (cv2.arcLength(contours[i], True) for i in sized.tolist()),
+        dtype=np.float64,
+        count=len(sized)
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        circularity = 4 * np.pi * areas / (perimeters * perimeters)
+    candidates = (perimeters > 0) & (circularity >= 0.7)  # Minimum circularity threshold
+    
+    detections = []
+    for i in np.flatnonzero(candidates).tolist():
+        # Get bounding circle
+        (x, y), radius = cv2.minEnclosingCircle(contours[sized[i]])
+        
+        if min_radius <= radius <= max_radius:
+            # Calculate confidence based on circularity and area
+            confidence = min(float(circularity[i] * (areas[i] / max_area)), 1.0)
+            
+            detections.append(BallDetection(
+                frame_idx=frame_idx,
+                x=float(x),
+                y=float(y),
+                confidence=confidence,
+                radius=float(radius)
+            ))
+    
+    return detections
+
+
+class AdaptiveFrameSkip:
+    """
+    Choose which frames to run ball detection on.
+    
+    After each detector call the stride to the next call is doubled (up to
+    ``max_skip``) while the scene is still and the detection outcome is
+    unchanged, and reset to 1 when the ball newly appears or the frame
+    changes noticeably since the previous call.
+    """
+    
+    def __init__(self, max_skip: int = 8, motion_threshold: float = 2.0):
+        """
+        Args:
+            max_skip: Largest stride between detector calls
+            motion_threshold: Mean absolute grayscale difference (0-255)
+                above which the scene counts as moving
+        """
+        self.max_skip = max_skip
+        self.motion_threshold = motion_threshold
+        self.skip = 1
+        self.next_frame = 0
+        self._prev_thumbnail = None
+        self._prev_found = False
+    
+    def should_detect(self, frame_idx: int) -> bool:
+        """Return True if the detector should run on this frame."""
+        return frame_idx >= self.next_frame
+    
+    def update(self, frame_idx: int, frame: np.ndarray, detections: List[BallDetection]) -> None:
+        """
+        Record a detector call and schedule the next one.
+        
+        Args:
+            frame_idx: Index of the frame the detector ran on
+            frame: Frame in BGR channel order
+            detections: Detections found in the frame
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        thumbnail = cv2.resize(
+            gray, (max(1, gray.shape[1] // 8), max(1, gray.shape[0] // 8)),
+            interpolation=cv2.INTER_AREA
+        )
+        if self._prev_thumbnail is None or self._prev_thumbnail.shape != thumbnail.shape:
+            motion = math.inf
+        else:
+            motion = cv2.norm(thumbnail, self._prev_thumbnail, cv2.NORM_L1) / thumbnail.size
+        
+        found = bool(detections)
+        if motion > self.motion_threshold or (found and not self._prev_found):
+            self.skip = 1
+        elif found == self._prev_found:
+            self.skip = min(self.skip * 2, self.max_skip)
+        
+        self.next_frame = frame_idx + self.skip
+        self._prev_thumbnail = thumbnail
+        self._prev_found = found
+
+
+def _detect_ball_frames(
+    video_path: str,
+    min_radius: int = 5,
+    max_radius: int = 50,
+    color_lower: Tuple[int, int, int] = (0, 100, 100),  # HSV for tennis ball
+    color_upper: Tuple[int, int, int] = (20, 255, 255),
+    frame_skip: int = 1,
+    adaptive_skip: bool = False,
+    max_skip: int = 8,
+    use_opencl: bool = False,
+    hwaccel: str = "off"
+) -> Iterator[Tuple[int, List[BallDetection]]]:
+    """
+    Run ball detection over a video, yielding each examined frame's candidates.
+    
+    Frames the detector does not run on are grabbed without being
+    retrieved, or seeked over when the next detector frame is at least
+    ``_SEEK_MIN_SKIP`` frames away. Arguments are as for
+    detect_ball_trajectory.
     """
     video_path = Path(video_path)
     if not video_path.exists():
         raise FileNotFoundError(f"Video file not found: {video_path}")
     
-    cap = cv2.VideoCapture(str(video_path))
+    # Imported here because video_utils depends on this module through
+    # serve_detection
+    from .video_utils import open_video_capture
+    
+    cap = open_video_capture(str(video_path), hwaccel)
     if not cap.isOpened():
         raise ValueError(f"Could not open video: {video_path}")
     
-    detections = []
     frame_idx = 0
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    skipper = AdaptiveFrameSkip(max_skip=max_skip) if adaptive_skip else None
+    
+    # Convert the color bounds once rather than on every inRange call
+    color_lower = np.array(color_lower, dtype=np.uint8)
+    color_upper = np.array(color_upper, dtype=np.uint8)
     
     try:
         while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+            if skipper is not None:
+                detect = skipper.should_detect(frame_idx)
+            else:
+                detect = frame_idx % frame_skip == 0
             
-            # Skip frames if frame_skip > 1
-            if frame_idx % frame_skip != 0:
+            if not detect:
+                if skipper is not None:
+                    next_frame = skipper.next_frame
+                else:
+                    next_frame = frame_idx + (-frame_idx) % frame_skip
+                
+                # Not every backend can seek; grab frame by frame if it fails
+                if (
+                    next_frame - frame_idx >= _SEEK_MIN_SKIP
+                    and cap.set(cv2.CAP_PROP_POS_FRAMES, next_frame)
+                ):
+                    frame_idx = next_frame
+                    continue
+                
+                if not cap.grab():
+                    break
                 frame_idx += 1
                 continue
             
-            # Convert to HSV color space
-            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-            
-            # Create mask for ball color
-            mask = cv2.inRange(hsv, color_lower, color_upper)
-            
-            # Apply morphological operations to reduce noise
-            kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+            ret, frame = cap.read()
+            if not ret:
+                break
             
-            # Find contours
-            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            # Filter contours by circularity and size
-            for contour in contours:
-                area = cv2.contourArea(contour)
-                if area < np.pi * min_radius**2 or area > np.pi * max_radius**2:
-                    continue
-                
-                # Calculate circularity
-                perimeter = cv2.arcLength(contour, True)
-                if perimeter == 0:
-                    continue
-                
-                circularity = 4 * np.pi * area / (perimeter * perimeter)
-                if circularity < 0.7:  # Minimum circularity threshold
-                    continue
-                
-                # Get bounding circle
-                (x, y), radius = cv2.minEnclosingCircle(contour)
-                
-                if min_radius <= radius <= max_radius:
-                    # Calculate confidence based on circularity and area
-                    confidence = min(circularity * (area / (np.pi * max_radius**2)), 1.0)
-                    
-                    detection = BallDetection(
-                        frame_idx=frame_idx,
-                        x=float(x),
-                        y=float(y),
-                        confidence=confidence,
-                        radius=float(radius)
-                    )
-                    detections.append(detection)
+            frame_detections = detect_ball_in_frame(
+                frame, frame_idx, min_radius, max_radius, color_lower, color_upper, use_opencl
+            )
+            yield frame_idx, frame_detections
+            if skipper is not None:
+                skipper.update(frame_idx, frame, frame_detections)
             
             frame_idx += 1
-            
+    
     finally:
         cap.release()
+
+
+def detect_ball_trajectory(
+    video_path: str,
+    min_radius: int = 5,
+    max_radius: int = 50,
+    color_lower: Tuple[int, int, int] = (0, 100, 100),  # HSV for tennis ball
+    color_upper: Tuple[int, int, int] = (20, 255, 255),
+    frame_skip: int = 1,
+    adaptive_skip: bool = False,
+    max_skip: int = 8,
+    use_opencl: bool = False,
+    hwaccel: str = "off"
+) -> List[BallDetection]:
+    """
+    Detect tennis ball trajectory using color-based detection.
     
-    return detections
+    Frames the detector does not run on are grabbed without being
+    retrieved, and skips over 32 or more frames seek instead.
+    
+    Args:
+        video_path: Path to input video
+        min_radius: Minimum ball radius to detect
+        max_radius: Maximum ball radius to detect
+        color_lower: Lower HSV threshold for ball color
+        color_upper: Upper HSV threshold for ball color
+        frame_skip: Run detection on every Nth frame (ignored when
+            ``adaptive_skip`` is set)
+        adaptive_skip: Pick the frames with AdaptiveFrameSkip instead
+        max_skip: Largest stride for adaptive skipping
+        use_opencl: Run the per-frame pixel operations through OpenCV's
+            T-API (see detect_ball_in_frame)
+        hwaccel: Hardware decode mode, one of HWACCEL_MODES (see
+            open_video_capture)
+    
+    Returns:
+        List of ball detections with frame indices and positions
+    """
+    return [
+        detection
+        for _, frame_detections in _detect_ball_frames(
+            video_path,
+            min_radius=min_radius,
+            max_radius=max_radius,
+            color_lower=color_lower,
+            color_upper=color_upper,
+            frame_skip=frame_skip,
+            adaptive_skip=adaptive_skip,
+            max_skip=max_skip,
+            use_opencl=use_opencl,
+            hwaccel=hwaccel
+        )
+        for detection in frame_detections
+    ]
+
+
+def detect_ball_trajectory_array(
+    video_path: str,
+    min_radius: int = 5,
+    max_radius: int = 50,
+    color_lower: Tuple[int, int, int] = (0, 100, 100),  # HSV for tennis ball
+    color_upper: Tuple[int, int, int] = (20, 255, 255),
+    frame_skip: int = 1,
+    adaptive_skip: bool = False,
+    max_skip: int = 8,
+    use_opencl: bool = False,
+    hwaccel: str = "off"
+) -> BallTrajectory:
+    """
+    Detect the ball trajectory straight into frame-indexed arrays.
+    
+    Like detect_ball_trajectory, but the most confident candidate of each
+    frame is appended to flat typed buffers as it is found, so no list of
+    detections is kept for the whole video.
+    
+    Args:
+        video_path: Path to input video
+        min_radius: Minimum ball radius to detect
+        max_radius: Maximum ball radius to detect
+        color_lower: Lower HSV threshold for ball color
+        color_upper: Upper HSV threshold for ball color
+        frame_skip: Run detection on every Nth frame (ignored when
+            ``adaptive_skip`` is set)
+        adaptive_skip: Pick the frames with AdaptiveFrameSkip instead
+        max_skip: Largest stride for adaptive skipping
+        use_opencl: Run the per-frame pixel operations through OpenCV's
+            T-API (see detect_ball_in_frame)
+        hwaccel: Hardware decode mode, one of HWACCEL_MODES (see
+            open_video_capture)
+    
+    Returns:
+        BallTrajectory covering the frames up to the last one examined
+    """
+    frames = array('q')
+    values = array('f')
+    n_frames = 0
+    
+    for frame_idx, frame_detections in _detect_ball_frames(
+        video_path,
+        min_radius=min_radius,
+        max_radius=max_radius,
+        color_lower=color_lower,
+        color_upper=color_upper,
+        frame_skip=frame_skip,
+        adaptive_skip=adaptive_skip,
+        max_skip=max_skip,
+        use_opencl=use_opencl,
+        hwaccel=hwaccel
+    ):
+        n_frames = frame_idx + 1
+        if frame_detections:
+            best = max(frame_detections, key=attrgetter('confidence'))
+            frames.append(frame_idx)
+            values.extend((best.x, best.y, best.confidence, best.radius))
+    
+    trajectory = empty_ball_trajectory(n_frames)
+    frame_rows = np.frombuffer(frames, dtype=np.int64)
+    rows = np.frombuffer(values, dtype=np.float32).reshape(-1, 4)
+    trajectory.positions[frame_rows] = rows[:, :2]
+    trajectory.confidence[frame_rows] = rows[:, 2]
+    trajectory.radius[frame_rows] = rows[:, 3]
+    
+    return trajectory
+
+
+@njit(cache=True, nogil=True)
+def _jump_mask(xy, max_distance):
+    # Keeps points within max_distance of the last kept point; sequential
+    # because each decision depends on the previous ones
+    n = xy.shape[0]
+    keep = np.zeros(n, dtype=np.bool_)
+    if n == 0:
+        return keep
+    keep[0] = True
+    prev_x = xy[0, 0]
+    prev_y = xy[0, 1]
+    for i in range(1, n):
+        if math.hypot(xy[i, 0] - prev_x, xy[i, 1] - prev_y) <= max_distance:
+            keep[i] = True
+            prev_x = xy[i, 0]
+            prev_y = xy[i, 1]
+    return keep
 
 
 def filter_ball_detections(
@@ -139,44 +516,91 @@ def filter_ball_detections(
     if len(filtered) < 2:
         return filtered
     
-    # Filter by jump distance
-    result = [filtered[0]]
+    # Filter by jump distance from the last kept detection
+    xy = np.fromiter(
+        ((d.x, d.y) for d in filtered), dtype=np.dtype((np.float64, 2)), count=len(filtered)
+    )
+    keep = _jump_mask(xy, float(max_jump_distance))
     
-    for i in range(1, len(filtered)):
-        prev = result[-1]
-        curr = filtered[i]
-        
-        # Calculate distance between consecutive detections
-        distance = np.sqrt((curr.x - prev.x)**2 + (curr.y - prev.y)**2)
-        
-        if distance <= max_jump_distance:
-            result.append(curr)
+    return [d for d, kept in zip(filtered, keep.tolist()) if kept]
+
+
+def filter_ball_trajectory(
+    trajectory: BallTrajectory,
+    min_confidence: float = 0.3,
+    max_jump_distance: float = 100.0
+) -> BallTrajectory:
+    """
+    Filter a ball trajectory in place, like filter_ball_detections.
+    
+    Frames below ``min_confidence``, or whose ball jumps more than
+    ``max_jump_distance`` from the last kept one, are emptied.
+    
+    Args:
+        trajectory: Ball trajectory, modified in place
+        min_confidence: Minimum confidence threshold
+        max_jump_distance: Maximum allowed distance between consecutive detections
+    
+    Returns:
+        The same ``trajectory``
+    """
+    drop = trajectory.confidence < min_confidence
     
-    return result
+    # The jump check depends on the last kept ball, so it stays sequential,
+    # but only visits frames that still have one
+    kept = np.flatnonzero(~drop & ~np.isnan(trajectory.positions[:, 0]))
+    if len(kept) > 1:
+        xy = trajectory.positions[kept].astype(np.float64)
+        drop[kept[~_jump_mask(xy, float(max_jump_distance))]] = True
+    
+    trajectory.positions[drop] = np.nan
+    trajectory.confidence[drop] = 0.0
+    trajectory.radius[drop] = np.nan
+    
+    return trajectory
 
 
-def get_ball_trajectory_stats(detections: List[BallDetection]) -> dict:
+def get_ball_trajectory_stats(detections: Union[List[BallDetection], BallTrajectory]) -> dict:
     """
     Calculate statistics for ball trajectory.
     
+    A BallTrajectory is reduced directly from its columns, without
+    creating per-detection objects.
+    
     Args:
-        detections: List of ball detections
+        detections: List of ball detections, or a BallTrajectory
     
     Returns:
         Dictionary with trajectory statistics
     """
-    if not detections:
-        return {}
+    if isinstance(detections, BallTrajectory):
+        frames = detections.detected_frames()
+        if not len(frames):
+            return {}
+        positions = detections.positions[frames].astype(np.float64)
+        confidence = detections.confidence[frames].astype(np.float64)
+        first_frame, last_frame = int(frames[0]), int(frames[-1])
+    else:
+        if not detections:
+            return {}
+        # One (N, 3) array of x, y, confidence, filled from a flat stream
+        # of fields without an intermediate list and reduced column-wise
+        values = np.fromiter(
+            chain.from_iterable(map(_STATS_FIELDS, detections)),
+            dtype=np.float64,
+            count=3 * len(detections)
+        ).reshape(-1, 3)
+        positions, confidence = values[:, :2], values[:, 2]
+        first_frame, last_frame = detections[0].frame_idx, detections[-1].frame_idx
     
-    x_coords = [d.x for d in detections]
-    y_coords = [d.y for d in detections]
-    confidences = [d.confidence for d in detections]
+    x_min, y_min = positions.min(axis=0).tolist()
+    x_max, y_max = positions.max(axis=0).tolist()
     
     return {
-        'total_detections': len(detections),
-        'avg_confidence': np.mean(confidences),
-        'x_range': (min(x_coords), max(x_coords)),
-        'y_range': (min(y_coords), max(y_coords)),
-        'trajectory_length': len(detections),
-        'frame_span': detections[-1].frame_idx - detections[0].frame_idx + 1
+        'total_detections': len(confidence),
+        'avg_confidence': float(confidence.mean()),
+        'x_range': (x_min, x_max),
+        'y_range': (y_min, y_max),
+        'trajectory_length': len(confidence),
+        'frame_span': last_frame - first_frame + 1
     }
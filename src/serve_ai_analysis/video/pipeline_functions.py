@@ -0,0 +1,472 @@
+"""Video processing pipeline for tennis serve analysis."""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict, replace
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import cv2
+
+from .._json import write_json, write_json_array
+from .._queues import queue_consume, queue_get, queue_put
+import numpy as np
+
+from ..pose.pose_estimation import (
+    create_pose_estimator,
+    estimate_pose_frame,
+    inference_size,
+    empty_keypoints,
+    filter_pose_array_by_visibility
+)
+from .ball_detection import (
+    AdaptiveFrameSkip,
+    BallTrajectory,
+    detect_ball_in_frame,
+    filter_ball_trajectory
+)
+from .serve_detection import detect_serves, ServeEvent, DEFAULT_SERVE_CONFIG
+from .video_utils import (
+    assess_video_quality,
+    optimize_video_for_processing,
+    needs_optimization,
+    extract_serve_clips_batch,
+    open_video_capture
+)
+
+
+# Default configuration for the processing pipeline
+DEFAULT_PIPELINE_CONFIG = {
+    "optimize_videos": True,
+    "force_optimize": False,     # Re-encode even if already at target
+    "target_resolution": (1280, 720),
+    "min_serve_duration": 1.5,   # seconds
+    "max_serve_duration": 8.0,   # seconds
+    "confidence_threshold": 0.5,
+    "model_complexity": 1,       # MediaPipe pose model: 0=lite, 1=full, 2=heavy
+    "ball_frame_skip": 3,        # Process every Nth frame for ball detection
+    "adaptive_ball_skip": False, # Skip more ball frames while the scene is still
+    "hwaccel": "off",            # Decoder: "auto", "cuda", "vaapi" or "off"
+    "serve_buffer_seconds": 1.0,
+    "max_workers": None,         # Parallel videos (defaults to CPU count)
+}
+
+
+def _grow_frames(array: np.ndarray, n_frames: int, empty) -> np.ndarray:
+    """
+    Grow a frame-indexed array to hold at least ``n_frames`` rows.
+    
+    Arrays are preallocated from the container's frame count, which is only
+    an estimate; ``empty(n)`` creates ``n`` blank rows.
+    """
+    if n_frames <= len(array):
+        return array
+    grow = max(n_frames, 2 * len(array)) - len(array)
+    return np.concatenate([array, empty(grow)])
+
+
+def _empty_ball_rows(n_frames: int) -> np.ndarray:
+    """Create (N, 4) x/y/confidence/radius rows with no ball."""
+    rows = np.full((n_frames, 4), np.nan, dtype=np.float32)
+    rows[:, 2] = 0.0
+    return rows
+
+
+def run_fused(
+    video_path: str,
+    confidence_threshold: float = 0.5,
+    ball_frame_skip: int = 3,
+    pose=None,
+    queue_size: int = 32,
+    adaptive_ball_skip: bool = False,
+    hwaccel: str = "off",
+    model_complexity: int = 1,
+    inference_max_side: Optional[int] = 1280
+) -> Tuple[np.ndarray, BallTrajectory]:
+    """
+    Run pose estimation and ball detection over a single decode of the video.
+    
+    A decoder thread reads each frame once and feeds two bounded queues: one
+    consumed by the pose estimator (every frame, in order) and one by the
+    ball detector (every ``ball_frame_skip``-th frame). OpenCV and MediaPipe
+    release the GIL, so decoding and both detectors overlap.
+    
+    Frames are decoded straight into a preallocated ring of buffers and the
+    queues carry slot indices; a slot is reused once every stage reading it
+    is done, so no per-frame image is allocated or copied.
+    
+    Args:
+        video_path: Path to input video
+        confidence_threshold: Minimum confidence for pose landmarks
+        ball_frame_skip: Run ball detection on every Nth frame
+        pose: Reusable estimator from create_pose_estimator (created and
+            closed here if omitted)
+        queue_size: Maximum decoded frames buffered ahead of the detectors
+        adaptive_ball_skip: Let AdaptiveFrameSkip pick the ball detection
+            frames instead of a fixed ``ball_frame_skip`` stride
+        hwaccel: Hardware decode mode for the decoder thread (see
+            open_video_capture); falls back to software decoding
+        model_complexity: MediaPipe model complexity for the estimator
+            created here (ignored when ``pose`` is given)
+        inference_max_side: Scale frames down so their longer side is at
+            most this many pixels before pose inference (None keeps full
+            size); ball detection always sees full frames
+    
+    Returns:
+        Tuple of ((N, L, 4) pose keypoints indexed by frame, unfiltered
+        ball trajectory keeping the most confident candidate per frame);
+        frames without a usable pose or ball are left missing
+    """
+    video_path = Path(video_path)
+    if not video_path.exists():
+        raise FileNotFoundError(f"Video file not found: {video_path}")
+    
+    cap = open_video_capture(str(video_path), hwaccel)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+    
+    owns_pose = pose is None
+    if owns_pose:
+        pose = create_pose_estimator(
+            confidence_threshold=confidence_threshold,
+            model_complexity=model_complexity
+        )
+    else:
+        pose.reset()
+    
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    # Same nominal 30 fps timeline as estimate_pose_video_iter when the
+    # source reports no usable frame rate
+    if fps <= 0:
+        fps = 30.0
+    n_frames = max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+    keypoints = empty_keypoints(n_frames)
+    ball_rows = _empty_ball_rows(n_frames)
+    n_decoded = 0
+    pose_queue = queue.Queue(maxsize=queue_size)
+    ball_queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    
+    # Frame ring: the decoder plus the frame each consumer is working on
+    # need slots beyond the queued ones
+    n_slots = queue_size + 3
+    ring = None
+    free_slots = queue.Queue()
+    slot_users = [0] * n_slots
+    slot_lock = threading.Lock()
+    
+    def release(slot):
+        with slot_lock:
+            slot_users[slot] -= 1
+            if slot_users[slot] == 0:
+                free_slots.put(slot)
+    
+    def decode():
+        nonlocal n_decoded, ring
+        try:
+            frame_idx = 0
+            while not stop.is_set():
+                if ring is None:
+                    # Size the ring from the first decoded frame
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    ring = np.empty((n_slots,) + frame.shape, dtype=frame.dtype)
+                    for slot in range(1, n_slots):
+                        free_slots.put(slot)
+                    slot = 0
+                    ring[slot] = frame
+                else:
+                    slot = queue_get(free_slots, stop)
+                    if slot is None:
+                        return
+                    buffer = ring[slot]
+                    ret, frame = cap.read(buffer)
+                    if not ret:
+                        break
+                    if frame is not buffer:
+                        buffer[...] = frame
+                
+                to_ball = adaptive_ball_skip or frame_idx % ball_frame_skip == 0
+                slot_users[slot] = 2 if to_ball else 1
+                
+                if not queue_put(pose_queue, (frame_idx, slot), stop):
+                    return
+                if to_ball:
+                    if not queue_put(ball_queue, (frame_idx, slot), stop):
+                        return
+                
+                frame_idx += 1
+            
+            n_decoded = frame_idx
+            queue_put(pose_queue, None, stop)
+            queue_put(ball_queue, None, stop)
+        except BaseException:
+            stop.set()
+            raise
+    
+    rgb_frame = None
+    small_frame = None
+    
+    def handle_pose(frame_idx, frame):
+        nonlocal keypoints, rgb_frame, small_frame
+        height, width = frame.shape[:2]
+        size = inference_size(width, height, inference_max_side)
+        if size != (width, height):
+            small_frame = cv2.resize(frame, size, dst=small_frame, interpolation=cv2.INTER_AREA)
+            frame = small_frame
+        # Only the pose thread converts frames, and inference is synchronous,
+        # so single scaled and RGB buffers are reused for every frame
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+        pose_frame = estimate_pose_frame(
+            pose, rgb_frame, frame_idx, frame_idx / fps, confidence_threshold
+        )
+        if pose_frame is not None:
+            keypoints = _grow_frames(keypoints, frame_idx + 1, empty_keypoints)
+            keypoints[frame_idx] = pose_frame.landmarks
+    
+    skipper = AdaptiveFrameSkip() if adaptive_ball_skip else None
+    
+    def handle_ball(frame_idx, frame):
+        nonlocal ball_rows
+        if skipper is not None and not skipper.should_detect(frame_idx):
+            return
+        detections = detect_ball_in_frame(frame, frame_idx)
+        if detections:
+            best = max(detections, key=lambda d: d.confidence)
+            ball_rows = _grow_frames(ball_rows, frame_idx + 1, _empty_ball_rows)
+            ball_rows[frame_idx] = (best.x, best.y, best.confidence, best.radius)
+        if skipper is not None:
+            skipper.update(frame_idx, frame, detections)
+    
+    def from_ring(handle):
+        def handle_slot(frame_idx, slot):
+            try:
+                handle(frame_idx, ring[slot])
+            finally:
+                release(slot)
+        return handle_slot
+    
+    try:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(decode),
+                executor.submit(queue_consume, pose_queue, stop, from_ring(handle_pose)),
+                executor.submit(queue_consume, ball_queue, stop, from_ring(handle_ball))
+            ]
+            for future in futures:
+                future.result()
+    
+    finally:
+        cap.release()
+        if owns_pose:
+            pose.close()
+    
+    keypoints = _grow_frames(keypoints, n_decoded, empty_keypoints)[:n_decoded]
+    ball_rows = _grow_frames(ball_rows, n_decoded, _empty_ball_rows)[:n_decoded]
+    ball = BallTrajectory(
+        positions=np.ascontiguousarray(ball_rows[:, :2]),
+        confidence=np.ascontiguousarray(ball_rows[:, 2]),
+        radius=np.ascontiguousarray(ball_rows[:, 3])
+    )
+    
+    return keypoints, ball
+
+
+@dataclass
+class ProcessingResult:
+    """Result of processing a single video."""
+    video_path: Path
+    success: bool
+    serve_events: List[ServeEvent] = field(default_factory=list)
+    quality_metrics: Dict[str, float] = field(default_factory=dict)
+    processing_path: Optional[Path] = None
+    processing_time: float = 0.0
+    error: Optional[str] = None
+    output_files: List[Path] = field(default_factory=list)
+
+
+def process_single_video(
+    video_path: Path,
+    output_dir: Path,
+    config: Optional[Dict[str, Any]] = None
+) -> ProcessingResult:
+    """
+    Process a single video through the complete pipeline.
+    
+    Runs quality assessment, optional optimization, pose estimation, ball
+    detection, serve detection and serve clip extraction.
+    
+    Args:
+        video_path: Path to input video
+        output_dir: Root directory for pipeline outputs
+        config: Pipeline configuration (defaults to DEFAULT_PIPELINE_CONFIG)
+    
+    Returns:
+        ProcessingResult for the video
+    """
+    config = {**DEFAULT_PIPELINE_CONFIG, **(config or {})}
+    video_path = Path(video_path)
+    output_dir = Path(output_dir)
+    start_time = time.perf_counter()
+    output_files = []
+    
+    try:
+        # Step 1: Assess video quality
+        quality_metrics = assess_video_quality(str(video_path))
+        quality_path = output_dir / "quality_reports" / f"{video_path.stem}_quality.json"
+        quality_path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(quality_metrics, quality_path)
+        output_files.append(quality_path)
+        
+        # Step 2: Optimize video if requested and not already suitable
+        target_resolution = tuple(config["target_resolution"])
+        if config["optimize_videos"] and (
+            config["force_optimize"] or needs_optimization(quality_metrics, target_resolution)
+        ):
+            processing_path = Path(optimize_video_for_processing(
+                str(video_path),
+                target_resolution,
+                output_path=str(output_dir / "optimized" / f"{video_path.stem}_optimized.mp4")
+            ))
+            output_files.append(processing_path)
+        else:
+            processing_path = video_path
+        
+        # Steps 3-4: Estimate pose and detect ball trajectory in one decode
+        confidence = config["confidence_threshold"]
+        keypoints, ball = run_fused(
+            str(processing_path),
+            confidence_threshold=confidence,
+            ball_frame_skip=config["ball_frame_skip"],
+            adaptive_ball_skip=config["adaptive_ball_skip"],
+            hwaccel=config["hwaccel"],
+            model_complexity=config["model_complexity"]
+        )
+        filter_pose_array_by_visibility(keypoints, min_visibility=confidence)
+        filter_ball_trajectory(ball, min_confidence=0.3)
+        
+        # Step 5: Detect serves
+        fps = quality_metrics["fps"] or 30.0
+        serve_config = replace(
+            DEFAULT_SERVE_CONFIG,
+            confidence_threshold=confidence,
+            serve_min_duration=int(config["min_serve_duration"] * fps),
+            serve_max_duration=int(config["max_serve_duration"] * fps)
+        )
+        serve_events = detect_serves(keypoints, ball, serve_config)
+        
+        events_path = output_dir / "serve_events" / f"{video_path.stem}_serves.json"
+        events_path.parent.mkdir(parents=True, exist_ok=True)
+        write_json_array(serve_events, events_path)
+        output_files.append(events_path)
+        
+        # Step 6: Extract serve clips in one pass over the video
+        clips_dir = output_dir / "extracted_serves" / video_path.stem
+        clip_paths = extract_serve_clips_batch(
+            str(processing_path),
+            serve_events,
+            [str(clips_dir / f"serve_{i+1:03d}.mp4") for i in range(len(serve_events))],
+            buffer_seconds=config["serve_buffer_seconds"]
+        )
+        output_files.extend(Path(path) for path in clip_paths)
+        
+        return ProcessingResult(
+            video_path=video_path,
+            success=True,
+            serve_events=serve_events,
+            quality_metrics=quality_metrics,
+            processing_path=processing_path,
+            processing_time=time.perf_counter() - start_time,
+            output_files=output_files
+        )
+    
+    except Exception as e:
+        return ProcessingResult(
+            video_path=video_path,
+            success=False,
+            processing_time=time.perf_counter() - start_time,
+            error=str(e),
+            output_files=output_files
+        )
+
+
+def process_videos(
+    video_files: List[Path],
+    output_dir: Path,
+    config: Optional[Dict[str, Any]] = None
+) -> List[ProcessingResult]:
+    """
+    Process multiple videos in parallel.
+    
+    Each video runs in its own worker process with its own pose estimator,
+    so videos are processed concurrently up to the CPU count.
+    
+    Args:
+        video_files: List of input video paths
+        output_dir: Root directory for pipeline outputs
+        config: Pipeline configuration (defaults to DEFAULT_PIPELINE_CONFIG)
+    
+    Returns:
+        List of ProcessingResult, in the same order as video_files
+    """
+    config = {**DEFAULT_PIPELINE_CONFIG, **(config or {})}
+    if not video_files:
+        return []
+    
+    process_one = partial(process_single_video, output_dir=output_dir, config=config)
+    max_workers = min(len(video_files), config["max_workers"] or os.cpu_count() or 1)
+    
+    if max_workers == 1:
+        return [process_one(video_path) for video_path in video_files]
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(process_one, video_files))
+
+
+def generate_processing_report(
+    results: List[ProcessingResult],
+    report_path: Path
+) -> Dict[str, Any]:
+    """
+    Write a JSON report summarizing pipeline results.
+    
+    Args:
+        results: List of processing results
+        report_path: Output path for the report
+    
+    Returns:
+        Report dictionary
+    """
+    successful = [r for r in results if r.success]
+    
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "total_videos": len(results),
+        "successful_videos": len(successful),
+        "total_serves": sum(len(r.serve_events) for r in successful),
+        "videos": [
+            {
+                "video_path": str(r.video_path),
+                "success": r.success,
+                "processing_path": str(r.processing_path) if r.processing_path else None,
+                "processing_time": r.processing_time,
+                "quality_metrics": r.quality_metrics,
+                "serve_events": [asdict(event) for event in r.serve_events],
+                "output_files": [str(path) for path in r.output_files],
+                "error": r.error
+            }
+            for r in results
+        ]
+    }
+    
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(report, report_path)
+    
+    return report
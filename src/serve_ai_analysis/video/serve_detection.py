@@ -1,12 +1,19 @@
 """Serve detection module for tennis serve analysis."""
 
 from dataclasses import dataclass
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Union
 import numpy as np
 from enum import Enum
 
-from ..pose.pose_estimation import PoseFrame, PoseLandmark, get_landmark_position, is_landmark_above
-from .ball_detection import BallDetection
+from .._jit import njit
+from ..pose.pose_estimation import (
+    PoseFrame,
+    PoseLandmark,
+    LANDMARK_INDEX,
+    get_landmark_position,
+    is_landmark_above
+)
+from .ball_detection import BallDetection, BallTrajectory
 
 
 @dataclass
@@ -44,49 +51,228 @@ class ServeState:
             self.confidence_scores = []
 
 
+@dataclass(frozen=True, slots=True)
+class ServeConfig:
+    """Configuration for serve detection (use dataclasses.replace to override)."""
+    ball_toss_min_frames: int = 5       # Minimum frames for ball toss phase
+    contact_min_frames: int = 3         # Minimum frames for contact phase
+    follow_through_min_frames: int = 5  # Minimum frames for follow-through
+    serve_min_duration: int = 15        # Minimum total serve duration (frames)
+    serve_max_duration: int = 120       # Maximum total serve duration (frames)
+    confidence_threshold: float = 0.6   # Minimum confidence for serve detection
+    nose_threshold: float = 0.1         # Vertical threshold for "above nose"
+    shoulder_threshold: float = 0.05    # Vertical threshold for "below shoulder"
+
+
 # Default configuration for serve detection
-DEFAULT_SERVE_CONFIG = {
-    'ball_toss_min_frames': 5,  # Minimum frames for ball toss phase
-    'contact_min_frames': 3,    # Minimum frames for contact phase
-    'follow_through_min_frames': 5,  # Minimum frames for follow-through
-    'serve_min_duration': 15,   # Minimum total serve duration (frames)
-    'serve_max_duration': 120,  # Maximum total serve duration (frames)
-    'confidence_threshold': 0.6,  # Minimum confidence for serve detection
-    'nose_threshold': 0.1,      # Vertical threshold for "above nose"
-    'shoulder_threshold': 0.05,  # Vertical threshold for "below shoulder"
-}
+DEFAULT_SERVE_CONFIG = ServeConfig()
+
+
+# Landmarks the state machine needs in every frame, in kernel order
+_KEY_ROWS = np.array([
+    LANDMARK_INDEX[name]
+    for name in ('nose', 'left_wrist', 'right_wrist', 'left_shoulder', 'right_shoulder')
+], dtype=np.int64)
+
+# ServePhase values as kernel integers
+_WAITING, _BALL_TOSS, _CONTACT, _FOLLOW_THROUGH = 0, 1, 2, 3
+
+
+@njit(cache=True, nogil=True)
+def _serve_state_machine(
+    keypoints,
+    ball_confidence,
+    key_rows,
+    ball_toss_min_frames,
+    contact_min_frames,
+    follow_through_min_frames,
+    serve_min_duration,
+    serve_max_duration,
+    confidence_threshold,
+    nose_threshold,
+    shoulder_threshold
+):
+    # Mirrors update_serve_state frame by frame. The confidence list is
+    # only ever used through its length and mean, so it is kept as a count
+    # and a running sum (each "append" below adds one score).
+    n = keypoints.shape[0]
+    event_frames = np.empty((n, 4), dtype=np.int64)
+    event_confidence = np.empty(n, dtype=np.float64)
+    n_events = 0
+    
+    phase = _WAITING
+    count = 0
+    total = 0.0
+    start = 0
+    contact = 0
+    follow_through = 0
+    
+    for f in range(n):
+        missing = False
+        visibility = 0.0
+        for r in key_rows:
+            if np.isnan(keypoints[f, r, 0]):
+                missing = True
+                break
+            visibility += keypoints[f, r, 3]
+        if missing:
+            continue
+        
+        confidence = visibility / 5.0
+        if not np.isnan(ball_confidence[f]):
+            confidence = (confidence + ball_confidence[f]) / 2.0
+        
+        nose_y = np.float64(keypoints[f, key_rows[0], 1])
+        left_wrist_y = np.float64(keypoints[f, key_rows[1], 1])
+        right_wrist_y = np.float64(keypoints[f, key_rows[2], 1])
+        right_shoulder_y = np.float64(keypoints[f, key_rows[4], 1])
+        
+        if phase == _WAITING:
+            if left_wrist_y < nose_y - nose_threshold:
+                phase = _BALL_TOSS
+                start = f
+                count = 1
+                total = confidence
+            continue
+        
+        count += 1
+        total += confidence
+        
+        if phase == _BALL_TOSS:
+            if right_wrist_y < nose_y - nose_threshold and count >= ball_toss_min_frames:
+                phase = _CONTACT
+                contact = f
+                count += 1
+                total += confidence
+                continue
+        
+        elif phase == _CONTACT:
+            if not (right_wrist_y < right_shoulder_y - shoulder_threshold) and count >= contact_min_frames:
+                phase = _FOLLOW_THROUGH
+                follow_through = f
+                count += 1
+                total += confidence
+                continue
+        
+        else:
+            if count >= follow_through_min_frames and serve_min_duration <= count <= serve_max_duration:
+                average = total / count
+                if average >= confidence_threshold:
+                    event_frames[n_events, 0] = start
+                    event_frames[n_events, 1] = f
+                    event_frames[n_events, 2] = contact
+                    event_frames[n_events, 3] = follow_through
+                    event_confidence[n_events] = average
+                    n_events += 1
+                    phase = _WAITING
+                    continue
+        
+        if count > serve_max_duration:
+            phase = _WAITING
+            continue
+        
+        # Continue current phase
+        count += 1
+        total += confidence
+    
+    return event_frames[:n_events], event_confidence[:n_events]
+
+
+def _ball_confidence_by_frame(
+    ball_detections: Union[List[BallDetection], BallTrajectory],
+    n_frames: int
+) -> np.ndarray:
+    """Ball confidence per frame as float64, NaN where there is no ball."""
+    confidence = np.full(n_frames, np.nan)
+    
+    if isinstance(ball_detections, BallTrajectory):
+        n = min(n_frames, len(ball_detections))
+        present = ~np.isnan(ball_detections.positions[:n, 0])
+        confidence[:n][present] = ball_detections.confidence[:n][present]
+    else:
+        # The first detection in a frame wins, as in the list lookup
+        for ball in reversed(ball_detections):
+            if ball.frame_idx < n_frames:
+                confidence[ball.frame_idx] = ball.confidence
+    
+    return confidence
+
+
+def _detect_serves_array(
+    keypoints: np.ndarray,
+    ball_detections: Union[List[BallDetection], BallTrajectory],
+    config: ServeConfig
+) -> List[ServeEvent]:
+    """Run the compiled serve state machine over a frame-indexed keypoint array."""
+    event_frames, event_confidence = _serve_state_machine(
+        np.ascontiguousarray(keypoints, dtype=np.float32),
+        _ball_confidence_by_frame(ball_detections, len(keypoints)),
+        _KEY_ROWS,
+        config.ball_toss_min_frames,
+        config.contact_min_frames,
+        config.follow_through_min_frames,
+        config.serve_min_duration,
+        config.serve_max_duration,
+        float(config.confidence_threshold),
+        float(config.nose_threshold),
+        float(config.shoulder_threshold)
+    )
+    
+    return [
+        ServeEvent(
+            start_frame=start,
+            end_frame=end,
+            ball_toss_frame=start,
+            contact_frame=contact,
+            follow_through_frame=follow_through,
+            confidence=float(confidence)
+        )
+        for (start, end, contact, follow_through), confidence
+        in zip(event_frames.tolist(), event_confidence.tolist())
+    ]
 
 
 def detect_serves(
-    pose_frames: List[PoseFrame],
-    ball_detections: List[BallDetection],
-    config: Optional[Dict] = None
+    pose_frames: Union[List[PoseFrame], np.ndarray],
+    ball_detections: Union[List[BallDetection], BallTrajectory],
+    config: Optional[ServeConfig] = None
 ) -> List[ServeEvent]:
     """
     Detect serves using pose and ball trajectory data.
     
+    A keypoint array is processed by a compiled kernel (when Numba is
+    installed) that applies update_serve_state's rules to every frame.
+    
     Args:
-        pose_frames: List of pose frames
-        ball_detections: List of ball detections
-        config: Configuration dictionary
+        pose_frames: List of pose frames, or an (N, L, 4) keypoint array
+            indexed by frame (see estimate_pose_video_array)
+        ball_detections: List of ball detections, or a BallTrajectory
+        config: Serve detection configuration
     
     Returns:
-        List of detected serve events
+        List of detected serve events, in frame order
     """
-    if not pose_frames:
-        return []
+    config = config or DEFAULT_SERVE_CONFIG
+    
+    if isinstance(pose_frames, np.ndarray):
+        return _detect_serves_array(pose_frames, ball_detections, config)
+    
+    # Look up each frame's ball in O(1); for a list, the first detection in
+    # a frame is used
+    if isinstance(ball_detections, BallTrajectory):
+        ball_for_frame = ball_detections.detection
+    else:
+        ball_by_frame = {}
+        for ball in ball_detections:
+            ball_by_frame.setdefault(ball.frame_idx, ball)
+        ball_for_frame = ball_by_frame.get
     
-    config = config or DEFAULT_SERVE_CONFIG.copy()
     serve_events = []
     current_state = ServeState(phase=ServePhase.WAITING)
     
-    for i, pose_frame in enumerate(pose_frames):
+    for pose_frame in pose_frames:
         # Get ball detection for this frame if available
-        ball_detection = None
-        for ball in ball_detections:
-            if ball.frame_idx == pose_frame.frame_idx:
-                ball_detection = ball
-                break
+        ball_detection = ball_for_frame(pose_frame.frame_idx)
         
         # Update state machine
         new_state, serve_event = update_serve_state(
@@ -107,7 +293,7 @@ def update_serve_state(
     current_state: ServeState,
     pose_frame: PoseFrame,
     ball_detection: Optional[BallDetection],
-    config: Dict
+    config: ServeConfig
 ) -> Tuple[ServeState, Optional[ServeEvent]]:
     """
     Update serve state machine and return completed serve if detected.
@@ -116,7 +302,7 @@ def update_serve_state(
         current_state: Current serve state
         pose_frame: Current pose frame
         ball_detection: Current ball detection (optional)
-        config: Configuration dictionary
+        config: Serve detection configuration
     
     Returns:
         Tuple of (new_state, serve_event)
@@ -140,7 +326,7 @@ def update_serve_state(
     
     if current_state.phase == ServePhase.WAITING:
         # Check for ball toss initiation (left wrist above nose)
-        if is_landmark_above(left_wrist, nose, config['nose_threshold']):
+        if is_landmark_above(left_wrist, nose, config.nose_threshold):
             new_state = ServeState(
                 phase=ServePhase.BALL_TOSS,
                 start_frame=frame_idx,
@@ -154,9 +340,9 @@ def update_serve_state(
         current_state.confidence_scores.append(frame_confidence)
         
         # Check for contact phase (right wrist above nose)
-        if is_landmark_above(right_wrist, nose, config['nose_threshold']):
+        if is_landmark_above(right_wrist, nose, config.nose_threshold):
             # Must have minimum ball toss duration
-            if len(current_state.confidence_scores) >= config['ball_toss_min_frames']:
+            if len(current_state.confidence_scores) >= config.ball_toss_min_frames:
                 new_state = ServeState(
                     phase=ServePhase.CONTACT,
                     start_frame=current_state.start_frame,
@@ -167,7 +353,7 @@ def update_serve_state(
                 return new_state, None
         
         # Check if ball toss phase is too long
-        if len(current_state.confidence_scores) > config['serve_max_duration']:
+        if len(current_state.confidence_scores) > config.serve_max_duration:
             return ServeState(phase=ServePhase.WAITING), None
     
     elif current_state.phase == ServePhase.CONTACT:
@@ -175,9 +361,9 @@ def update_serve_state(
         current_state.confidence_scores.append(frame_confidence)
         
         # Check for follow-through phase (right wrist below shoulder)
-        if not is_landmark_above(right_wrist, right_shoulder, config['shoulder_threshold']):
+        if not is_landmark_above(right_wrist, right_shoulder, config.shoulder_threshold):
             # Must have minimum contact duration
-            if len(current_state.confidence_scores) >= config['contact_min_frames']:
+            if len(current_state.confidence_scores) >= config.contact_min_frames:
                 new_state = ServeState(
                     phase=ServePhase.FOLLOW_THROUGH,
                     start_frame=current_state.start_frame,
@@ -189,7 +375,7 @@ def update_serve_state(
                 return new_state, None
         
         # Check if contact phase is too long
-        if len(current_state.confidence_scores) > config['serve_max_duration']:
+        if len(current_state.confidence_scores) > config.serve_max_duration:
             return ServeState(phase=ServePhase.WAITING), None
     
     elif current_state.phase == ServePhase.FOLLOW_THROUGH:
@@ -197,14 +383,14 @@ def update_serve_state(
         current_state.confidence_scores.append(frame_confidence)
         
         # Check if follow-through is complete
-        if len(current_state.confidence_scores) >= config['follow_through_min_frames']:
+        if len(current_state.confidence_scores) >= config.follow_through_min_frames:
             # Validate serve duration
             total_duration = len(current_state.confidence_scores)
-            if (config['serve_min_duration'] <= total_duration <= config['serve_max_duration']):
+            if (config.serve_min_duration <= total_duration <= config.serve_max_duration):
                 # Calculate overall confidence
                 avg_confidence = np.mean(current_state.confidence_scores)
                 
-                if avg_confidence >= config['confidence_threshold']:
+                if avg_confidence >= config.confidence_threshold:
                     serve_event = ServeEvent(
                         start_frame=current_state.start_frame,
                         end_frame=frame_idx,
@@ -216,7 +402,7 @@ def update_serve_state(
                     return ServeState(phase=ServePhase.WAITING), serve_event
         
         # Check if follow-through is too long
-        if len(current_state.confidence_scores) > config['serve_max_duration']:
+        if len(current_state.confidence_scores) > config.serve_max_duration:
             return ServeState(phase=ServePhase.WAITING), None
     
     # Continue current phase
@@ -227,7 +413,7 @@ def update_serve_state(
 def calculate_frame_confidence(
     pose_frame: PoseFrame,
     ball_detection: Optional[BallDetection],
-    config: Dict
+    config: ServeConfig
 ) -> float:
     """
     Calculate confidence score for a frame based on pose and ball data.
@@ -235,7 +421,7 @@ def calculate_frame_confidence(
     Args:
         pose_frame: Current pose frame
         ball_detection: Current ball detection (optional)
-        config: Configuration dictionary
+        config: Serve detection configuration
     
     Returns:
         Confidence score between 0 and 1
@@ -265,20 +451,20 @@ def calculate_frame_confidence(
 
 
 
-def validate_serve_event(serve_event: ServeEvent, config: Dict) -> bool:
+def validate_serve_event(serve_event: ServeEvent, config: ServeConfig) -> bool:
     """
     Validate a detected serve event.
     
     Args:
         serve_event: Serve event to validate
-        config: Configuration dictionary
+        config: Serve detection configuration
     
     Returns:
         True if serve event is valid
     """
     # Check duration
     duration = serve_event.end_frame - serve_event.start_frame
-    if not (config['serve_min_duration'] <= duration <= config['serve_max_duration']):
+    if not (config.serve_min_duration <= duration <= config.serve_max_duration):
         return False
     
     # Check sequence order
@@ -288,7 +474,7 @@ def validate_serve_event(serve_event: ServeEvent, config: Dict) -> bool:
         return False
     
     # Check confidence
-    if serve_event.confidence < config['confidence_threshold']:
+    if serve_event.confidence < config.confidence_threshold:
         return False
     
     return True
@@ -307,15 +493,24 @@ def get_serve_stats(serve_events: List[ServeEvent]) -> dict:
     if not serve_events:
         return {}
     
-    durations = [event.end_frame - event.start_frame for event in serve_events]
-    confidences = [event.confidence for event in serve_events]
+    count = len(serve_events)
+    durations = np.fromiter(
+        (event.end_frame - event.start_frame for event in serve_events),
+        dtype=np.int64,
+        count=count
+    )
+    confidences = np.fromiter(
+        (event.confidence for event in serve_events),
+        dtype=np.float64,
+        count=count
+    )
     
     return {
-        'total_serves': len(serve_events),
-        'avg_duration': np.mean(durations),
-        'avg_confidence': np.mean(confidences),
-        'min_confidence': min(confidences),
-        'max_confidence': max(confidences)
+        'total_serves': count,
+        'avg_duration': float(durations.mean()),
+        'avg_confidence': float(confidences.mean()),
+        'min_confidence': float(confidences.min()),
+        'max_confidence': float(confidences.max())
     }
 
 
@@ -323,7 +518,8 @@ def extract_serve_segments(
     video_path: str, 
     serves: List[ServeEvent], 
     pose_data: Optional[List[PoseFrame]] = None,
-    include_landmarks: bool = True
+    include_landmarks: bool = True,
+    landmark_style: str = "skeleton"
 ) -> List[Dict]:
     """
     Extract serve video segments with optional landmark visualization.
@@ -333,14 +529,16 @@ def extract_serve_segments(
         serves: List of detected serve events
         pose_data: Optional pose estimation data
         include_landmarks: Whether to overlay landmarks on videos
+        landmark_style: Overlay style, one of LANDMARK_STYLES
     
     Returns:
         List of serve segment information
     """
     from pathlib import Path
-    from .video_utils import extract_serve_clip_direct
+    from .video_utils import extract_serve_clip_direct, get_video_info, overlay_pose_on_clip
     
     segments = []
+    buffer_seconds = 1.0
     
     for i, serve in enumerate(serves):
         # Create output directory for this task
@@ -353,7 +551,7 @@ def extract_serve_segments(
             video_path, 
             serve, 
             str(serve_clip_path),
-            buffer_seconds=1.0
+            buffer_seconds=buffer_seconds
         )
         
         if not success:
@@ -364,15 +562,23 @@ def extract_serve_segments(
         final_clip_path = serve_clip_path
         has_landmarks = False
         
-        if include_landmarks and pose_data and len(pose_data) > serve.end_frame:
+        if include_landmarks and pose_data:
             try:
-                # Extract pose data for this serve
-                serve_pose_data = pose_data[serve.start_frame:serve.end_frame + 1]
-                
-                # Add landmarks to video (placeholder for now)
-                # TODO: Implement landmark overlay functionality
-                has_landmarks = True
-                print(f"Landmarks would be added to serve {i} (not yet implemented)")
+                # The clip starts buffer_seconds before the serve, as cut above
+                buffer_frames = int(buffer_seconds * get_video_info(video_path)['fps'])
+                landmarks_clip_path = output_dir / f"serve_{i:03d}_landmarks.mp4"
+                drawn = overlay_pose_on_clip(
+                    str(serve_clip_path),
+                    str(landmarks_clip_path),
+                    pose_data,
+                    max(0, serve.start_frame - buffer_frames),
+                    style=landmark_style
+                )
+                if drawn:
+                    final_clip_path = landmarks_clip_path
+                    has_landmarks = True
+                else:
+                    landmarks_clip_path.unlink()
             except Exception as e:
                 print(f"Warning: Failed to add landmarks to serve {i}: {e}")
         
@@ -4,9 +4,60 @@ import cv2
 import numpy as np
 from pathlib import Path
 from typing import Tuple, List, Dict, Optional
+from ..pose.drawing import draw_pose
+from ..pose.pose_estimation import PoseFrame
 from .serve_detection import ServeEvent
 
 
+# Hardware decode modes accepted by open_video_capture
+HWACCEL_MODES = ("auto", "cuda", "vaapi", "off")
+
+
+def open_video_capture(video_path: str, hwaccel: str = "off") -> cv2.VideoCapture:
+    """
+    Open a video for decoding, optionally on a hardware decoder.
+    
+    ``auto`` lets OpenCV's FFmpeg backend pick any available accelerator,
+    ``vaapi`` requests VA-API and ``cuda`` requests any accelerator on
+    device 0 (NVDEC on NVIDIA builds), since OpenCV has no CUDA-specific
+    acceleration type. If the accelerated capture cannot be opened, the
+    video is opened with software decoding instead.
+    
+    Args:
+        video_path: Path to input video
+        hwaccel: One of HWACCEL_MODES
+    
+    Returns:
+        Opened (or, if the file cannot be read, unopened) VideoCapture
+    """
+    if hwaccel not in HWACCEL_MODES:
+        raise ValueError(f"Unknown hwaccel mode {hwaccel!r}, expected one of {HWACCEL_MODES}")
+    
+    video_path = str(video_path)
+    if hwaccel == "off":
+        return cv2.VideoCapture(video_path)
+    
+    if hwaccel == "cuda":
+        # OpenCV has no CUDA-specific acceleration type; any accelerator on
+        # the first device picks NVDEC when FFmpeg was built with it
+        params = [
+            cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY,
+            cv2.CAP_PROP_HW_DEVICE, 0,
+        ]
+    else:
+        acceleration = (
+            cv2.VIDEO_ACCELERATION_ANY if hwaccel == "auto" else cv2.VIDEO_ACCELERATION_VAAPI
+        )
+        params = [cv2.CAP_PROP_HW_ACCELERATION, acceleration]
+    cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, params)
+    
+    if cap.isOpened():
+        return cap
+    
+    cap.release()
+    return cv2.VideoCapture(video_path)
+
+
 def load_video(video_path: str) -> Tuple[List[np.ndarray], float]:
     """
     Load video and return frames with FPS.
@@ -120,48 +171,39 @@ def extract_serve_clip(
                 break
             frames.append(frame)
             frame_idx += 1
-            
+    
     finally:
         cap.release()
     
     return frames
 
 
-def extract_serve_clip_direct(
+def extract_frame_range(
     video_path: str,
-    serve_event: ServeEvent,
-    output_path: str,
-    buffer_seconds: float = 1.0
+    start_frame: int,
+    end_frame: int,
+    output_path: str
 ) -> bool:
     """
-    Extract serve clip directly to file without loading frames into memory.
+    Copy frames ``start_frame`` to ``end_frame`` (inclusive) to a new video.
+    
+    Frames are streamed from the source without loading the clip into memory.
     
     Args:
         video_path: Path to input video
-        serve_event: Serve event to extract
+        start_frame: First frame to copy
+        end_frame: Last frame to copy
         output_path: Path to output video file
-        buffer_seconds: Buffer time in seconds before and after serve
     
     Returns:
         True if successful
     """
-    # Get video info to determine FPS
-    info = get_video_info(video_path)
-    fps = info['fps']
-    
-    # Calculate buffer frames
-    buffer_frames = int(buffer_seconds * fps)
-    
-    # Calculate start and end frame indices
-    start_frame = max(0, serve_event.start_frame - buffer_frames)
-    end_frame = serve_event.end_frame + buffer_frames
-    
-    # Extract frames directly from video without loading everything
-    cap = cv2.VideoCapture(video_path)
+    cap = cv2.VideoCapture(str(video_path))
     if not cap.isOpened():
         raise ValueError(f"Could not open video: {video_path}")
     
     # Get video properties
+    fps = cap.get(cv2.CAP_PROP_FPS)
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     
@@ -185,7 +227,7 @@ def extract_serve_clip_direct(
                 break
             out.write(frame)
             frame_idx += 1
-            
+    
     finally:
         cap.release()
         out.release()
@@ -193,6 +235,184 @@ def extract_serve_clip_direct(
     return True
 
 
+def extract_serve_clip_direct(
+    video_path: str,
+    serve_event: ServeEvent,
+    output_path: str,
+    buffer_seconds: float = 1.0
+) -> bool:
+    """
+    Extract serve clip directly to file without loading frames into memory.
+    
+    Args:
+        video_path: Path to input video
+        serve_event: Serve event to extract
+        output_path: Path to output video file
+        buffer_seconds: Buffer time in seconds before and after serve
+    
+    Returns:
+        True if successful
+    """
+    # Get video info to determine FPS
+    info = get_video_info(video_path)
+    buffer_frames = int(buffer_seconds * info['fps'])
+    
+    return extract_frame_range(
+        video_path,
+        max(0, serve_event.start_frame - buffer_frames),
+        serve_event.end_frame + buffer_frames,
+        output_path
+    )
+
+
+def extract_serve_clips_batch(
+    video_path: str,
+    serve_events: List[ServeEvent],
+    output_paths: List[str],
+    buffer_seconds: float = 1.0
+) -> List[str]:
+    """
+    Extract several serve clips in a single sequential pass over the video.
+    
+    Each frame is read once and written to every clip whose (buffered) range
+    contains it, so overlapping clips are supported. Frames outside all clips
+    are grabbed without being retrieved.
+    
+    Args:
+        video_path: Path to input video
+        serve_events: Serve events to extract
+        output_paths: Output video path for each serve event
+        buffer_seconds: Buffer time in seconds before and after each serve
+    
+    Returns:
+        List of written clip paths (clips starting past the end of the
+        video are skipped)
+    """
+    if len(serve_events) != len(output_paths):
+        raise ValueError("serve_events and output_paths must have the same length")
+    if not serve_events:
+        return []
+    
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+    
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    buffer_frames = int(buffer_seconds * fps)
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    
+    # Clip ranges sorted by start frame
+    clips = sorted(
+        (
+            max(0, event.start_frame - buffer_frames),
+            event.end_frame + buffer_frames,
+            Path(path)
+        )
+        for event, path in zip(serve_events, output_paths)
+    )
+    last_frame = max(end for _, end, _ in clips)
+    
+    active = []  # (end_frame, writer)
+    written = []
+    next_clip = 0
+    
+    try:
+        # Start reading at the first clip
+        frame_idx = clips[0][0]
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+        
+        while frame_idx <= last_frame:
+            # Open writers for clips starting at this frame
+            while next_clip < len(clips) and clips[next_clip][0] <= frame_idx:
+                _, end_frame, output_path = clips[next_clip]
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                active.append((
+                    end_frame,
+                    cv2.VideoWriter(str(output_path), fourcc, fps, (width, height))
+                ))
+                written.append(str(output_path))
+                next_clip += 1
+            
+            if active:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                for _, writer in active:
+                    writer.write(frame)
+            elif not cap.grab():
+                break
+            
+            # Close writers for clips ending at this frame
+            for end_frame, writer in active:
+                if end_frame <= frame_idx:
+                    writer.release()
+            active = [(end, writer) for end, writer in active if end > frame_idx]
+            
+            frame_idx += 1
+    
+    finally:
+        cap.release()
+        for _, writer in active:
+            writer.release()
+    
+    return written
+
+
+def overlay_pose_on_clip(
+    clip_path: str,
+    output_path: str,
+    pose_frames: List[PoseFrame],
+    first_frame: int,
+    style: str = "skeleton"
+) -> int:
+    """
+    Write a copy of a clip with pose landmarks drawn on its frames.
+    
+    Args:
+        clip_path: Clip cut from the source video
+        output_path: Path to the overlaid copy
+        pose_frames: Pose frames of the source video; clip frames without
+            one are copied unchanged
+        first_frame: Source-video index of the clip's first frame
+        style: One of LANDMARK_STYLES
+    
+    Returns:
+        Number of frames a pose was drawn on
+    """
+    landmarks_by_frame = {frame.frame_idx: frame.landmarks for frame in pose_frames}
+    
+    cap = cv2.VideoCapture(str(clip_path))
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {clip_path}")
+    
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(str(output_path), fourcc, fps, (width, height))
+    
+    drawn = 0
+    frame_idx = first_frame
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            landmarks = landmarks_by_frame.get(frame_idx)
+            if landmarks is not None:
+                draw_pose(frame, landmarks, style=style)
+                drawn += 1
+            out.write(frame)
+            frame_idx += 1
+    finally:
+        cap.release()
+        out.release()
+    
+    return drawn
+
+
 def get_video_info(video_path: str) -> Dict[str, any]:
     """
     Get video information.
@@ -261,14 +481,45 @@ def assess_video_quality(video_path: str) -> Dict[str, float]:
         'width': info['width'],
         'height': info['height'],
         'fps': info['fps'],
-        'duration_seconds': info['duration_seconds']
+        'duration_seconds': info['duration_seconds'],
+        'codec': info['codec_str'].strip().lower()
     }
 
 
+# FourCCs of codecs that decode efficiently and need no re-encode
+EFFICIENT_CODECS = frozenset({'avc1', 'h264', 'x264', 'hev1', 'hvc1', 'hevc', 'h265'})
+
+
+def needs_optimization(
+    quality_metrics: Dict[str, float],
+    target_resolution: Tuple[int, int] = (1280, 720)
+) -> bool:
+    """
+    Check whether a video must be re-encoded before processing.
+    
+    A video already within the target resolution and encoded as H.264 or
+    HEVC gains nothing from optimize_video_for_processing.
+    
+    Args:
+        quality_metrics: Metrics returned by assess_video_quality
+        target_resolution: Target resolution (width, height)
+    
+    Returns:
+        True if the video should be optimized
+    """
+    target_width, target_height = target_resolution
+    return not (
+        quality_metrics['width'] <= target_width
+        and quality_metrics['height'] <= target_height
+        and quality_metrics.get('codec') in EFFICIENT_CODECS
+    )
+
+
 def optimize_video_for_processing(
     video_path: str,
     target_resolution: Tuple[int, int] = (1280, 720),
-    target_fps: float = 30.0
+    target_fps: float = 30.0,
+    output_path: Optional[str] = None
 ) -> str:
     """
     Optimize video for processing.
@@ -277,12 +528,16 @@ def optimize_video_for_processing(
         video_path: Path to input video
         target_resolution: Target resolution (width, height)
         target_fps: Target frames per second
+        output_path: Output path (defaults to "<stem>_optimized" next to input)
     
     Returns:
         Path to optimized video
     """
     input_path = Path(video_path)
-    output_path = input_path.parent / f"{input_path.stem}_optimized{input_path.suffix}"
+    if output_path is None:
+        output_path = input_path.parent / f"{input_path.stem}_optimized{input_path.suffix}"
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
     
     cap = cv2.VideoCapture(str(input_path))
     if not cap.isOpened():
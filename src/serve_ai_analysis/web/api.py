@@ -11,12 +11,12 @@ from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
-import json
+from dataclasses import replace
 
 # Import the serve analysis modules
 from ..video import (
     detect_serves,
-    detect_ball_trajectory,
+    detect_ball_trajectory_array,
     filter_ball_detections,
     load_video,
     save_video_segment,
@@ -179,9 +179,9 @@ async def upload_video(
     analysis_config = AnalysisRequest()
     if config:
         try:
-            config_dict = json.loads(config)
-            analysis_config = AnalysisRequest(**config_dict)
-        except (json.JSONDecodeError, ValueError) as e:
+            # Parses and validates in one pass, without an intermediate dict
+            analysis_config = AnalysisRequest.model_validate_json(config)
+        except ValueError as e:
             print(f"Warning: Invalid config JSON: {e}")
     
     # Start background analysis
@@ -304,22 +304,23 @@ async def run_analysis(task_id: str, video_path: Path, config: AnalysisRequest):
         
         # Detect ball trajectory
         print(f"🏐 Detecting ball trajectory...")
-        ball_detections = await asyncio.get_event_loop().run_in_executor(
-            executor, detect_ball_trajectory, str(processing_video_path)
+        ball_trajectory = await asyncio.get_event_loop().run_in_executor(
+            executor, detect_ball_trajectory_array, str(processing_video_path)
         )
-        print(f"✅ Ball detection complete: {len(ball_detections)} detections")
+        print(f"✅ Ball detection complete: {len(ball_trajectory.detected_frames())} detections")
         
         # Detect serves with user config
-        serve_config = DEFAULT_SERVE_CONFIG.copy()
-        serve_config.update({
-            "min_serve_duration": config.min_serve_duration,
-            "max_serve_duration": config.max_serve_duration,
-            "confidence_threshold": config.confidence_threshold
-        })
+        fps = video_quality["fps"] or 30.0
+        serve_config = replace(
+            DEFAULT_SERVE_CONFIG,
+            serve_min_duration=int(config.min_serve_duration * fps),
+            serve_max_duration=int(config.max_serve_duration * fps),
+            confidence_threshold=config.confidence_threshold
+        )
         
         print(f"🎯 Detecting serves with config: {serve_config}")
         serves = await asyncio.get_event_loop().run_in_executor(
-            executor, detect_serves, pose_frames, ball_detections, serve_config
+            executor, detect_serves, pose_frames, ball_trajectory, serve_config
         )
         print(f"✅ Serve detection complete: {len(serves)} serves found")
         
@@ -340,7 +341,8 @@ async def run_analysis(task_id: str, video_path: Path, config: AnalysisRequest):
             str(processing_video_path), 
             serves, 
             pose_data,
-            config.include_landmarks
+            config.include_landmarks,
+            config.landmark_style
         )
         print(f"✅ Serve segmentation complete: {len(serve_segments)} segments")
         
@@ -348,8 +350,9 @@ async def run_analysis(task_id: str, video_path: Path, config: AnalysisRequest):
         task.progress = 0.9
         task.message = "Creating output archive..."
         print(f"📦 Creating ZIP archive...")
+        config_used = config.model_dump()
         zip_path = await asyncio.get_event_loop().run_in_executor(
-            executor, create_serve_archive, task_id, serve_segments, config.dict()
+            executor, create_serve_archive, task_id, serve_segments, config_used
         )
         print(f"✅ ZIP archive created: {zip_path}")
         
@@ -363,7 +366,7 @@ async def run_analysis(task_id: str, video_path: Path, config: AnalysisRequest):
             "serve_segments": serve_segments,
             "video_quality": video_quality,
             "download_url": f"/api/download/{task_id}/archive",
-            "config_used": config.dict(),
+            "config_used": config_used,
             "zip_path": str(zip_path)
         }
         print(f"🎉 Analysis completed successfully for task {task_id}")
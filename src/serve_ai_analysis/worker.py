@@ -0,0 +1,47 @@
+"""Lightweight worker entry point that bypasses the Typer CLI.
+
+Lets scripts and subprocesses run a single pipeline step without building
+the full command tree, e.g.::
+
+    python -m serve_ai_analysis.worker extract_clip input.mp4 120 210 serve_001.mp4
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+
+def _extract_clip(args: argparse.Namespace) -> int:
+    """Copy a frame range of a video to a clip."""
+    from .video.video_utils import extract_frame_range
+    
+    ok = extract_frame_range(args.video_path, args.start_frame, args.end_frame, args.output_path)
+    return 0 if ok else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run a worker task.
+    
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+    
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(prog="python -m serve_ai_analysis.worker")
+    tasks = parser.add_subparsers(dest="task", required=True)
+    
+    extract_clip = tasks.add_parser("extract_clip", help="Copy a frame range to a new video")
+    extract_clip.add_argument("video_path")
+    extract_clip.add_argument("start_frame", type=int)
+    extract_clip.add_argument("end_frame", type=int)
+    extract_clip.add_argument("output_path")
+    extract_clip.set_defaults(run=_extract_clip)
+    
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
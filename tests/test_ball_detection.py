@@ -0,0 +1,220 @@
+"""Unit tests for ball detection."""
+
+import cv2
+import numpy as np
+import pytest
+
+from serve_ai_analysis.video.ball_detection import (
+    AdaptiveFrameSkip,
+    BallDetection,
+    ball_trajectory_from_detections,
+    detect_ball_in_frame,
+    detect_ball_trajectory,
+    detect_ball_trajectory_array,
+    filter_ball_detections,
+    filter_ball_trajectory,
+    get_ball_trajectory_stats
+)
+from serve_ai_analysis.video import ball_detection
+
+
+class TestDetectBallInFrame:
+    """Test single-frame ball detection."""
+    
+    def test_detects_ball_colored_circle(self):
+        """Test that a ball-colored circle is detected at its position."""
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        cv2.circle(frame, (100, 80), 15, (0, 128, 255), -1)  # Orange in BGR
+        
+        detections = detect_ball_in_frame(frame, frame_idx=7)
+        
+        assert len(detections) == 1
+        assert detections[0].frame_idx == 7
+        assert detections[0].x == pytest.approx(100, abs=2)
+        assert detections[0].y == pytest.approx(80, abs=2)
+    
+    def test_rejects_elongated_and_small_blobs(self):
+        """Test that only the round, ball-sized blob passes the contour filters."""
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        cv2.circle(frame, (100, 80), 15, (0, 128, 255), -1)
+        cv2.rectangle(frame, (200, 20), (300, 35), (0, 128, 255), -1)
+        cv2.circle(frame, (60, 200), 3, (0, 128, 255), -1)
+        
+        detections = detect_ball_in_frame(frame, frame_idx=0)
+        
+        assert [(round(d.x), round(d.y)) for d in detections] == [(100, 80)]
+        assert 0 < detections[0].confidence <= 1
+    
+    def test_opencl_path_matches(self):
+        """Test that the T-API path finds the same ball (on the CPU without OpenCL)."""
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        cv2.circle(frame, (100, 80), 15, (0, 128, 255), -1)
+        
+        assert detect_ball_in_frame(frame, 0, use_opencl=True) == detect_ball_in_frame(frame, 0)
+    
+    def test_empty_frame(self):
+        """Test that a blank frame yields no detections."""
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        
+        assert detect_ball_in_frame(frame, frame_idx=0) == []
+
+
+class TestBallTrajectory:
+    """Test frame-indexed ball trajectories."""
+    
+    def test_keeps_most_confident_candidate(self):
+        """Test that each frame keeps its best candidate and gaps are empty."""
+        trajectory = ball_trajectory_from_detections([
+            BallDetection(frame_idx=1, x=10.0, y=20.0, confidence=0.4, radius=5.0),
+            BallDetection(frame_idx=1, x=30.0, y=40.0, confidence=0.9, radius=6.0),
+            BallDetection(frame_idx=3, x=50.0, y=60.0, confidence=0.5, radius=7.0)
+        ], n_frames=5)
+        
+        assert len(trajectory) == 5
+        assert trajectory.detected_frames().tolist() == [1, 3]
+        assert trajectory.detection(1).x == pytest.approx(30.0)
+        assert trajectory.detection(2) is None
+        assert trajectory.confidence[0] == 0.0
+    
+    def test_filter_matches_list_filter(self):
+        """Test that the in-place filter drops the same detections as the list filter."""
+        detections = [
+            BallDetection(frame_idx=0, x=0.0, y=0.0, confidence=0.8, radius=5.0),
+            BallDetection(frame_idx=1, x=50.0, y=0.0, confidence=0.2, radius=5.0),
+            BallDetection(frame_idx=2, x=500.0, y=0.0, confidence=0.8, radius=5.0),
+            BallDetection(frame_idx=3, x=80.0, y=0.0, confidence=0.8, radius=5.0)
+        ]
+        trajectory = ball_trajectory_from_detections(detections)
+        
+        result = filter_ball_trajectory(trajectory, min_confidence=0.3, max_jump_distance=100.0)
+        expected = filter_ball_detections(detections, min_confidence=0.3, max_jump_distance=100.0)
+        
+        assert [d.frame_idx for d in expected] == [0, 3]
+        assert result is trajectory
+        assert trajectory.detected_frames().tolist() == [d.frame_idx for d in expected]
+        assert np.isnan(trajectory.radius[2])
+    
+    def test_jump_mask_measures_from_last_kept(self):
+        """Test that jumps are measured from the last kept point, compiled or not."""
+        xy = np.array([[0.0, 0.0], [300.0, 0.0], [60.0, 80.0], [120.0, 160.0]])
+        kernel = getattr(ball_detection._jump_mask, "py_func", ball_detection._jump_mask)
+        
+        assert ball_detection._jump_mask(xy, 100.0).tolist() == [True, False, True, True]
+        assert kernel(xy, 100.0).tolist() == [True, False, True, True]
+
+
+class TestBallTrajectoryStats:
+    """Test ball trajectory statistics."""
+    
+    def test_ranges_and_confidence(self):
+        """Test coordinate ranges and mean confidence."""
+        detections = [
+            BallDetection(frame_idx=2, x=10.0, y=50.0, confidence=0.4, radius=3.0),
+            BallDetection(frame_idx=5, x=30.0, y=20.0, confidence=0.8, radius=3.0)
+        ]
+        
+        stats = get_ball_trajectory_stats(detections)
+        
+        assert stats['x_range'] == (10.0, 30.0)
+        assert stats['y_range'] == (20.0, 50.0)
+        assert stats['avg_confidence'] == pytest.approx(0.6)
+        assert stats['frame_span'] == 4
+    
+    def test_trajectory_matches_list(self):
+        """Test that a BallTrajectory gives the same stats as its detections."""
+        detections = [
+            BallDetection(frame_idx=2, x=10.0, y=50.0, confidence=0.5, radius=3.0),
+            BallDetection(frame_idx=5, x=30.0, y=20.0, confidence=0.75, radius=3.0)
+        ]
+        
+        stats = get_ball_trajectory_stats(ball_trajectory_from_detections(detections, n_frames=8))
+        
+        assert stats == get_ball_trajectory_stats(detections)
+        assert get_ball_trajectory_stats(ball_trajectory_from_detections([], n_frames=3)) == {}
+
+
+class TestDetectBallTrajectory:
+    """Test ball detection over a video."""
+    
+    def test_array_matches_list(self, tmp_path):
+        """Test that the array variant packs the list variant's detections."""
+        video_path = tmp_path / "ball.avi"
+        writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (320, 240))
+        for i in range(6):
+            frame = np.zeros((240, 320, 3), dtype=np.uint8)
+            if i % 2 == 0:
+                cv2.circle(frame, (60 + 30 * i, 100), 15, (0, 128, 255), -1)
+            writer.write(frame)
+        writer.release()
+        
+        detections = detect_ball_trajectory(str(video_path))
+        trajectory = detect_ball_trajectory_array(str(video_path))
+        
+        assert [d.frame_idx for d in detections] == [0, 2, 4]
+        assert len(trajectory) == 6
+        assert trajectory.detected_frames().tolist() == [0, 2, 4]
+        assert trajectory.positions[4] == pytest.approx([detections[2].x, detections[2].y])
+        assert trajectory.confidence[2] == pytest.approx(detections[1].confidence)
+    
+    def test_long_frame_skip_seeks_to_detector_frames(self, tmp_path):
+        """Test that seeking over long skips lands on the right frames."""
+        video_path = tmp_path / "ball.avi"
+        writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (320, 240))
+        for i in range(100):
+            frame = np.zeros((240, 320, 3), dtype=np.uint8)
+            cv2.circle(frame, (30 + 2 * i, 100), 15, (0, 128, 255), -1)
+            writer.write(frame)
+        writer.release()
+        
+        detections = detect_ball_trajectory(str(video_path), frame_skip=40)
+        
+        assert [d.frame_idx for d in detections] == [0, 40, 80]
+        assert [d.x for d in detections] == pytest.approx([30, 110, 190], abs=2)
+    
+    def test_hwaccel_falls_back_to_software(self, tmp_path):
+        """Test that requesting hardware decode still reads the video without a GPU."""
+        video_path = tmp_path / "ball.avi"
+        writer = cv2.VideoWriter(str(video_path), cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (320, 240))
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        cv2.circle(frame, (100, 80), 15, (0, 128, 255), -1)
+        for _ in range(3):
+            writer.write(frame)
+        writer.release()
+        
+        detections = detect_ball_trajectory(str(video_path), hwaccel="auto")
+        
+        assert [d.frame_idx for d in detections] == [0, 1, 2]
+        with pytest.raises(ValueError):
+            detect_ball_trajectory(str(video_path), hwaccel="nvdec")
+
+
+class TestAdaptiveFrameSkip:
+    """Test motion-driven ball detection frame selection."""
+    
+    def run(self, skipper, frames):
+        """Feed frames through the skipper, returning the detected indices."""
+        detected = []
+        for frame_idx, frame in enumerate(frames):
+            if skipper.should_detect(frame_idx):
+                detections = detect_ball_in_frame(frame, frame_idx)
+                skipper.update(frame_idx, frame, detections)
+                detected.append(frame_idx)
+        return detected
+    
+    def test_stride_doubles_on_static_scene(self):
+        """Test that the stride grows up to max_skip when nothing changes."""
+        frames = [np.zeros((240, 320, 3), dtype=np.uint8)] * 40
+        
+        detected = self.run(AdaptiveFrameSkip(max_skip=8), frames)
+        
+        assert detected == [0, 1, 3, 7, 15, 23, 31, 39]
+    
+    def test_new_ball_resets_stride(self):
+        """Test that a ball appearing brings detection back to every frame."""
+        blank = np.zeros((240, 320, 3), dtype=np.uint8)
+        ball = blank.copy()
+        cv2.circle(ball, (100, 80), 15, (0, 128, 255), -1)
+        
+        detected = self.run(AdaptiveFrameSkip(max_skip=8), [blank] * 7 + [ball] * 5)
+        
+        assert detected == [0, 1, 3, 7, 8, 10]
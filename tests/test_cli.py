@@ -6,7 +6,7 @@ import tempfile
 import shutil
 from typer.testing import CliRunner
 
-from serve_ai_analysis.cli import app
+from serve_ai_analysis.cli import app, AnalysisConfig
 
 runner = CliRunner()
 
@@ -29,6 +29,12 @@ def test_init():
         for dir_name in expected_dirs:
             assert (output_path / dir_name).exists()
 
+def test_analysis_config_validates_confidence():
+    """Test that an out-of-range confidence threshold is rejected."""
+    assert AnalysisConfig(input_video=Path("serve.mp4")).confidence_threshold == 0.5
+    with pytest.raises(ValueError):
+        AnalysisConfig(input_video=Path("serve.mp4"), confidence_threshold=1.5)
+
 def test_analyze_help():
     """Test the analyze command help."""
     result = runner.invoke(app, ["analyze", "--help"])
@@ -59,6 +65,27 @@ def test_metrics_help():
     assert result.exit_code == 0
     assert "Calculate biomechanical metrics from pose data" in result.stdout
 
+def test_metrics_writes_json(tmp_path):
+    """Test the metrics command on saved pose files, one serve per file."""
+    from serve_ai_analysis.pose.pose_estimation import PoseFrame, PoseLandmark, save_pose_frames
+    
+    frames = [
+        PoseFrame(i, {'right_wrist': PoseLandmark(0.5, 0.2 + 0.01 * i, 0.0, 0.9)}, i / 30.0)
+        for i in range(5)
+    ]
+    pose_paths = [tmp_path / "serve_1.pose.npz", tmp_path / "serve_2.pose.npz"]
+    for pose_path in pose_paths:
+        save_pose_frames(frames, str(pose_path))
+    
+    single = runner.invoke(app, ["metrics", str(pose_paths[0]), "--output-dir", str(tmp_path / "one")])
+    batch = runner.invoke(app, ["metrics", *map(str, pose_paths), "--output-dir", str(tmp_path)])
+    
+    assert single.exit_code == 0
+    assert (tmp_path / "one" / "metrics" / "serve_1_metrics.json").exists()
+    assert batch.exit_code == 0
+    assert (tmp_path / "metrics" / "serve_1_metrics.json").exists()
+    assert (tmp_path / "metrics" / "serve_2_metrics.json").exists()
+
 def test_dashboard_help():
     """Test the dashboard command help."""
     result = runner.invoke(app, ["dashboard", "--help"])
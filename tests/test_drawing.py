@@ -0,0 +1,99 @@
+"""Unit tests for pose overlay drawing."""
+
+import cv2
+import numpy as np
+import pytest
+
+from serve_ai_analysis.pose import LANDMARK_INDEX, PoseFrame, PoseLandmark, draw_pose
+from serve_ai_analysis.video.video_utils import overlay_pose_on_clip
+
+
+def make_landmarks(**landmarks) -> np.ndarray:
+    """Pack named PoseLandmarks into an (L, 4) array."""
+    return PoseFrame(frame_idx=0, landmarks=landmarks, timestamp=0.0).landmarks
+
+
+class TestDrawPose:
+    """Test drawing landmarks and skeleton edges."""
+    
+    def test_skeleton_and_points(self):
+        """Test that visible connections and points are drawn."""
+        image = np.zeros((100, 100, 3), dtype=np.uint8)
+        landmarks = make_landmarks(
+            right_shoulder=PoseLandmark(0.2, 0.5, 0.0, 0.9),
+            right_elbow=PoseLandmark(0.8, 0.5, 0.0, 0.9),
+            right_wrist=PoseLandmark(0.8, 0.9, 0.0, 0.1)
+        )
+        
+        result = draw_pose(image, landmarks, line_color=(255, 0, 0), point_color=(0, 255, 0))
+        
+        assert result is image
+        assert image[50, 50].tolist() == [255, 0, 0]  # shoulder-elbow edge
+        assert image[50, 20].tolist() == [0, 255, 0]  # shoulder point
+        assert not image[70:, 80].any()  # low-visibility wrist and its edge
+    
+    def test_points_only(self):
+        """Test that the points style draws no edges."""
+        image = np.zeros((100, 100, 3), dtype=np.uint8)
+        landmarks = make_landmarks(
+            right_shoulder=PoseLandmark(0.2, 0.5, 0.0, 0.9),
+            right_elbow=PoseLandmark(0.8, 0.5, 0.0, 0.9)
+        )
+        
+        draw_pose(image, landmarks, style="points")
+        
+        assert image[50, 20].any()
+        assert not image[50, 50].any()
+    
+    def test_missing_landmarks_skipped_without_threshold(self):
+        """Test that missing landmarks are not drawn at the origin when min_visibility is 0."""
+        image = np.zeros((100, 100, 3), dtype=np.uint8)
+        landmarks = make_landmarks(right_shoulder=PoseLandmark(0.5, 0.5, 0.0, 0.9))
+        
+        draw_pose(image, landmarks, min_visibility=0.0)
+        
+        assert image[50, 50].any()
+        assert not image[:10, :10].any()
+    
+    def test_invalid_style(self):
+        """Test that unknown styles are rejected."""
+        image = np.zeros((10, 10, 3), dtype=np.uint8)
+        landmarks = np.zeros((len(LANDMARK_INDEX), 4), dtype=np.float32)
+        
+        with pytest.raises(ValueError):
+            draw_pose(image, landmarks, style="mesh")
+
+
+class TestOverlayPoseOnClip:
+    """Test drawing pose frames onto an extracted clip."""
+    
+    def test_frames_matched_by_source_index(self, tmp_path):
+        """Test that poses land on the clip frames with the same source index."""
+        clip_path = tmp_path / "clip.avi"
+        writer = cv2.VideoWriter(str(clip_path), cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (64, 64))
+        for _ in range(4):
+            writer.write(np.zeros((64, 64, 3), dtype=np.uint8))
+        writer.release()
+        
+        landmarks = {'right_shoulder': PoseLandmark(0.5, 0.5, 0.0, 0.9)}
+        pose_frames = [
+            PoseFrame(frame_idx=idx, landmarks=landmarks, timestamp=idx / 30.0)
+            for idx in (5, 11, 12)
+        ]
+        output_path = tmp_path / "overlay.mp4"
+        
+        drawn = overlay_pose_on_clip(
+            str(clip_path), str(output_path), pose_frames, first_frame=10, style="points"
+        )
+        
+        assert drawn == 2
+        cap = cv2.VideoCapture(str(output_path))
+        brightness = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            brightness.append(frame[32, 32].max())
+        cap.release()
+        assert len(brightness) == 4
+        assert [value > 100 for value in brightness] == [False, True, True, False]
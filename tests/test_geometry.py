@@ -0,0 +1,105 @@
+"""Unit tests for batched pose geometry kernels."""
+
+import pytest
+import numpy as np
+
+from serve_ai_analysis.pose.geometry import (
+    angles_batch,
+    distances_batch,
+    velocities_batch,
+    _angles_numpy,
+    _distances_numpy,
+    _velocities_numpy
+)
+from serve_ai_analysis.pose.pose_estimation import PoseLandmark, calculate_landmark_distance
+
+
+def random_rows(rng, n):
+    """Random (N, 4) landmark rows with some missing landmarks."""
+    rows = rng.random((n, 4)).astype(np.float32)
+    rows[rng.random(n) < 0.2, :3] = np.nan
+    return rows
+
+
+class TestAnglesBatch:
+    """Test batched joint angles."""
+    
+    def test_right_angle(self):
+        """Test a known right angle and NaN for a missing landmark."""
+        p1 = np.array([[1.0, 0.0, 0.0, 1.0], [np.nan, np.nan, np.nan, 0.0]])
+        p2 = np.zeros((2, 4))
+        p3 = np.array([[0.0, 1.0, 0.0, 1.0], [0.0, 1.0, 0.0, 1.0]])
+        
+        angles = angles_batch(p1, p2, p3)
+        
+        assert angles.dtype == np.float64
+        assert angles[0] == pytest.approx(90.0)
+        assert np.isnan(angles[1])
+    
+    def test_matches_numpy(self):
+        """Test that the dispatched implementation matches the NumPy one."""
+        rng = np.random.default_rng(0)
+        p1, p2, p3 = (random_rows(rng, 200) for _ in range(3))
+        
+        angles = angles_batch(p1, p2, p3)
+        
+        assert angles.dtype == np.float32
+        np.testing.assert_allclose(angles, _angles_numpy(p1, p2, p3), rtol=1e-4)
+
+
+class TestDistancesBatch:
+    """Test batched landmark pair distances."""
+    
+    def test_known_distance(self):
+        """Test a 3-4-5 triangle and NaN for a missing landmark."""
+        coords = np.array([[[0.0, 0.0, 0.0], [3.0, 4.0, 0.0], [np.nan] * 3]])
+        
+        distances = distances_batch(coords, [[0, 1], [0, 2]])
+        
+        assert distances.shape == (1, 2)
+        assert distances[0, 0] == pytest.approx(5.0)
+        assert np.isnan(distances[0, 1])
+    
+    def test_matches_numpy(self):
+        """Test that the dispatched implementation matches the NumPy one."""
+        rng = np.random.default_rng(2)
+        coords = rng.random((40, 13, 3)).astype(np.float32)
+        coords[rng.random((40, 13)) < 0.2] = np.nan
+        pairs = np.array([[1, 2], [3, 5], [4, 6], [7, 8]])
+        
+        distances = distances_batch(coords, pairs)
+        
+        assert distances.dtype == np.float32
+        np.testing.assert_allclose(distances, _distances_numpy(coords, pairs), rtol=1e-5)
+    
+    def test_single_pair_wrapper(self):
+        """Test that calculate_landmark_distance matches the batch kernel."""
+        distance = calculate_landmark_distance(
+            PoseLandmark(0.0, 0.0, 0.0, 1.0), PoseLandmark(3.0, 4.0, 12.0, 1.0)
+        )
+        
+        assert isinstance(distance, float)
+        assert distance == pytest.approx(13.0)
+
+
+class TestVelocitiesBatch:
+    """Test batched landmark velocities."""
+    
+    def test_matches_numpy(self):
+        """Test that the dispatched implementation matches the NumPy one."""
+        rng = np.random.default_rng(1)
+        coords = rng.random((50, 13, 3)).astype(np.float32)
+        coords[rng.random((50, 13)) < 0.2] = np.nan
+        timestamps = np.arange(50) / 30.0
+        timestamps[10] = timestamps[9]
+        
+        velocities = velocities_batch(coords, timestamps)
+        
+        assert velocities.shape == (49, 13, 3)
+        assert velocities.dtype == np.float32
+        assert np.isnan(velocities[9]).all()
+        np.testing.assert_allclose(velocities, _velocities_numpy(coords, timestamps), rtol=1e-5)
+    
+    def test_single_frame(self):
+        """Test that a single frame has no velocities."""
+        assert velocities_batch(np.zeros((1, 13, 3)), np.zeros(1)).shape == (0, 13, 3)
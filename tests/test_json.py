@@ -0,0 +1,85 @@
+"""Unit tests for JSON output helpers."""
+
+import json
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+from serve_ai_analysis import _json
+from serve_ai_analysis._json import dumps_json, write_json, write_json_array
+
+
+@dataclass
+class Record:
+    name: str
+    value: float
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_write_json_serializes_numpy(tmp_path, monkeypatch, use_orjson):
+    """Test that arrays and NumPy scalars are written as plain JSON."""
+    if use_orjson and not _json.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(_json, "ORJSON_AVAILABLE", use_orjson)
+    output_path = tmp_path / "data.json"
+    
+    write_json({
+        "scores": np.array([0.5, 1.5], dtype=np.float32),
+        "count": np.int64(3),
+        "path": tmp_path,
+        "records": [Record("a", 1.0)]
+    }, output_path)
+    
+    data = json.loads(output_path.read_text())
+    assert data == {
+        "scores": [0.5, 1.5],
+        "count": 3,
+        "path": str(tmp_path),
+        "records": [{"name": "a", "value": 1.0}]
+    }
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_write_json_compact(tmp_path, monkeypatch, use_orjson):
+    """Test that indentation can be turned off."""
+    if use_orjson and not _json.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(_json, "ORJSON_AVAILABLE", use_orjson)
+    output_path = tmp_path / "data.json"
+    
+    write_json({"values": np.arange(3)}, output_path, indent=False)
+    
+    assert output_path.read_text() == '{"values":[0,1,2]}'
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_write_json_array_streams_items(tmp_path, monkeypatch, use_orjson):
+    """Test that items from a generator are written as a JSON array."""
+    if use_orjson and not _json.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(_json, "ORJSON_AVAILABLE", use_orjson)
+    output_path = tmp_path / "items.json"
+    
+    write_json_array((Record(str(i), np.float32(i)) for i in range(3)), output_path)
+    assert json.loads(output_path.read_text()) == [
+        {"name": "0", "value": 0.0},
+        {"name": "1", "value": 1.0},
+        {"name": "2", "value": 2.0}
+    ]
+    
+    write_json_array([], output_path)
+    assert json.loads(output_path.read_text()) == []
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_json(monkeypatch, use_orjson):
+    """Test that both encoders return the same indented UTF-8 bytes."""
+    if use_orjson and not _json.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(_json, "ORJSON_AVAILABLE", use_orjson)
+    
+    assert dumps_json({"name": "saque", "values": np.arange(2)}) == (
+        b'{\n  "name": "saque",\n  "values": [\n    0,\n    1\n  ]\n}'
+    )
+    assert dumps_json({"a": 1}, indent=False) == b'{"a":1}'
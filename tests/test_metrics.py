@@ -0,0 +1,191 @@
+"""Unit tests for biomechanical metrics calculation."""
+
+import json
+import os
+
+import pytest
+import numpy as np
+
+from serve_ai_analysis.metrics import calculator
+from serve_ai_analysis.metrics.calculator import (
+    BiomechanicalCalculator,
+    JOINT_ANGLE_DTYPE,
+    VELOCITY_DTYPE,
+    RIGHT_HIP,
+    RIGHT_WRIST,
+    calculate_metrics_from_file,
+    performance_scores
+)
+from serve_ai_analysis.pose.pose_estimation import PoseFrame, PoseLandmark, save_pose_frames
+
+
+def create_arm_frame(frame_idx: int, wrist_y: float) -> PoseFrame:
+    """Create a pose frame with a right arm for testing."""
+    return PoseFrame(
+        frame_idx=frame_idx,
+        landmarks={
+            'right_shoulder': PoseLandmark(0.5, 0.4, 0.0, 0.9),
+            'right_elbow': PoseLandmark(0.55, 0.3, 0.0, 0.9),
+            'right_wrist': PoseLandmark(0.6, wrist_y, 0.0, 0.9)
+        },
+        timestamp=frame_idx / 30.0
+    )
+
+
+class TestCalculateServeMetrics:
+    """Test serve metrics calculation."""
+    
+    def test_generator_matches_list(self):
+        """Test that streaming frames gives the same metrics as a list."""
+        frames = [create_arm_frame(i, 0.2 + 0.01 * i) for i in range(10)]
+        calculator = BiomechanicalCalculator()
+        
+        from_list = calculator.calculate_serve_metrics(frames)
+        from_iter = calculator.calculate_serve_metrics(f for f in frames)
+        
+        assert from_iter.duration == from_list.duration
+        assert from_iter.performance_score == from_list.performance_score
+        np.testing.assert_array_equal(from_iter.joint_angles, from_list.joint_angles)
+        np.testing.assert_array_equal(from_iter.velocities, from_list.velocities)
+        assert from_list.duration == pytest.approx(9 / 30.0)
+        assert len(from_list.velocities) == 9
+        assert from_list.ball_toss_height == pytest.approx(1.6)
+        assert from_list.racket_speed_at_contact == max(v.speed for v in from_list.velocities)
+    
+    def test_save_metrics_columns(self, tmp_path):
+        """Test that saved metrics store records column-wise."""
+        frames = [create_arm_frame(i, 0.2 + 0.01 * i) for i in range(3)]
+        calculator = BiomechanicalCalculator()
+        metrics = calculator.calculate_serve_metrics(frames)
+        output_path = tmp_path / "metrics.json"
+        
+        calculator.save_metrics(metrics, output_path)
+        
+        data = json.loads(output_path.read_text())
+        assert data["serve_id"] == "serve_1"
+        assert data["velocities"]["frames"] == [1, 2]
+        assert data["velocities"]["speeds"] == pytest.approx([v.speed for v in metrics.velocities])
+        assert data["velocities"]["velocity"][0] == pytest.approx([
+            metrics.velocities[0].velocity_x,
+            metrics.velocities[0].velocity_y,
+            metrics.velocities[0].velocity_z
+        ])
+        assert data["joint_angles"]["names"] == ["right_elbow_flexion"] * 3
+        assert data["joint_angles"]["frames"] == [0, 1, 2]
+    
+    def test_save_metrics_npz(self, tmp_path):
+        """Test the binary metrics output."""
+        frames = [create_arm_frame(i, 0.2 + 0.01 * i) for i in range(3)]
+        calculator = BiomechanicalCalculator()
+        metrics = calculator.calculate_serve_metrics(frames)
+        output_path = tmp_path / "metrics.npz"
+        
+        calculator.save_metrics(metrics, output_path)
+        
+        with np.load(output_path) as data:
+            assert json.loads(str(data["summary"]))["serve_id"] == "serve_1"
+            assert data["joint_angle_angles"].dtype == np.float32
+            assert data["joint_angle_angles"] == pytest.approx([ja.angle for ja in metrics.joint_angles])
+            assert data["velocity_velocity"].shape == (2, 3)
+    
+    def test_empty_frames_raise(self):
+        """Test that an empty iterable is rejected."""
+        with pytest.raises(ValueError):
+            BiomechanicalCalculator().calculate_serve_metrics(iter([]))
+    
+    def test_joint_angles_batch(self):
+        """Test batched joint angles and per-frame record ordering."""
+        frames = [create_arm_frame(0, 0.4), create_arm_frame(1, 0.2)]
+        frames[0].landmarks[RIGHT_WRIST, :3] = (0.65, 0.3, 0.0)
+        frames[0].landmarks[RIGHT_HIP] = (0.5, 0.7, 0.0, 0.9)
+        
+        metrics = BiomechanicalCalculator().calculate_serve_metrics(frames)
+        
+        assert [(ja.frame_number, ja.joint_name) for ja in metrics.joint_angles] == [
+            (0, "right_shoulder_abduction"),
+            (0, "right_elbow_flexion"),
+            (1, "right_elbow_flexion"),
+        ]
+        assert metrics.joint_angles[0].angle == pytest.approx(153.435, abs=1e-3)
+        assert metrics.joint_angles[1].angle == pytest.approx(116.565, abs=1e-3)
+        # Shoulder abduction above 150 degrees adds 10 to the base score of 50
+        assert metrics.performance_score == 60.0
+    
+    def test_records_are_columnar(self):
+        """Test that joint angles and velocities are record arrays."""
+        frames = [create_arm_frame(i, 0.2 + 0.01 * i) for i in range(4)]
+        
+        metrics = BiomechanicalCalculator().calculate_serve_metrics(frames)
+        
+        assert metrics.joint_angles.dtype == JOINT_ANGLE_DTYPE
+        assert metrics.velocities.dtype == VELOCITY_DTYPE
+        assert metrics.velocities.frame_number.tolist() == [1, 2, 3]
+        assert metrics.velocities[0].landmark_name == "right_wrist"
+        assert metrics.joint_angles.angle == pytest.approx([ja.angle for ja in metrics.joint_angles])
+    
+    def test_low_visibility_landmarks_skipped(self):
+        """Test that joints need every landmark above the visibility threshold."""
+        frames = [create_arm_frame(0, 0.4), create_arm_frame(1, 0.2)]
+        frames[1].landmarks[RIGHT_WRIST, 3] = 0.3
+        
+        metrics = BiomechanicalCalculator(min_visibility=0.5).calculate_serve_metrics(frames)
+        
+        assert [ja.frame_number for ja in metrics.joint_angles] == [0]
+    
+    def test_velocities_skip_missing_wrist(self):
+        """Test that frame pairs without a wrist produce no velocity."""
+        frames = [create_arm_frame(i, 0.2 + 0.01 * i) for i in range(4)]
+        frames[2].landmarks[RIGHT_WRIST] = (np.nan, np.nan, np.nan, 0.0)
+        
+        metrics = BiomechanicalCalculator().calculate_serve_metrics(frames)
+        
+        assert [v.frame_number for v in metrics.velocities] == [1]
+        assert metrics.velocities[0].velocity_y == pytest.approx(0.01 * 2.0 * 30.0)
+
+
+class TestPerformanceScores:
+    """Test vectorized serve scoring."""
+    
+    def test_buckets(self):
+        """Test each scoring bucket across a batch of serves."""
+        scores = performance_scores(
+            durations=[3.0, 2.2, 1.0, 3.0, np.nan],
+            max_speeds=[35.0, 25.0, 10.0, 35.0, np.nan],
+            max_shoulder_angles=[160.0, 100.0, 0.0, 160.0, np.nan]
+        )
+        
+        assert scores.tolist() == [100.0, 70.0, 50.0, 100.0, 50.0]
+
+
+class TestCalculateMetricsFromFile:
+    """Test memoized metrics for saved pose files."""
+    
+    def test_reused_until_file_changes(self, tmp_path, monkeypatch):
+        """Test that an unchanged file skips the loader and a rewrite reloads it."""
+        pose_path = tmp_path / "serve.pose.npz"
+        save_pose_frames([create_arm_frame(i, 0.2 + 0.01 * i) for i in range(5)], str(pose_path))
+        
+        loads = []
+        load_pose_frames = calculator.load_pose_frames
+        
+        def counting_load(path):
+            loads.append(path)
+            return load_pose_frames(path)
+        
+        monkeypatch.setattr(calculator, "load_pose_frames", counting_load)
+        
+        first = calculate_metrics_from_file(pose_path)
+        second = calculate_metrics_from_file(pose_path)
+        
+        assert len(loads) == 1
+        assert second is not first
+        assert second.velocities is not first.velocities
+        assert second.duration == first.duration
+        
+        save_pose_frames([create_arm_frame(i, 0.3) for i in range(3)], str(pose_path))
+        stat = pose_path.stat()
+        os.utime(pose_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        third = calculate_metrics_from_file(pose_path)
+        
+        assert len(loads) == 2
+        assert len(third.velocities) == 2
@@ -0,0 +1,57 @@
+"""Unit tests for wrist motion scoring."""
+
+import pytest
+import numpy as np
+
+from serve_ai_analysis.video.motion import compute_motion_scores, _motion_scores_numpy
+
+
+def reference_motion_scores(x, y, window):
+    """Straightforward per-frame implementation of the motion score."""
+    scores = np.zeros(len(x))
+    for i in range(window, len(x)):
+        scores[i] = sum(
+            np.sqrt((x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2)
+            for j in range(i - window, i)
+        )
+    return scores
+
+
+class TestComputeMotionScores:
+    """Test motion score implementations against the reference loop."""
+
+    def test_matches_reference(self):
+        """Test that the dispatched implementation matches the reference."""
+        rng = np.random.default_rng(0)
+        x, y = rng.random(120), rng.random(120)
+
+        scores = compute_motion_scores(x, y, window=15)
+
+        assert scores == pytest.approx(reference_motion_scores(x, y, 15), rel=1e-5)
+
+    def test_numpy_fallback_matches_reference(self):
+        """Test the pure NumPy implementation used without Numba."""
+        rng = np.random.default_rng(1)
+        x, y = rng.random(60), rng.random(60)
+
+        scores = _motion_scores_numpy(x, y, 15)
+
+        assert scores == pytest.approx(reference_motion_scores(x, y, 15), rel=1e-5)
+
+    def test_float32_preserved(self):
+        """Test that float32 trajectories produce float32 scores."""
+        rng = np.random.default_rng(2)
+        x = rng.random(60).astype(np.float32)
+        y = rng.random(60).astype(np.float32)
+
+        scores = compute_motion_scores(x, y, window=15)
+
+        assert scores.dtype == np.float32
+        assert scores == pytest.approx(reference_motion_scores(x, y, 15), rel=1e-4)
+
+    def test_short_trajectory_is_zero(self):
+        """Test that trajectories shorter than the window score zero."""
+        scores = compute_motion_scores(np.ones(10), np.ones(10), window=15)
+
+        assert scores.shape == (10,)
+        assert not scores.any()
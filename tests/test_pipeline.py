@@ -0,0 +1,175 @@
+"""Unit tests for the video processing pipeline."""
+
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from serve_ai_analysis import worker
+from serve_ai_analysis.video.pipeline_functions import run_fused
+from serve_ai_analysis.video.serve_detection import ServeEvent
+from serve_ai_analysis.video.video_utils import (
+    assess_video_quality,
+    extract_serve_clips_batch,
+    needs_optimization,
+    open_video_capture
+)
+
+
+class FakePose:
+    """Pose estimator stand-in that records processed frames."""
+    
+    def __init__(self):
+        self.frames = 0
+    
+    def reset(self):
+        pass
+    
+    def process(self, rgb_frame):
+        self.frames += 1
+        return SimpleNamespace(pose_landmarks=None)
+
+
+@pytest.fixture
+def ball_video(tmp_path):
+    """Write a short video with a ball-colored circle in every frame."""
+    video_path = tmp_path / "ball.avi"
+    writer = cv2.VideoWriter(
+        str(video_path), cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (320, 240)
+    )
+    for i in range(12):
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        cv2.circle(frame, (60 + 10 * i, 100), 15, (0, 128, 255), -1)
+        writer.write(frame)
+    writer.release()
+    return video_path
+
+
+class TestRunFused:
+    """Test the single-decode pose and ball pass."""
+    
+    def test_every_frame_to_pose_every_nth_to_ball(self, ball_video):
+        """Test that pose sees all frames and ball detection every Nth frame."""
+        pose = FakePose()
+        
+        keypoints, ball = run_fused(
+            str(ball_video), ball_frame_skip=3, pose=pose, queue_size=2
+        )
+        
+        assert pose.frames == 12
+        assert keypoints.shape[0] == 12
+        assert np.isnan(keypoints[..., 0]).all()
+        assert len(ball) == 12
+        assert ball.detected_frames().tolist() == [0, 3, 6, 9]
+    
+    def test_ring_slots_are_not_overwritten_early(self, ball_video):
+        """Test that each detection sees its own frame with a tiny ring."""
+        keypoints, ball = run_fused(
+            str(ball_video), ball_frame_skip=1, pose=FakePose(), queue_size=1
+        )
+        
+        assert ball.positions[:, 0] == pytest.approx(
+            [60 + 10 * i for i in range(12)], abs=1.0
+        )
+    
+    def test_pose_frames_downscaled(self, ball_video):
+        """Test that pose inference gets scaled frames and ball detection full ones."""
+        shapes = []
+        
+        class ShapePose(FakePose):
+            def process(self, rgb_frame):
+                shapes.append(rgb_frame.shape)
+                return super().process(rgb_frame)
+        
+        keypoints, ball = run_fused(
+            str(ball_video), ball_frame_skip=1, pose=ShapePose(), inference_max_side=160
+        )
+        
+        assert set(shapes) == {(120, 160, 3)}
+        assert ball.positions[0, 0] == pytest.approx(60, abs=1.0)
+    
+    def test_missing_video(self, tmp_path):
+        """Test that a missing video raises."""
+        with pytest.raises(FileNotFoundError):
+            run_fused(str(tmp_path / "missing.mp4"), pose=FakePose())
+
+
+def frame_count(video_path) -> int:
+    """Count decodable frames in a video."""
+    cap = cv2.VideoCapture(str(video_path))
+    count = 0
+    while cap.read()[0]:
+        count += 1
+    cap.release()
+    return count
+
+
+class TestExtractServeClipsBatch:
+    """Test single-pass serve clip extraction."""
+    
+    def test_overlapping_clips(self, ball_video, tmp_path):
+        """Test clip lengths for disjoint and overlapping serve ranges."""
+        events = [
+            ServeEvent(1, 3, 1, 2, 3, 0.9),
+            ServeEvent(2, 5, 2, 3, 4, 0.9),
+            ServeEvent(8, 11, 8, 9, 10, 0.9)
+        ]
+        paths = [str(tmp_path / f"serve_{i}.avi") for i in range(3)]
+        
+        written = extract_serve_clips_batch(
+            str(ball_video), events, paths, buffer_seconds=0.0
+        )
+        
+        assert sorted(written) == sorted(paths)
+        assert [frame_count(p) for p in paths] == [3, 4, 4]
+
+
+class TestWorker:
+    """Test the Typer-free worker entry point."""
+    
+    def test_extract_clip(self, ball_video, tmp_path):
+        """Test that extract_clip copies the inclusive frame range."""
+        output_path = tmp_path / "clip.avi"
+        
+        code = worker.main(["extract_clip", str(ball_video), "2", "6", str(output_path)])
+        
+        assert code == 0
+        assert frame_count(output_path) == 5
+
+
+class TestNeedsOptimization:
+    """Test the decision to skip re-encoding."""
+    
+    def test_h264_within_target_is_skipped(self):
+        """Test that a small H.264 video is used as is."""
+        metrics = {'width': 1280, 'height': 720, 'codec': 'avc1'}
+        
+        assert not needs_optimization(metrics, (1280, 720))
+        assert needs_optimization(metrics, (640, 360))
+    
+    def test_other_codec_is_optimized(self, ball_video):
+        """Test that an MJPG video is re-encoded even when small."""
+        metrics = assess_video_quality(str(ball_video))
+        
+        assert metrics['codec'] == 'mjpg'
+        assert needs_optimization(metrics, (1280, 720))
+
+
+class TestOpenVideoCapture:
+    """Test hardware decode selection."""
+    
+    @pytest.mark.parametrize("hwaccel", ["auto", "vaapi", "cuda", "off"])
+    def test_decodes_with_any_mode(self, ball_video, hwaccel):
+        """Test that every mode yields a readable capture, falling back to software."""
+        cap = open_video_capture(str(ball_video), hwaccel)
+        try:
+            assert cap.isOpened()
+            assert cap.read()[0]
+        finally:
+            cap.release()
+    
+    def test_unknown_mode(self, ball_video):
+        """Test that an unknown mode is rejected."""
+        with pytest.raises(ValueError):
+            open_video_capture(str(ball_video), "opencl")
@@ -0,0 +1,524 @@
+"""Unit tests for pose estimation helpers."""
+
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import cv2
+import pytest
+import numpy as np
+
+from serve_ai_analysis.pose.pose_estimation import (
+    PoseFrame,
+    PoseLandmark,
+    LANDMARK_INDEX,
+    pose_frames_to_array,
+    get_landmark_track,
+    get_landmark_position,
+    get_pose_stats,
+    empty_keypoints,
+    pose_frames_from_array,
+    pose_sequence_from_frames,
+    filter_pose_array_by_visibility,
+    filter_pose_frames_by_visibility,
+    save_pose_frames,
+    load_pose_frames,
+    create_pose_estimator,
+    inference_size,
+    estimate_pose_video,
+    estimate_pose_video_cached
+)
+from serve_ai_analysis.pose import pose_estimation
+
+
+def create_pose_frame(frame_idx: int, landmarks: dict) -> PoseFrame:
+    """Create a pose frame for testing."""
+    return PoseFrame(
+        frame_idx=frame_idx,
+        landmarks=landmarks,
+        timestamp=frame_idx / 30.0
+    )
+
+
+class TestPoseFrame:
+    """Test packed pose frame storage."""
+    
+    def test_dict_landmarks_are_packed(self):
+        """Test that dict landmarks are packed into a float32 array."""
+        frame = create_pose_frame(0, {'right_wrist': PoseLandmark(0.7, 0.4, 0.1, 0.8)})
+        
+        assert frame.landmarks.shape == (len(LANDMARK_INDEX), 4)
+        assert frame.landmarks.dtype == np.float32
+        assert frame.landmarks[LANDMARK_INDEX['right_wrist']] == pytest.approx([0.7, 0.4, 0.1, 0.8])
+        assert np.isnan(frame.landmarks[LANDMARK_INDEX['nose'], 0])
+    
+    def test_get_landmark_position(self):
+        """Test landmark lookup by name."""
+        frame = create_pose_frame(0, {'nose': PoseLandmark(0.5, 0.2, 0.0, 0.9)})
+        
+        nose = get_landmark_position(frame, 'nose')
+        
+        assert nose.y == pytest.approx(0.2)
+        assert nose.visibility == pytest.approx(0.9)
+        assert get_landmark_position(frame, 'left_wrist') is None
+    
+    def test_landmark_row_is_view(self):
+        """Test that the by-name accessor returns a view of the packed row."""
+        frame = create_pose_frame(0, {'nose': PoseLandmark(0.5, 0.2, 0.0, 0.9)})
+        
+        row = frame.landmark('nose')
+        
+        assert row == pytest.approx([0.5, 0.2, 0.0, 0.9])
+        assert np.shares_memory(row, frame.landmarks)
+        assert np.isnan(frame.landmark('left_wrist')).any()
+    
+    def test_results_to_points(self):
+        """Test packing MediaPipe results into a landmark array."""
+        results = SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=[
+            SimpleNamespace(x=0.1 * i, y=0.2, z=0.0, visibility=0.9) for i in range(33)
+        ]))
+        
+        points = pose_estimation._results_to_points(results)
+        
+        assert points.shape == (len(LANDMARK_INDEX), 4)
+        assert points.dtype == np.float32
+        # right_wrist is MediaPipe landmark 16
+        assert points[LANDMARK_INDEX['right_wrist']] == pytest.approx([1.6, 0.2, 0.0, 0.9])
+
+
+class TestPoseStats:
+    """Test pose statistics."""
+    
+    def test_landmark_counts(self):
+        """Test per-frame landmark count statistics."""
+        frames = [
+            create_pose_frame(0, {'nose': PoseLandmark(0.5, 0.2, 0.0, 0.9)}),
+            create_pose_frame(3, {
+                'nose': PoseLandmark(0.5, 0.2, 0.0, 0.9),
+                'right_wrist': PoseLandmark(0.7, 0.4, 0.0, 0.8),
+                'left_wrist': PoseLandmark(0.3, 0.4, 0.0, 0.8)
+            })
+        ]
+        
+        stats = get_pose_stats(frames)
+        
+        assert (stats['min_landmarks'], stats['max_landmarks']) == (1, 3)
+        assert stats['avg_landmarks_per_frame'] == pytest.approx(2.0)
+        assert stats['frame_span'] == 4
+
+
+class TestFilterPoseFrames:
+    """Test visibility filtering of pose frames."""
+    
+    def test_keeps_frames_with_enough_visible_landmarks(self):
+        """Test that frames are kept by their count of visible landmarks."""
+        visible = PoseLandmark(0.5, 0.5, 0.0, 0.9)
+        hidden = PoseLandmark(0.5, 0.5, 0.0, 0.2)
+        frames = [
+            create_pose_frame(0, {'nose': visible, 'left_wrist': visible}),
+            create_pose_frame(1, {'nose': visible, 'left_wrist': hidden}),
+            create_pose_frame(2, {'nose': visible, 'right_wrist': visible})
+        ]
+        
+        filtered = filter_pose_frames_by_visibility(frames, min_landmarks=2, min_visibility=0.5)
+        
+        assert [f.frame_idx for f in filtered] == [0, 2]
+        assert filter_pose_frames_by_visibility([]) == []
+
+
+class TestPoseFramesToArray:
+    """Test packing pose frames into arrays."""
+
+    def test_shapes_and_dtype(self):
+        """Test output shapes and float32 storage."""
+        frames = [
+            create_pose_frame(i, {'nose': PoseLandmark(0.5, 0.2, 0.0, 0.9)})
+            for i in range(4)
+        ]
+
+        timestamps, xy, visibility = pose_frames_to_array(frames)
+
+        assert timestamps.shape == (4,)
+        assert xy.shape == (4, len(LANDMARK_INDEX), 2)
+        assert visibility.shape == (4, len(LANDMARK_INDEX))
+        assert xy.dtype == np.float32
+        assert timestamps[3] == pytest.approx(0.1)
+
+    def test_missing_landmarks_are_nan(self):
+        """Test that absent landmarks are NaN with zero visibility."""
+        frames = [
+            create_pose_frame(0, {'right_wrist': PoseLandmark(0.7, 0.4, 0.0, 0.8)})
+        ]
+
+        _, xy, visibility = pose_frames_to_array(frames)
+
+        wrist = LANDMARK_INDEX['right_wrist']
+        nose = LANDMARK_INDEX['nose']
+        assert xy[0, wrist] == pytest.approx([0.7, 0.4])
+        assert visibility[0, wrist] == pytest.approx(0.8)
+        assert np.isnan(xy[0, nose]).all()
+        assert visibility[0, nose] == 0.0
+
+
+class TestGetLandmarkTrack:
+    """Test single-landmark trajectory extraction."""
+    
+    def test_skips_frames_without_landmark(self):
+        """Test that only frames containing the landmark are returned."""
+        frames = [
+            create_pose_frame(0, {'right_wrist': PoseLandmark(0.1, 0.2, 0.0, 0.9)}),
+            create_pose_frame(1, {'nose': PoseLandmark(0.5, 0.2, 0.0, 0.9)}),
+            create_pose_frame(2, {'right_wrist': PoseLandmark(0.3, 0.4, 0.0, 0.9)})
+        ]
+        
+        timestamps, xy = get_landmark_track(frames, 'right_wrist')
+        
+        assert xy.dtype == np.float32
+        assert xy.shape == (2, 2)
+        assert xy[1] == pytest.approx([0.3, 0.4])
+        assert timestamps == pytest.approx([0.0, 2 / 30.0])
+    
+    def test_empty(self):
+        """Test that no matches yields empty arrays."""
+        timestamps, xy = get_landmark_track([], 'right_wrist')
+        
+        assert timestamps.shape == (0,)
+        assert xy.shape == (0, 2)
+
+
+class TestKeypointArray:
+    """Test the frame-indexed keypoint array path."""
+    
+    def test_filter_masks_in_place(self):
+        """Test that low-visibility landmarks and sparse frames are masked."""
+        keypoints = empty_keypoints(2)
+        keypoints[0, :6] = (0.5, 0.5, 0.0, 0.9)
+        keypoints[0, 0, 3] = 0.3
+        keypoints[1, :4] = (0.5, 0.5, 0.0, 0.9)
+        
+        result = filter_pose_array_by_visibility(keypoints, min_landmarks=5, min_visibility=0.5)
+        
+        assert result is keypoints
+        assert np.isnan(keypoints[0, 0, 0]) and keypoints[0, 0, 3] == 0.0
+        assert keypoints[0, 1:6, 0] == pytest.approx([0.5] * 5)
+        assert np.isnan(keypoints[1, ..., 0]).all()
+    
+    def test_pose_frames_are_views(self):
+        """Test that frames without landmarks are skipped and rows are not copied."""
+        keypoints = empty_keypoints(3)
+        keypoints[2, LANDMARK_INDEX['nose']] = (0.5, 0.2, 0.0, 0.9)
+        
+        frames = list(pose_frames_from_array(keypoints, fps=10.0))
+        
+        assert [f.frame_idx for f in frames] == [2]
+        assert frames[0].timestamp == pytest.approx(0.2)
+        assert np.shares_memory(frames[0].landmarks, keypoints)
+    
+    def test_pose_sequence_from_generator(self):
+        """Test packing a generator of frames into a PoseSequence."""
+        frames = (
+            create_pose_frame(i, {'right_wrist': PoseLandmark(0.1 * i, 0.2, 0.0, 0.9)})
+            for i in (3, 4)
+        )
+        
+        sequence = pose_sequence_from_frames(frames)
+        
+        assert len(sequence) == 2
+        assert sequence.landmarks.shape == (2, len(LANDMARK_INDEX), 4)
+        assert sequence.frame_numbers.tolist() == [3, 4]
+        assert sequence.coords[1, LANDMARK_INDEX['right_wrist']] == pytest.approx([0.4, 0.2, 0.0])
+        assert len(pose_sequence_from_frames([])) == 0
+    
+    def test_pose_sequence_velocities_cached(self):
+        """Test that velocities are computed once and NaN for repeated timestamps."""
+        frames = [
+            create_pose_frame(i, {'right_wrist': PoseLandmark(0.1 * i, 0.2, 0.0, 0.9)})
+            for i in (0, 1, 1)
+        ]
+        
+        sequence = pose_sequence_from_frames(frames)
+        wrist = LANDMARK_INDEX['right_wrist']
+        
+        assert sequence.velocities is sequence.velocities
+        assert sequence.velocities.shape == (2, len(LANDMARK_INDEX), 3)
+        assert sequence.velocities.dtype == np.float32
+        assert sequence.velocities[0, wrist] == pytest.approx([3.0, 0.0, 0.0])
+        assert np.isnan(sequence.velocities[1]).all()
+
+
+class TestEstimatePoseVideo:
+    """Test the per-frame estimation loop."""
+    
+    @pytest.fixture
+    def gray_video(self, tmp_path):
+        """Write a video whose i-th frame has brightness 20 * i."""
+        video_path = tmp_path / "video.avi"
+        writer = cv2.VideoWriter(
+            str(video_path), cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (64, 48)
+        )
+        for i in range(10):
+            writer.write(np.full((48, 64, 3), 20 * i, dtype=np.uint8))
+        writer.release()
+        return video_path
+    
+    @staticmethod
+    def recording_pose(processed, delay=0.0, shapes=None):
+        """Pose stand-in that records each processed frame's brightness."""
+        class FakePose:
+            def reset(self):
+                pass
+            
+            def process(self, rgb_frame):
+                time.sleep(delay)
+                processed.append(int(rgb_frame.mean()))
+                if shapes is not None:
+                    shapes.append(rgb_frame.shape)
+                return SimpleNamespace(pose_landmarks=None)
+        
+        return FakePose()
+    
+    def test_inference_size(self):
+        """Test that only frames above the limit are scaled, keeping aspect ratio."""
+        assert inference_size(3840, 2160, 1280) == (1280, 720)
+        assert inference_size(720, 1280, 640) == (360, 640)
+        assert inference_size(1280, 720, 1280) == (1280, 720)
+        assert inference_size(3840, 2160, None) == (3840, 2160)
+    
+    @pytest.mark.parametrize("decoder", ["opencv", "pyav"])
+    def test_frames_downscaled_for_inference(self, gray_video, decoder):
+        """Test that large frames reach the estimator scaled down."""
+        processed, shapes = [], []
+        
+        estimate_pose_video(
+            str(gray_video),
+            inference_max_side=32,
+            decoder=decoder,
+            pose=self.recording_pose(processed, shapes=shapes)
+        )
+        
+        assert set(shapes) == {(24, 32, 3)}
+        assert processed == pytest.approx([20 * i for i in range(10)], abs=3)
+    
+    @pytest.mark.parametrize("decoder", ["opencv", "pyav"])
+    def test_frame_stride(self, gray_video, decoder):
+        """Test that only every Nth frame is processed (PyAV falls back to OpenCV if missing)."""
+        processed = []
+        
+        estimate_pose_video(
+            str(gray_video), frame_stride=3, decoder=decoder, pose=self.recording_pose(processed)
+        )
+        
+        assert processed == pytest.approx([0, 60, 120, 180], abs=3)
+    
+    def test_rgb_buffers_not_overwritten_early(self, gray_video):
+        """Test that reused RGB buffers hold each frame until it is processed."""
+        processed = []
+        
+        estimate_pose_video(
+            str(gray_video), prefetch=1, pose=self.recording_pose(processed, delay=0.01)
+        )
+        
+        assert processed == pytest.approx([20 * i for i in range(10)], abs=3)
+    
+    def test_estimate_pose_frame_contiguous_input(self):
+        """Test that strided frames reach the estimator as contiguous arrays."""
+        layouts = []
+        
+        class FakePose:
+            def process(self, rgb_frame):
+                layouts.append(rgb_frame.flags['C_CONTIGUOUS'])
+                return SimpleNamespace(pose_landmarks=None)
+        
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        
+        assert pose_estimation.estimate_pose_frame(FakePose(), frame[:, 8:56], 0, 0.0) is None
+        assert layouts == [True]
+    
+    def test_parallel_workers_keep_frame_order(self, gray_video, monkeypatch):
+        """Test that frames processed by several estimators come back in order."""
+        created = []
+        
+        class FakePose:
+            def __init__(self, static_image_mode, **kwargs):
+                self.static_image_mode = static_image_mode
+                self.closed = False
+                created.append(self)
+            
+            def process(self, rgb_frame):
+                brightness = rgb_frame.mean() / 255
+                # Later frames finish first, so workers complete out of order
+                time.sleep(0.02 * (1 - brightness))
+                landmark = SimpleNamespace(x=brightness, y=0.5, z=0.0, visibility=1.0)
+                return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=[landmark] * 33))
+            
+            def close(self):
+                self.closed = True
+        
+        monkeypatch.setattr(pose_estimation, "create_pose_estimator", FakePose)
+        
+        pose_frames = estimate_pose_video(str(gray_video), prefetch=1, workers=3)
+        
+        assert [frame.frame_idx for frame in pose_frames] == list(range(10))
+        assert [frame.landmark('nose')[0] for frame in pose_frames] == pytest.approx(
+            [20 * i / 255 for i in range(10)], abs=0.02
+        )
+        assert len(created) == 3
+        assert all(pose.static_image_mode and pose.closed for pose in created)
+    
+    @pytest.mark.parametrize("realtime", [False, True])
+    def test_source_without_frame_rate(self, gray_video, monkeypatch, realtime):
+        """Test that a capture reporting 0 fps still gets increasing timestamps."""
+        class FakeCapture:
+            def __init__(self, source):
+                self.remaining = 5
+            
+            def isOpened(self):
+                return True
+            
+            def set(self, prop, value):
+                return True
+            
+            def get(self, prop):
+                return 0.0
+            
+            def read(self, frame=None):
+                if not self.remaining:
+                    return False, None
+                self.remaining -= 1
+                time.sleep(0.005)
+                return True, np.zeros((48, 64, 3), dtype=np.uint8)
+            
+            def release(self):
+                pass
+        
+        class FakePose:
+            def reset(self):
+                pass
+            
+            def process(self, rgb_frame):
+                landmark = SimpleNamespace(x=0.5, y=0.5, z=0.0, visibility=1.0)
+                return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=[landmark] * 33))
+        
+        monkeypatch.setattr(pose_estimation.cv2, "VideoCapture", FakeCapture)
+        
+        pose_frames = estimate_pose_video(
+            str(gray_video), realtime=realtime, prefetch=8, pose=FakePose()
+        )
+        timestamps = [frame.timestamp for frame in pose_frames]
+        
+        assert len(timestamps) == 5
+        assert timestamps[0] == 0.0
+        assert all(np.isfinite(timestamps))
+        assert all(b > a for a, b in zip(timestamps, timestamps[1:]))
+    
+    def test_invalid_settings(self, tmp_path):
+        """Test that a stride below one and unknown decoders are rejected."""
+        with pytest.raises(ValueError):
+            estimate_pose_video(str(tmp_path / "video.avi"), frame_stride=0)
+        with pytest.raises(ValueError):
+            estimate_pose_video(str(tmp_path / "video.avi"), decoder="gstreamer")
+        with pytest.raises(ValueError):
+            estimate_pose_video(str(tmp_path / "video.avi"), workers=2, roi_tracking=True)
+
+
+class TestPoseBackends:
+    """Test pose estimator backend selection."""
+    
+    def test_invalid_backend_settings(self):
+        """Test that unknown backends and a GPU backend without a model raise."""
+        with pytest.raises(ValueError):
+            create_pose_estimator(backend="tpu")
+        with pytest.raises(ValueError):
+            create_pose_estimator(backend="gpu")
+    
+    def test_tasks_results_use_legacy_layout(self):
+        """Test that Tasks results are exposed as pose_landmarks.landmark."""
+        landmark = SimpleNamespace(x=0.5, y=0.2, z=0.0, visibility=0.9)
+        timestamps = []
+        
+        class FakeLandmarker:
+            def detect_for_video(self, image, timestamp_ms):
+                timestamps.append(timestamp_ms)
+                return SimpleNamespace(pose_landmarks=[[landmark] * 33])
+            
+            def close(self):
+                pass
+        
+        estimator = pose_estimation._TasksPoseEstimator(options=None, static_image_mode=False)
+        estimator._landmarker = FakeLandmarker()
+        rgb_frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        
+        results = estimator.process(rgb_frame)
+        estimator.process(rgb_frame)
+        
+        assert pose_estimation._results_to_points(results)[0] == pytest.approx([0.5, 0.2, 0.0, 0.9])
+        assert timestamps[1] > timestamps[0]
+        estimator.reset()
+        assert estimator._landmarker is None
+    
+    def test_metrics_import_skips_mediapipe(self):
+        """Test that MediaPipe is only imported once an estimator is created."""
+        code = "import sys, serve_ai_analysis.metrics.calculator; print('mediapipe' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "False"
+
+
+class TestPoseCache:
+    """Test saving, loading and caching pose frames."""
+    
+    def test_save_load_roundtrip(self, tmp_path):
+        """Test that saved frames load back unchanged."""
+        frames = [
+            create_pose_frame(5, {'right_wrist': PoseLandmark(0.7, 0.4, 0.1, 0.8)}),
+            create_pose_frame(6, {'nose': PoseLandmark(0.5, 0.2, 0.0, 0.9)})
+        ]
+        cache_path = tmp_path / "video.pose.npz"
+        
+        save_pose_frames(frames, str(cache_path))
+        loaded = load_pose_frames(str(cache_path))
+        
+        assert cache_path.exists()
+        assert [f.frame_idx for f in loaded] == [5, 6]
+        assert get_landmark_position(loaded[0], 'nose') is None
+        assert get_landmark_position(loaded[0], 'right_wrist').x == pytest.approx(0.7)
+        assert loaded[1].timestamp == pytest.approx(6 / 30.0)
+    
+    def test_cache_reused_for_same_settings(self, tmp_path, monkeypatch):
+        """Test that estimation only reruns when settings change."""
+        video_path = tmp_path / "video.mp4"
+        video_path.write_bytes(b"")
+        calls = []
+        
+        def fake_estimate(path, **kwargs):
+            calls.append(kwargs)
+            return [create_pose_frame(0, {'nose': PoseLandmark(0.5, 0.2, 0.0, 0.9)})]
+        
+        monkeypatch.setattr(pose_estimation, "estimate_pose_video", fake_estimate)
+        
+        estimate_pose_video_cached(video_path, confidence_threshold=0.5)
+        frames = estimate_pose_video_cached(video_path, confidence_threshold=0.5)
+        estimate_pose_video_cached(video_path, confidence_threshold=0.7)
+        
+        assert len(frames) == 1
+        assert len(calls) == 2
+
+
+class TestPoseRoi:
+    """Test player region computation for ROI tracking."""
+    
+    def test_padded_and_clamped(self):
+        """Test that the box is padded and clamped to the frame."""
+        points = np.array([[0.4, 0.3], [0.6, 0.9]], dtype=np.float32)
+        
+        x0, y0, x1, y1 = pose_estimation._pose_roi(points, 1280, 720, padding=0.2)
+        
+        assert (x0, x1) == (460, 820)
+        assert y0 == 129
+        assert y1 == 720
+    
+    def test_degenerate_box(self):
+        """Test that a tiny box is rejected."""
+        points = np.array([[0.5, 0.5], [0.501, 0.501]], dtype=np.float32)
+        
+        assert pose_estimation._pose_roi(points, 1280, 720, padding=0.2) is None
@@ -0,0 +1,96 @@
+"""Unit tests for PDF report generation."""
+
+import json
+import zipfile
+
+import pytest
+import numpy as np
+
+from serve_ai_analysis.metrics.calculator import BiomechanicalCalculator
+from serve_ai_analysis.pose.pose_estimation import PoseFrame, PoseLandmark
+from serve_ai_analysis.reports import ReportGenerator, generator
+from serve_ai_analysis.reports.generator import (
+    _grouped_stats,
+    _load_metrics_columns,
+    create_serve_archive
+)
+
+
+@pytest.fixture(params=["json", "npz"])
+def metrics_path(request, tmp_path):
+    """Save metrics for a short arm motion in either format."""
+    frames = [
+        PoseFrame(
+            frame_idx=i,
+            landmarks={
+                'right_shoulder': PoseLandmark(0.5, 0.4, 0.0, 0.9),
+                'right_elbow': PoseLandmark(0.55, 0.3, 0.0, 0.9),
+                'right_wrist': PoseLandmark(0.6, 0.2 + 0.01 * i, 0.0, 0.9)
+            },
+            timestamp=i / 30.0
+        )
+        for i in range(5)
+    ]
+    calculator = BiomechanicalCalculator()
+    output_path = tmp_path / f"metrics.{request.param}"
+    calculator.save_metrics(calculator.calculate_serve_metrics(frames), output_path)
+    return output_path
+
+
+def test_load_metrics_columns(metrics_path):
+    """Test that both metrics formats load into the same columns."""
+    summary, columns = _load_metrics_columns(metrics_path)
+    
+    assert summary["serve_id"] == "serve_1"
+    assert "joint_angles" not in summary
+    assert list(columns["joint_angle_names"]) == ["right_elbow_flexion"] * 5
+    assert len(columns["velocity_speeds"]) == 4
+    assert len(columns["velocity_timestamps"]) == 4
+
+
+def test_grouped_stats():
+    """Test per-name min, mean and max."""
+    names = np.array(["b", "a", "b", "a", "b"])
+    values = np.array([1.0, 4.0, 3.0, 2.0, 5.0])
+    
+    labels, stats = _grouped_stats(names, values)
+    
+    assert list(labels) == ["a", "b"]
+    assert stats == pytest.approx(np.array([[2.0, 3.0, 4.0], [1.0, 3.0, 5.0]]))
+
+
+def test_generate_report(metrics_path, tmp_path):
+    """Test that a PDF is written from a metrics file."""
+    pytest.importorskip("reportlab")
+    output_path = tmp_path / "reports" / "serve.pdf"
+    
+    assert ReportGenerator().generate_report(metrics_path, output_path, "Player") == output_path
+    assert output_path.read_bytes().startswith(b"%PDF")
+
+
+def test_serve_archive_stores_videos(tmp_path, monkeypatch):
+    """Test that clips are stored uncompressed and text entries deflated."""
+    monkeypatch.chdir(tmp_path)
+    clip_path = tmp_path / "clip.mp4"
+    clip_path.write_bytes(bytes(range(256)) * 64)
+    segment = {
+        "serve_id": 0,
+        "video_path": str(clip_path),
+        "duration": 1.5,
+        "confidence": 0.9,
+        "has_landmarks": True,
+        "start_frame": 10,
+        "end_frame": 55
+    }
+    
+    zip_path = create_serve_archive("task", [segment], {"confidence_threshold": 0.5})
+    
+    with zipfile.ZipFile(zip_path) as archive:
+        assert archive.getinfo("serves/serve_000.mp4").compress_type == zipfile.ZIP_STORED
+        assert archive.getinfo("README.md").compress_type == zipfile.ZIP_DEFLATED
+        assert archive.read("serves/serve_000.mp4") == clip_path.read_bytes()
+        if generator.MSGSPEC_AVAILABLE:
+            summary = generator.msgspec.msgpack.decode(archive.read("config_summary.msgpack"))
+            assert summary == json.loads(archive.read("config_summary.json"))
+        else:
+            assert "config_summary.msgpack" not in archive.namelist()
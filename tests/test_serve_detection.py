@@ -2,6 +2,7 @@
 
 import pytest
 import numpy as np
+from dataclasses import replace
 from unittest.mock import Mock, patch
 
 from serve_ai_analysis.video.serve_detection import (
@@ -18,10 +19,13 @@ from serve_ai_analysis.video.serve_detection import (
 
 from serve_ai_analysis.pose.pose_estimation import (
     PoseFrame,
-    PoseLandmark
+    PoseLandmark,
+    LANDMARK_INDEX,
+    empty_keypoints,
+    pose_frames_from_array
 )
 
-from serve_ai_analysis.video.ball_detection import BallDetection
+from serve_ai_analysis.video.ball_detection import BallDetection, ball_trajectory_from_detections
 
 
 class TestServeEvent:
@@ -93,7 +97,7 @@ class TestServeDetection:
         }
         
         pose_frame = self.create_mock_pose_frame(0, landmarks)
-        config = DEFAULT_SERVE_CONFIG.copy()
+        config = DEFAULT_SERVE_CONFIG
         
         confidence = calculate_frame_confidence(pose_frame, None, config)
         
@@ -112,7 +116,7 @@ class TestServeDetection:
         
         pose_frame = self.create_mock_pose_frame(0, landmarks)
         ball_detection = BallDetection(frame_idx=0, x=0.5, y=0.3, confidence=0.6, radius=10)
-        config = DEFAULT_SERVE_CONFIG.copy()
+        config = DEFAULT_SERVE_CONFIG
         
         confidence = calculate_frame_confidence(pose_frame, ball_detection, config)
         
@@ -132,7 +136,7 @@ class TestServeDetection:
             confidence=0.8
         )
         
-        config = DEFAULT_SERVE_CONFIG.copy()
+        config = DEFAULT_SERVE_CONFIG
         assert validate_serve_event(serve_event, config) is True
     
     def test_validate_serve_event_invalid_duration(self):
@@ -146,7 +150,7 @@ class TestServeDetection:
             confidence=0.8
         )
         
-        config = DEFAULT_SERVE_CONFIG.copy()
+        config = DEFAULT_SERVE_CONFIG
         assert validate_serve_event(serve_event, config) is False
     
     def test_validate_serve_event_invalid_sequence(self):
@@ -160,7 +164,7 @@ class TestServeDetection:
             confidence=0.8
         )
         
-        config = DEFAULT_SERVE_CONFIG.copy()
+        config = DEFAULT_SERVE_CONFIG
         assert validate_serve_event(serve_event, config) is False
     
     def test_validate_serve_event_low_confidence(self):
@@ -174,7 +178,7 @@ class TestServeDetection:
             confidence=0.3  # Below threshold
         )
         
-        config = DEFAULT_SERVE_CONFIG.copy()
+        config = DEFAULT_SERVE_CONFIG
         assert validate_serve_event(serve_event, config) is False
     
     def test_get_serve_stats_empty(self):
@@ -227,7 +231,7 @@ class TestServeStateMachine:
         
         pose_frame = self.create_mock_pose_frame(10, landmarks)
         current_state = ServeState(phase=ServePhase.WAITING)
-        config = DEFAULT_SERVE_CONFIG.copy()
+        config = DEFAULT_SERVE_CONFIG
         
         new_state, serve_event = update_serve_state(current_state, pose_frame, None, config)
         
@@ -237,5 +241,70 @@ class TestServeStateMachine:
         assert serve_event is None
 
 
+def make_serve_keypoints(n_serves: int, seed: int = 0) -> np.ndarray:
+    """Build keypoints with scripted serves separated by idle and noisy frames."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    
+    def frame(left_up, right_up, right_above_shoulder=None):
+        landmarks = np.full((len(LANDMARK_INDEX), 4), np.nan, dtype=np.float32)
+        landmarks[:, 3] = 0.0
+        if right_above_shoulder is None:
+            right_above_shoulder = right_up
+        for name, y in (
+            ('nose', 0.3),
+            ('left_wrist', 0.1 if left_up else 0.5),
+            ('right_wrist', 0.1 if right_up else (0.3 if right_above_shoulder else 0.6)),
+            ('left_shoulder', 0.4),
+            ('right_shoulder', 0.4)
+        ):
+            landmarks[LANDMARK_INDEX[name]] = (0.5, y, 0.0, rng.uniform(0.5, 1.0))
+        # Occasionally drop a key landmark
+        if rng.random() < 0.05:
+            landmarks[LANDMARK_INDEX['right_wrist']] = (np.nan, np.nan, np.nan, 0.0)
+        return landmarks
+    
+    for _ in range(n_serves):
+        rows += [frame(False, False) for _ in range(rng.integers(3, 10))]
+        rows += [frame(True, False) for _ in range(rng.integers(2, 8))]
+        rows += [frame(True, True) for _ in range(rng.integers(1, 6))]
+        rows += [frame(False, False, right_above_shoulder=bool(rng.random() < 0.3)) for _ in range(rng.integers(2, 12))]
+        rows += [empty_keypoints(1)[0] for _ in range(rng.integers(0, 3))]
+    
+    return np.stack(rows)
+
+
+class TestDetectServesArray:
+    """Test that the compiled keypoint-array path matches the frame-list path."""
+    
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_matches_list_path(self, seed):
+        """Test identical events from the array kernel and update_serve_state."""
+        keypoints = make_serve_keypoints(40, seed=seed)
+        rng = np.random.default_rng(seed + 100)
+        balls = [
+            BallDetection(frame_idx=i, x=10.0, y=10.0, confidence=float(rng.uniform(0.2, 1.0)), radius=5.0)
+            for i in range(len(keypoints)) if rng.random() < 0.3
+        ]
+        config = replace(DEFAULT_SERVE_CONFIG, serve_min_duration=8, confidence_threshold=0.7)
+        
+        expected = detect_serves(list(pose_frames_from_array(keypoints)), balls, config)
+        from_list = detect_serves(keypoints, balls, config)
+        from_trajectory = detect_serves(
+            keypoints, ball_trajectory_from_detections(balls, len(keypoints)), config
+        )
+        
+        assert expected
+        for events in (from_list, from_trajectory):
+            assert [
+                (e.start_frame, e.end_frame, e.ball_toss_frame, e.contact_frame, e.follow_through_frame)
+                for e in events
+            ] == [
+                (e.start_frame, e.end_frame, e.ball_toss_frame, e.contact_frame, e.follow_through_frame)
+                for e in expected
+            ]
+            assert [e.confidence for e in events] == pytest.approx([e.confidence for e in expected])
+
+
 if __name__ == "__main__":
     pytest.main([__file__])